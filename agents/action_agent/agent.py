@@ -1,9 +1,10 @@
 from google.adk.agents import Agent
 from tools.local_storage import save_report_locally
+from tools.rate_limit import rate_limited
 
 action_agent = Agent(
     name="meeting_action_executor",
-    model="gemini-2.5-flash",
+    model=rate_limited("gemini-2.5-flash"),
     description="Saves meeting reports locally",
     
     instruction="""You are a Meeting Action Executor. You receive structured meeting reports 
@@ -0,0 +1,277 @@
+import asyncio
+import json
+from typing import Any, Callable, Dict, List, Optional
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.genai import types
+from agents.analyst_agent.agent import MODEL_NAME, INSTRUCTION_VERSION, analyst_agent
+from agents.analyst_agent.cache import AnalysisCache, make_cache_key
+from agents.map_reduce import (
+    MAP_REDUCE_THRESHOLD_TOKENS, RELATED_HEADING, WINDOW_TOKENS, estimate_tokens, map_reduce_analyze
+)
+from models.schemas import MeetingReport
+from tools.meeting_memory import get_meeting_memory
+from tools.telemetry import annotate, traced
+from agents.sink_agent.agent import MEETING_ID_STATE_KEY
+from agents.sink_agent.sinks import Delivery, default_recipients, describe_results, new_meeting_id, run_sinks
+
+APP_NAME = "lecturelink_app"
+REPORT_STATE_KEY = "structured_report"
+
+
+def build_user_message(
+    transcript: str,
+    meeting_title: Optional[str] = None,
+    attendees: Optional[List[str]] = None,
+    related: str = ""
+) -> str:
+    """
+    Builds the message sent to the workflow from a transcript and details.
+
+    Args:
+        transcript: Full meeting transcript
+        meeting_title: Optional title entered by the user
+        attendees: Optional list of attendee names
+        related: Snippets of related past meetings, from MeetingMemory
+
+    Returns:
+        Message text for the analyst agent
+    """
+    context_parts = []
+    if meeting_title:
+        context_parts.append(f"Meeting Title: {meeting_title}")
+    if attendees:
+        context_parts.append(f"Attendees: {', '.join(attendees)}")
+    if related:
+        context_parts.append(f"{RELATED_HEADING}\n{related}")
+    context_parts.append(f"Transcript:\n{transcript}")
+    return "\n\n".join(context_parts)
+
+
+def recall_related(transcript: str, meeting_title: Optional[str] = None) -> str:
+    """Related past meetings for the prompt; "" when memory is unavailable."""
+    try:
+        return get_meeting_memory().related_context(transcript, meeting_title)
+    except Exception as e:
+        annotate(memory_error=str(e))
+        return ""
+
+
+def parse_partial_json(text: str) -> Dict[str, Any]:
+    """
+    Best-effort parse of a JSON object that is still being streamed.
+
+    Open strings and containers are closed; if that is not valid JSON the
+    text is cut back to the last complete member. Used only to preview a
+    report while the model is still writing it.
+
+    Args:
+        text: JSON prefix produced so far
+
+    Returns:
+        The fields that are complete enough to show, or {} if none are
+    """
+    start = text.find("{")
+    if start < 0:
+        return {}
+    text = text[start:]
+
+    stack: List[str] = []
+    cuts: List[tuple] = []  # (position before a comma, closers needed there)
+    in_string = escaped = False
+    for position, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]" and stack:
+            stack.pop()
+        elif char == ",":
+            cuts.append((position, "".join(reversed(stack))))
+
+    closing = ('"' if in_string else "") + "".join(reversed(stack))
+    candidates = [text + closing] + [text[:position] + closers for position, closers in reversed(cuts)]
+    for candidate in candidates:
+        try:
+            value = json.loads(candidate)
+        except ValueError:
+            continue
+        return value if isinstance(value, dict) else {}
+    return {}
+
+
+def _parse_report(value: Any) -> Optional[MeetingReport]:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = json.loads(value)
+    return MeetingReport.model_validate(value)
+
+
+async def save_report(
+    report: MeetingReport,
+    session_id: str,
+    transcript: str,
+    meeting_id: Optional[str] = None
+) -> str:
+    """Delivers a finished report to every sink and describes where it went."""
+    results = await run_sinks(Delivery(
+        meeting_id=meeting_id or new_meeting_id(),
+        report=report,
+        report_json=report.model_dump_json(indent=2),
+        session_id=session_id,
+        transcript=transcript,
+        recipients=tuple(default_recipients())
+    ))
+    return describe_results(results)
+
+
+@traced("analyze")
+async def analyze_transcript(
+    runner: Any,
+    session_service: Any,
+    transcript: str,
+    session_id: str,
+    meeting_title: Optional[str] = None,
+    attendees: Optional[List[str]] = None,
+    user_id: str = "streamlit_user",
+    cache: Optional[AnalysisCache] = None,
+    map_reduce_threshold_tokens: int = MAP_REDUCE_THRESHOLD_TOKENS,
+    window_tokens: int = WINDOW_TOKENS,
+    on_update: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> Dict[str, Any]:
+    """
+    Runs the meeting workflow for one transcript, memoizing validated reports.
+
+    On a cache hit neither the analyst nor the sinks run: the report was
+    already delivered when it was first produced, and the hit returns that
+    delivery's meeting id and response. Otherwise snippets of related past
+    meetings are recalled from the meeting memory and added to the
+    prompt. Transcripts estimated above ``map_reduce_threshold_tokens``
+    are analyzed window by window with map_reduce_analyze and the merged
+    report is saved the same way.
+
+    Args:
+        runner: ADK Runner wrapping the root agent
+        session_service: Session service used by the runner
+        transcript: Full meeting transcript
+        session_id: Session to run in (created if missing)
+        meeting_title: Optional title entered by the user
+        attendees: Optional list of attendee names
+        user_id: Owner of the session
+        cache: Analysis cache; caching is skipped when None
+        map_reduce_threshold_tokens: Size above which windows are used
+        window_tokens: Token budget of each window
+        on_update: Called with a "partial_report" dict (and, for windowed
+            analysis, a "progress" fraction) as the report takes shape;
+            enables model response streaming
+
+    Returns:
+        Dictionary with the final response text, the report, the meeting id
+        it was delivered under and whether it came from the cache
+    """
+    # Keyed without recalled context, which changes as meetings are added
+    base_message = build_user_message(transcript, meeting_title, attendees)
+    cache_key = make_cache_key(base_message, MODEL_NAME, INSTRUCTION_VERSION)
+    transcript_tokens = estimate_tokens(transcript)
+    annotate(transcript_tokens=transcript_tokens)
+    if cache is not None:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            annotate(path="cache")
+            return {
+                "response": cached.response,
+                "report": cached.report,
+                "meeting_id": cached.meeting_id,
+                "cached": True
+            }
+
+    related = await asyncio.to_thread(recall_related, transcript, meeting_title)
+    annotate(related_tokens=estimate_tokens(related) if related else 0)
+
+    if transcript_tokens > map_reduce_threshold_tokens:
+        annotate(path="map_reduce")
+        def on_window(partial: MeetingReport, done: int, total: int) -> None:
+            if on_update is not None:
+                on_update({"partial_report": partial.model_dump(), "progress": done / total})
+
+        report = await map_reduce_analyze(
+            transcript, meeting_title, attendees,
+            window_tokens=window_tokens, on_window=on_window, related=related
+        )
+        meeting_id = new_meeting_id()
+        response = await save_report(report, session_id, transcript, meeting_id)
+        if cache is not None:
+            cache.put(cache_key, report, meeting_id, response)
+        return {
+            "response": response,
+            "report": report,
+            "meeting_id": meeting_id,
+            "cached": False
+        }
+
+    annotate(path="workflow")
+    user_message = build_user_message(transcript, meeting_title, attendees, related)
+
+    # Get or create session
+    session = await session_service.get_session(
+        app_name=APP_NAME,
+        user_id=user_id,
+        session_id=session_id
+    )
+    if session is None:
+        await session_service.create_session(
+            app_name=APP_NAME,
+            user_id=user_id,
+            session_id=session_id
+        )
+
+    # Run
+    content = types.Content(
+        role='user',
+        parts=[types.Part(text=user_message)]
+    )
+
+    run_config = RunConfig(streaming_mode=StreamingMode.SSE) if on_update is not None else None
+
+    final_response = None
+    report = None
+    meeting_id = None
+    streamed_text = ""
+    async for event in runner.run_async(
+        user_id=user_id,
+        session_id=session_id,
+        new_message=content,
+        run_config=run_config
+    ):
+        if on_update is not None and event.partial and event.author == analyst_agent.name:
+            if event.content and event.content.parts:
+                streamed_text += "".join(part.text or "" for part in event.content.parts)
+                on_update({"partial_report": parse_partial_json(streamed_text)})
+
+        state_delta = event.actions.state_delta if event.actions else {}
+        if REPORT_STATE_KEY in state_delta:
+            report = _parse_report(state_delta[REPORT_STATE_KEY])
+            if on_update is not None:
+                on_update({"partial_report": report.model_dump()})
+        if state_delta.get(MEETING_ID_STATE_KEY):
+            meeting_id = state_delta[MEETING_ID_STATE_KEY]
+        if event.is_final_response() and event.content and event.content.parts:
+            final_response = event.content.parts[0].text
+
+    # Only a delivered report is cached, so a hit never skips a delivery
+    if cache is not None and report is not None and meeting_id is not None:
+        cache.put(cache_key, report, meeting_id, final_response or "")
+
+    return {
+        "response": final_response,
+        "report": report,
+        "meeting_id": meeting_id,
+        "cached": False
+    }
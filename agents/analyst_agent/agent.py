@@ -1,11 +1,18 @@
 from google.adk.agents import Agent
 from models.schemas import MeetingReport
+from tools.rate_limit import rate_limited
 import os
 
+MODEL_NAME = "gemini-2.5-flash"  # Fast and efficient for MVP
+
+# Bump whenever the instruction or output schema changes so cached
+# analyses produced by the previous prompt are no longer reused
+INSTRUCTION_VERSION = "2"
+
 # Analyst Agent - Uses output_schema, NO TOOLS
 analyst_agent = Agent(
     name="meeting_analyst",
-    model="gemini-2.5-flash",  # Fast and efficient for MVP
+    model=rate_limited(MODEL_NAME),
     description="Analyzes meeting transcripts and creates structured reports",
     
     instruction="""You are a Meeting Analysis Expert. Your job is to analyze meeting transcripts 
@@ -24,7 +31,10 @@ analyst_agent = Agent(
     Do not add any text before or after the JSON.
     
     If the transcript mentions previous meetings or context, reference that information
-    to make your report more comprehensive.""",
+    to make your report more comprehensive. A "Related past meetings" section, when
+    present, holds excerpts of earlier meetings: use it to connect follow-ups (e.g. an
+    action item being completed or a decision revisited), but report only what is said
+    in this transcript.""",
     
     output_schema=MeetingReport,  # Forces structured output
     output_key="structured_report"  # Saves to session state
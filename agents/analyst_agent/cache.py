@@ -0,0 +1,87 @@
+import hashlib
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Tuple
+from models.schemas import MeetingReport
+
+DEFAULT_TTL_SECONDS = 24 * 3600
+DEFAULT_CAPACITY = 256
+
+
+def normalize_message(user_message: str) -> str:
+    """Canonicalizes whitespace and Unicode so cosmetic edits share a key."""
+    text = unicodedata.normalize("NFKC", user_message)
+    lines = [re.sub(r"\s+", " ", line).strip() for line in text.splitlines()]
+    return "\n".join(line for line in lines if line)
+
+
+def make_cache_key(user_message: str, model: str, instruction_version: str) -> str:
+    """
+    Builds the cache key for one analysis request.
+
+    Args:
+        user_message: Message sent to the workflow (title, attendees, transcript)
+        model: Model name of the analyst agent
+        instruction_version: Version of the analyst instruction
+
+    Returns:
+        Hex digest identifying the request
+    """
+    digest = hashlib.sha256()
+    for part in (model, instruction_version, normalize_message(user_message)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class CachedAnalysis(NamedTuple):
+    """A validated report and the delivery made when it was produced."""
+    report: MeetingReport
+    meeting_id: str = ""
+    response: str = ""
+
+
+class AnalysisCache:
+    """
+    In-process LRU cache of validated MeetingReports with a TTL.
+
+    Each report is kept with the meeting id it was delivered under and the
+    sinks' response, so a hit can be answered without delivering the same
+    report again. Entries older than ``ttl_seconds`` are treated as misses,
+    and the least recently used entry is dropped once ``capacity`` is
+    exceeded.
+    """
+
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS, capacity: int = DEFAULT_CAPACITY):
+        self.ttl_seconds = ttl_seconds
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, CachedAnalysis]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedAnalysis]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            cached = entry[1]
+            return cached._replace(report=cached.report.model_copy(deep=True))
+
+    def put(self, key: str, report: MeetingReport, meeting_id: str = "", response: str = "") -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), CachedAnalysis(report.model_copy(deep=True), meeting_id, response))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
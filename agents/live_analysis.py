@@ -0,0 +1,74 @@
+from typing import List, Optional, Sequence
+from agents.map_reduce import (
+    WINDOW_TOKENS, WindowAnalyzer, analyze_window_with_agent, estimate_tokens, merge_reports, split_transcript
+)
+from models.schemas import MeetingReport
+from tools.diarization import Word, format_turns
+from tools.telemetry import annotate, traced
+
+# New final transcript needed before the running report is refreshed
+MIN_UPDATE_TOKENS = 400
+
+
+class LiveAnalyzer:
+    """
+    Keeps a MeetingReport up to date while the transcript grows.
+
+    Only transcript text that is new since the last update is sent to the
+    model, as one or more windows; their partial reports are merged with
+    everything analyzed before by merge_reports, which needs no model call.
+    The cost of an update therefore depends on how much was said since the
+    previous one, not on how long the meeting has run.
+    """
+
+    def __init__(
+        self,
+        meeting_title: Optional[str] = None,
+        attendees: Optional[List[str]] = None,
+        min_update_tokens: int = MIN_UPDATE_TOKENS,
+        window_tokens: int = WINDOW_TOKENS,
+        analyze_window: WindowAnalyzer = analyze_window_with_agent
+    ):
+        self.meeting_title = meeting_title
+        self.attendees = list(attendees or [])
+        self.min_update_tokens = min_update_tokens
+        self.window_tokens = window_tokens
+        self.analyze_window = analyze_window
+        self.partials: List[MeetingReport] = []
+        self.report: Optional[MeetingReport] = None
+        self.analyzed_words = 0
+
+    def _message(self, window: str) -> str:
+        header = [f"This is part {len(self.partials) + 1} of a meeting that is still in progress. "
+                  "Report only what is said in this part."]
+        if self.meeting_title:
+            header.append(f"Meeting Title: {self.meeting_title}")
+        known = self.attendees + [a for a in (self.report.attendees if self.report else []) if a not in self.attendees]
+        if known:
+            header.append(f"Attendees: {', '.join(known)}")
+        return "\n\n".join(header + [f"Transcript:\n{window}"])
+
+    @traced("live.update")
+    async def update(self, words: Sequence[Word], final: bool = False) -> Optional[MeetingReport]:
+        """
+        Analyzes the words added since the last update, as speaker turns.
+
+        Args:
+            words: Final transcript words so far; earlier calls must have
+                received a prefix of them
+            final: Analyze whatever is new, however little
+
+        Returns:
+            The refreshed report, or None when there was too little new text
+        """
+        text = format_turns(words[self.analyzed_words:])
+        if not text.strip() or (not final and estimate_tokens(text) < self.min_update_tokens):
+            return None
+
+        windows = split_transcript(text, self.window_tokens)
+        annotate(words=len(words) - self.analyzed_words, windows=len(windows), final=final)
+        for window in windows:
+            self.partials.append(await self.analyze_window(self._message(window)))
+        self.analyzed_words = len(words)
+        self.report = merge_reports(self.partials, self.meeting_title)
+        return self.report
@@ -0,0 +1,240 @@
+import asyncio
+import re
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+from agents.analyst_agent.agent import analyst_agent
+from models.schemas import ActionItem, MeetingReport
+from tools.telemetry import TelemetryPlugin, traced
+
+# Transcripts estimated above this many tokens are analyzed in windows
+MAP_REDUCE_THRESHOLD_TOKENS = 60000
+WINDOW_TOKENS = 12000
+MAX_CONCURRENCY = 4
+
+# Rough English average; only used to budget windows, never billed
+CHARS_PER_TOKEN = 4
+
+PRIORITY_RANK = {"high": 0, "medium": 1, "low": 2}
+
+# Introduces snippets recalled from the meeting memory in a prompt
+RELATED_HEADING = "Related past meetings (context only):"
+
+_TURN_PATTERN = re.compile(r"\n+(?=[A-Z][\w .'-]{0,40}:)|\n{2,}")
+_SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+")
+
+WindowAnalyzer = Callable[[str], Awaitable[MeetingReport]]
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _split_oversized(text: str, max_chars: int) -> List[str]:
+    """Splits a single long turn on sentence, then word, boundaries."""
+    pieces = []
+    current = ""
+    for sentence in _SENTENCE_PATTERN.split(text):
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            pieces.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if current and len(current) + len(sentence) + 1 > max_chars:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}".strip()
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_transcript(transcript: str, window_tokens: int = WINDOW_TOKENS) -> List[str]:
+    """
+    Splits a transcript into token-budgeted windows on speaker-turn boundaries.
+
+    A turn starts at a line shaped like "Name: ..." or after a blank line.
+    Turns longer than a whole window are split on sentence boundaries.
+
+    Args:
+        transcript: Full transcript text
+        window_tokens: Token budget of each window
+
+    Returns:
+        Windows in transcript order
+    """
+    max_chars = window_tokens * CHARS_PER_TOKEN
+    windows = []
+    current: List[str] = []
+    current_chars = 0
+
+    for turn in _TURN_PATTERN.split(transcript.strip()):
+        turn = turn.strip()
+        if not turn:
+            continue
+        for piece in (_split_oversized(turn, max_chars) if len(turn) > max_chars else [turn]):
+            if current and current_chars + len(piece) + 1 > max_chars:
+                windows.append("\n".join(current))
+                current, current_chars = [], 0
+            current.append(piece)
+            current_chars += len(piece) + 1
+
+    if current:
+        windows.append("\n".join(current))
+    return windows
+
+
+def _key(text: str) -> str:
+    return re.sub(r"\W+", " ", text.lower()).strip()
+
+
+def _dedupe(values: List[str]) -> List[str]:
+    seen = set()
+    unique = []
+    for value in values:
+        key = _key(value)
+        if key and key not in seen:
+            seen.add(key)
+            unique.append(value.strip())
+    return unique
+
+
+def _merge_action_items(items: List[ActionItem]) -> List[ActionItem]:
+    """Collapses repeats of the same task, keeping the most specific fields."""
+    merged: Dict[str, ActionItem] = {}
+    for item in items:
+        key = _key(item.task)
+        existing = merged.get(key)
+        if existing is None:
+            merged[key] = item.model_copy()
+            continue
+        existing.assignee = existing.assignee or item.assignee
+        existing.deadline = existing.deadline or item.deadline
+        if PRIORITY_RANK.get(item.priority, 1) < PRIORITY_RANK.get(existing.priority, 1):
+            existing.priority = item.priority
+    return list(merged.values())
+
+
+def merge_reports(partials: List[MeetingReport], meeting_title: Optional[str] = None) -> MeetingReport:
+    """
+    Reduces partial reports of consecutive windows into one report.
+
+    Lists are concatenated in window order and deduplicated
+    case-insensitively; the summary keeps the opening sentence of each
+    partial summary so it grows with window count, not transcript length.
+
+    Args:
+        partials: Reports of each window, in transcript order
+        meeting_title: Title entered by the user, preferred when given
+
+    Returns:
+        Merged MeetingReport
+    """
+    if len(partials) == 1:
+        return partials[0]
+
+    sentences = [_SENTENCE_PATTERN.split(p.summary.strip())[0] for p in partials if p.summary.strip()]
+
+    return MeetingReport(
+        meeting_title=meeting_title or next((p.meeting_title for p in partials if p.meeting_title), "Meeting"),
+        date=next((p.date for p in partials if p.date), ""),
+        attendees=_dedupe([a for p in partials for a in p.attendees]),
+        summary=" ".join(_dedupe(sentences)),
+        key_topics=_dedupe([t for p in partials for t in p.key_topics]),
+        action_items=_merge_action_items([i for p in partials for i in p.action_items]),
+        decisions_made=_dedupe([d for p in partials for d in p.decisions_made])
+    )
+
+
+_window_runner: Optional[Runner] = None
+_window_sessions: Optional[InMemorySessionService] = None
+
+
+@traced("analyze.window")
+async def analyze_window_with_agent(message: str) -> MeetingReport:
+    """Runs the analyst agent alone (no save step) on one window."""
+    global _window_runner, _window_sessions
+    if _window_runner is None:
+        _window_sessions = InMemorySessionService()
+        _window_runner = Runner(
+            agent=analyst_agent,
+            app_name="lecturelink_map",
+            session_service=_window_sessions,
+            plugins=[TelemetryPlugin()]
+        )
+
+    session_id = uuid.uuid4().hex
+    await _window_sessions.create_session(app_name="lecturelink_map", user_id="map", session_id=session_id)
+    try:
+        report = None
+        async for event in _window_runner.run_async(
+            user_id="map",
+            session_id=session_id,
+            new_message=types.Content(role='user', parts=[types.Part(text=message)])
+        ):
+            state_delta = event.actions.state_delta if event.actions else {}
+            if "structured_report" in state_delta:
+                report = MeetingReport.model_validate(state_delta["structured_report"])
+        if report is None:
+            raise RuntimeError("Analyst returned no structured report for window")
+        return report
+    finally:
+        await _window_sessions.delete_session(app_name="lecturelink_map", user_id="map", session_id=session_id)
+
+
+async def map_reduce_analyze(
+    transcript: str,
+    meeting_title: Optional[str] = None,
+    attendees: Optional[List[str]] = None,
+    window_tokens: int = WINDOW_TOKENS,
+    max_concurrency: int = MAX_CONCURRENCY,
+    analyze_window: WindowAnalyzer = analyze_window_with_agent,
+    on_window: Optional[Callable[[MeetingReport, int, int], None]] = None,
+    related: str = ""
+) -> MeetingReport:
+    """
+    Analyzes a long transcript as concurrent windows and merges the results.
+
+    Latency grows with ceil(windows / max_concurrency) rather than with
+    transcript length, and every prompt stays within ``window_tokens``.
+
+    Args:
+        transcript: Full transcript text
+        meeting_title: Optional title entered by the user
+        attendees: Optional list of attendee names
+        window_tokens: Token budget of each window
+        max_concurrency: Maximum windows analyzed at once
+        analyze_window: Coroutine turning a window message into a report
+        on_window: Called after each window with the merge of the windows
+            finished so far, the finished count and the window count
+        related: Snippets of related past meetings, given to every window
+
+    Returns:
+        Merged MeetingReport
+    """
+    windows = split_transcript(transcript, window_tokens)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    finished: Dict[int, MeetingReport] = {}
+
+    async def run_window(index: int, window: str) -> MeetingReport:
+        header = [f"This is part {index + 1} of {len(windows)} of a longer meeting transcript."]
+        if meeting_title:
+            header.append(f"Meeting Title: {meeting_title}")
+        if attendees:
+            header.append(f"Attendees: {', '.join(attendees)}")
+        if related:
+            header.append(f"{RELATED_HEADING}\n{related}")
+        async with semaphore:
+            report = await analyze_window("\n\n".join(header + [f"Transcript:\n{window}"]))
+
+        finished[index] = report
+        if on_window is not None:
+            merged = merge_reports([finished[i] for i in sorted(finished)], meeting_title)
+            on_window(merged, len(finished), len(windows))
+        return report
+
+    partials = await asyncio.gather(*(run_window(i, w) for i, w in enumerate(windows)))
+    return merge_reports(list(partials), meeting_title)
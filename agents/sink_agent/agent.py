@@ -0,0 +1,65 @@
+import json
+from typing import AsyncGenerator, Dict, Optional
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+from models.schemas import MeetingReport
+from tools.local_storage import transcript_from_content
+from agents.sink_agent.sinks import Delivery, Sink, default_recipients, describe_results, new_meeting_id, run_sinks
+
+REPORT_STATE_KEY = "structured_report"
+RECIPIENTS_STATE_KEY = "email_recipients"
+RESULTS_STATE_KEY = "sink_results"
+MEETING_ID_STATE_KEY = "delivered_meeting_id"
+
+
+class ReportSinkAgent(BaseAgent):
+    """
+    Delivers the analyst's report to its sinks without a model call.
+
+    Reads the validated MeetingReport from session state and runs every
+    sink concurrently. Replaces the LLM action agent, which spent a full
+    model round-trip only to call save_report_locally.
+    """
+
+    sinks: Optional[Dict[str, Sink]] = None
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        value = ctx.session.state.get(REPORT_STATE_KEY)
+        meeting_id = None
+        if value is None:
+            text = "No structured report in session state; nothing to deliver."
+            results = {}
+        else:
+            if isinstance(value, str):
+                value = json.loads(value)
+            report = MeetingReport.model_validate(value)
+            recipients = ctx.session.state.get(RECIPIENTS_STATE_KEY) or default_recipients()
+            meeting_id = new_meeting_id()
+            results = await run_sinks(
+                Delivery(
+                    meeting_id=meeting_id,
+                    report=report,
+                    report_json=report.model_dump_json(indent=2),
+                    session_id=ctx.session.id,
+                    transcript=transcript_from_content(ctx.user_content),
+                    recipients=tuple(recipients)
+                ),
+                self.sinks
+            )
+            text = describe_results(results)
+
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role='model', parts=[types.Part(text=text)]),
+            actions=EventActions(state_delta={RESULTS_STATE_KEY: results, MEETING_ID_STATE_KEY: meeting_id})
+        )
+
+
+sink_agent = ReportSinkAgent(
+    name="meeting_report_sinks",
+    description="Saves, uploads and emails the structured meeting report"
+)
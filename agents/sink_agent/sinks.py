@@ -0,0 +1,122 @@
+import asyncio
+import os
+import uuid
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from models.schemas import MeetingReport
+from tools.email_sender import send_report_email
+from tools.local_storage import store_report
+from tools.meeting_memory import get_meeting_memory
+from tools.storage import save_report_to_storage
+from tools.telemetry import traced
+
+# Comma-separated addresses that receive every report by email
+RECIPIENTS_ENV = "REPORT_EMAIL_RECIPIENTS"
+
+
+class Delivery(NamedTuple):
+    """Everything a sink may need to deliver one validated report."""
+    meeting_id: str
+    report: MeetingReport
+    report_json: str
+    session_id: Optional[str] = None
+    transcript: str = ""
+    recipients: Tuple[str, ...] = ()
+
+
+Sink = Callable[[Delivery], Dict[str, str]]
+
+
+def new_meeting_id() -> str:
+    """Identifier a report is delivered under by every sink."""
+    return f"meeting_{uuid.uuid4().hex[:12]}"
+
+
+def _skipped(reason: str) -> Dict[str, str]:
+    return {"status": "skipped", "message": reason}
+
+
+def local_sink(delivery: Delivery) -> Dict[str, str]:
+    """Writes the report file and indexes it for the UI and search."""
+    return store_report(
+        delivery.report_json,
+        delivery.meeting_id,
+        delivery.session_id,
+        delivery.transcript
+    )
+
+
+def gcs_sink(delivery: Delivery) -> Dict[str, str]:
+    """Uploads the report to GCS_BUCKET_NAME, when a bucket is configured."""
+    if not os.getenv('GCS_BUCKET_NAME'):
+        return _skipped("GCS_BUCKET_NAME is not set")
+    return save_report_to_storage(delivery.report_json, delivery.meeting_id)
+
+
+def email_sink(delivery: Delivery) -> Dict[str, str]:
+    """Queues the report email, when there is anyone to send it to."""
+    if not delivery.recipients:
+        return _skipped("No email recipients configured")
+    if not os.getenv('SENDGRID_API_KEY'):
+        return _skipped("SENDGRID_API_KEY is not set")
+    return send_report_email(
+        list(delivery.recipients),
+        delivery.report_json,
+        delivery.report.meeting_title,
+        delivery.meeting_id
+    )
+
+
+def memory_sink(delivery: Delivery) -> Dict[str, str]:
+    """Adds the meeting to the cross-meeting memory the analyst recalls from."""
+    added = get_meeting_memory().add_meeting(delivery.meeting_id, delivery.report, delivery.transcript)
+    return {"status": "success", "message": f"{added} snippets remembered"}
+
+
+DEFAULT_SINKS: Dict[str, Sink] = {
+    "local": local_sink,
+    "gcs": gcs_sink,
+    "email": email_sink,
+    "memory": memory_sink,
+}
+
+
+def default_recipients() -> List[str]:
+    return [r.strip() for r in os.getenv(RECIPIENTS_ENV, "").split(",") if r.strip()]
+
+
+async def run_sinks(
+    delivery: Delivery,
+    sinks: Optional[Dict[str, Sink]] = None
+) -> Dict[str, Dict[str, str]]:
+    """
+    Delivers one report to every sink concurrently.
+
+    Sinks do blocking I/O, so each runs in a worker thread. A sink that
+    raises is reported as an error without affecting the others.
+
+    Args:
+        delivery: Report to deliver
+        sinks: Sinks by name; defaults to DEFAULT_SINKS
+
+    Returns:
+        Result dictionary of each sink, by sink name
+    """
+    sinks = DEFAULT_SINKS if sinks is None else sinks
+    outcomes = await asyncio.gather(
+        *(asyncio.to_thread(traced(f"sink.{name}")(sink), delivery) for name, sink in sinks.items()),
+        return_exceptions=True
+    )
+    return {
+        name: outcome if not isinstance(outcome, BaseException)
+        else {"status": "error", "error_message": str(outcome)}
+        for name, outcome in zip(sinks, outcomes)
+    }
+
+
+def describe_results(results: Dict[str, Dict[str, str]]) -> str:
+    """One line per sink, used as the workflow's final response."""
+    lines = []
+    for name, result in results.items():
+        detail = result.get("message") or result.get("error_message") or ""
+        lines.append(f"{name}: {result.get('status', 'unknown')}" + (f" - {detail}" if detail else ""))
+    return "\n".join(lines)
@@ -1,15 +1,15 @@
 from google.adk.agents import SequentialAgent
 from agents.analyst_agent.agent import analyst_agent
-from agents.action_agent.agent import action_agent
+from agents.sink_agent.agent import sink_agent
 
-# Sequential Workflow - Orchestrates the two agents
+# Sequential Workflow - One model call, then deterministic delivery
 meeting_workflow = SequentialAgent(
     name="meeting_transcription_workflow",
-    description="Complete workflow: analyze transcript → execute actions",
+    description="Complete workflow: analyze transcript → deliver report",
     
     sub_agents=[
         analyst_agent,    # Runs FIRST - creates structured report
-        action_agent      # Runs SECOND - executes actions with tools
+        sink_agent        # Runs SECOND - saves/uploads/emails, no LLM
     ]
 )
 
@@ -1,15 +1,13 @@
 import streamlit as st
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from google.adk.memory import InMemoryMemoryService
-from agents.workflow import root_agent
-from tools.transcription import transcribe_audio
-from google.genai import types
-import asyncio
+from services.job_queue import JobQueue, ATTACHED, QUEUED, RUNNING, SUCCEEDED, CANCELLED
+from services.meeting_jobs import cancel_meeting_job, save_upload, submit_meeting_job
+from tools.report_store import get_report_store
+from tools.report_search import get_search_index
+from tools.telemetry import get_telemetry
 import os
 from dotenv import load_dotenv
 import uuid
-import tempfile
+from datetime import date, timedelta
 import json
 
 # Load environment variables
@@ -25,26 +23,106 @@ st.set_page_config(
 st.title("🎙️ LectureLink - AI Meeting Transcription")
 st.markdown("Upload audio, get structured reports with action items!")
 
-# Initialize session state
+# Initialize session state (kept in the URL so a reload reattaches to running jobs)
 if 'session_id' not in st.session_state:
-    st.session_state.session_id = str(uuid.uuid4())
+    st.session_state.session_id = st.query_params.get("session", str(uuid.uuid4()))
+    st.query_params["session"] = st.session_state.session_id
+if 'job_id' not in st.session_state and "job" in st.query_params:
+    st.session_state.job_id = st.query_params["job"]
 
-# Initialize services
+# Initialize services; transcription and analysis run in worker.py processes
 @st.cache_resource
 def initialize_services():
-    session_service = InMemorySessionService()
-    memory_service = InMemoryMemoryService()
+    return JobQueue()
+
+job_queue = initialize_services()
+report_store = get_report_store()
+search_index = get_search_index()
+
+PRIORITY_EMOJI = {"high": "🔴", "medium": "🟡", "low": "🟢"}
+
+def render_report(report_data, counts=None):
+    """Renders a report; missing fields are tolerated so partial reports can stream in."""
+    counts = counts or {}
+    attendees_list = report_data.get('attendees') or []
+    topics = report_data.get('key_topics') or []
+    action_items = [i for i in report_data.get('action_items') or [] if isinstance(i, dict) and i.get('task')]
+    decisions = report_data.get('decisions_made') or []
     
-    runner = Runner(
-        agent=root_agent,
-        app_name="lecturelink_app",
-        session_service=session_service,
-        memory_service=memory_service
-    )
+    # Display structured report
+    st.markdown("### 📋 Meeting Report")
+    
+    # Summary card
+    st.info(f"**{report_data.get('meeting_title', '…')}**\n\n{report_data.get('summary', '…')}")
+    
+    # Metrics
+    col_a, col_b, col_c = st.columns(3)
+    with col_a:
+        st.metric("Attendees", counts.get('attendee_count', len(attendees_list)))
+    with col_b:
+        st.metric("Topics", counts.get('topic_count', len(topics)))
+    with col_c:
+        st.metric("Action Items", counts.get('action_item_count', len(action_items)))
+    
+    # Tabs for different sections
+    tab1, tab2, tab3, tab4, tab5 = st.tabs([
+        "📝 Summary", "👥 Attendees", "💡 Topics", "✅ Actions", "🎯 Decisions"
+    ])
     
-    return runner, session_service
+    with tab1:
+        st.markdown(f"**Date:** {report_data.get('date', '…')}")
+        st.markdown(report_data.get('summary', ''))
+    
+    with tab2:
+        for attendee in attendees_list:
+            st.markdown(f"- {attendee}")
+    
+    with tab3:
+        for topic in topics:
+            st.markdown(f"- {topic}")
+    
+    with tab4:
+        for item in action_items:
+            priority_emoji = PRIORITY_EMOJI.get(item.get('priority'), "⚪")
+            st.markdown(f"{priority_emoji} **{item['task']}**")
+            if item.get('assignee'):
+                st.markdown(f"  - Assigned to: {item['assignee']}")
+            if item.get('deadline'):
+                st.markdown(f"  - Deadline: {item['deadline']}")
+            st.markdown("")
+    
+    with tab5:
+        if decisions:
+            for decision in decisions:
+                st.markdown(f"- {decision}")
+        else:
+            st.info("No specific decisions recorded")
 
-runner, session_service = initialize_services()
+@st.fragment(run_every=5)
+def stage_timings():
+    """Per-stage latency over the last hour, recorded by every worker."""
+    telemetry = get_telemetry()
+    stats = telemetry.stage_stats(since_seconds=3600)
+    if not stats:
+        st.caption("No pipeline runs in the last hour")
+        return
+    st.dataframe(
+        [
+            {"stage": name, "runs": s["count"], "p50 s": round(s["p50"], 2),
+             "p95 s": round(s["p95"], 2), "last s": round(s["last"], 2), "errors": s["errors"]}
+            for name, s in sorted(stats.items())
+        ],
+        hide_index=True,
+        use_container_width=True
+    )
+    counters = telemetry.counters()
+    total = lambda metric: int(sum(counters.get(metric, {}).values()))  # noqa: E731
+    st.caption(f"Model tokens: {total('tokens_total'):,}")
+    st.caption(
+        f"Transcript cache: {total('transcript_cache_hits_total'):,} hits, "
+        f"{total('transcript_cache_misses_total'):,} misses, "
+        f"{total('transcript_cache_bytes_saved_total') / 1e6:,.1f} MB of audio not re-sent"
+    )
 
 # Sidebar
 with st.sidebar:
@@ -53,9 +131,19 @@ with st.sidebar:
     
     st.markdown("---")
     st.markdown("### 📊 Stats")
-    if os.path.exists("reports"):
-        report_count = len([f for f in os.listdir("reports") if f.endswith('.json')])
-        st.metric("Reports Generated", report_count)
+    st.metric("Reports Generated", report_store.count())
+    
+    queue_depth = job_queue.depth()
+    st.metric(
+        "Jobs In Progress",
+        queue_depth.get(RUNNING, 0),
+        help=f"{queue_depth.get(QUEUED, 0)} waiting for a worker, "
+             f"{queue_depth.get(ATTACHED, 0)} sharing an identical upload's job"
+    )
+    
+    st.markdown("---")
+    st.markdown("### ⏱️ Stage Timings")
+    stage_timings()
 
 # Main interface
 col1, col2 = st.columns([1, 1])
@@ -80,184 +168,106 @@ with col1:
         
         # Process button
         if st.button("🚀 Analyze Meeting", type="primary", use_container_width=True):
-            
-            with st.spinner("🔄 Processing..."):
-                try:
-                    # Save uploaded file temporarily
-                    with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(audio_file.name)[1]) as tmp_file:
-                        tmp_file.write(audio_file.read())
-                        tmp_path = tmp_file.name
-                    
-                    # Step 1: Transcribe audio
-                    progress = st.progress(0)
-                    status = st.empty()
-                    
-                    status.info("🎤 Step 1/3: Transcribing audio...")
-                    progress.progress(33)
-                    
-                    transcription_result = transcribe_audio(tmp_path)
-                    
-                    if transcription_result['status'] != 'success':
-                        st.error(f"❌ Transcription failed: {transcription_result.get('error_message')}")
-                        st.stop()
-                    
-                    transcript = transcription_result['transcript']
-                    
-                    # Step 2: Analyze
-                    status.info("🤖 Step 2/3: Analyzing transcript with AI...")
-                    progress.progress(66)
-                    
-                    # Prepare context
-                    context_parts = [f"Transcript:\n{transcript}"]
-                    if meeting_title:
-                        context_parts.insert(0, f"Meeting Title: {meeting_title}")
-                    if attendees:
-                        attendee_list = [a.strip() for a in attendees.split('\n') if a.strip()]
-                        context_parts.insert(1 if meeting_title else 0, f"Attendees: {', '.join(attendee_list)}")
-                    
-                    user_message = "\n\n".join(context_parts)
-                    
-                    # Run agent
-                    async def run_agent():
-                        # Get or create session
-                        session_id = st.session_state.session_id
-                        
-                        try:
-                            await session_service.create_session(
-                                app_name="lecturelink_app",
-                                user_id="streamlit_user",
-                                session_id=session_id
-                            )
-                        except:
-                            pass  # Session might already exist
-                        
-                        # Run
-                        content = types.Content(
-                            role='user',
-                            parts=[types.Part(text=user_message)]
-                        )
-                        
-                        final_response = None
-                        async for event in runner.run_async(
-                            user_id="streamlit_user",
-                            session_id=session_id,
-                            new_message=content
-                        ):
-                            if hasattr(event, 'is_final_response') and event.is_final_response():
-                                if hasattr(event, 'content') and event.content and event.content.parts:
-                                    final_response = event.content.parts[0].text
-                        
-                        return final_response
-                    
-                    response = asyncio.run(run_agent())
-                    
-                    # Step 3: Complete
-                    status.success("✅ Step 3/3: Analysis complete!")
-                    progress.progress(100)
-                    
-                    # Store results
-                    st.session_state.last_response = response
-                    st.session_state.transcript = transcript
-                    
-                    # Clean up
-                    os.unlink(tmp_path)
-                    
-                    # Success message
-                    st.success("🎉 Meeting analyzed successfully!")
-                    
-                except Exception as e:
-                    st.error(f"❌ Error: {str(e)}")
-                    import traceback
-                    with st.expander("🐛 Debug Info"):
-                        st.code(traceback.format_exc())
+            try:
+                # Stream the upload to disk in chunks; the job takes ownership of it
+                upload_path = save_upload(audio_file, os.path.splitext(audio_file.name)[1])
+                
+                # Prepare context
+                attendee_list = [a.strip() for a in attendees.split('\n') if a.strip()]
+                
+                job_id = submit_meeting_job(
+                    job_queue,
+                    upload_path,
+                    session_id=st.session_state.session_id,
+                    meeting_title=meeting_title,
+                    attendees=attendee_list
+                )
+                st.session_state.job_id = job_id
+                st.query_params["job"] = job_id
+                
+            except Exception as e:
+                st.error(f"❌ Error: {str(e)}")
+                import traceback
+                with st.expander("🐛 Debug Info"):
+                    st.code(traceback.format_exc())
+
+@st.fragment(run_every=1)
+def job_panel():
+    """Polls the current job, previewing the report until it finishes."""
+    job = job_queue.get(st.session_state.job_id)
+    
+    if job is not None and job['status'] in (QUEUED, RUNNING):
+        st.progress(int(job['progress'] * 100))
+        if job['status'] == QUEUED:
+            st.info("⏳ Queued — waiting for a worker (start one with `python worker.py`)")
+        else:
+            st.info(f"🔄 {job['message'] or 'Processing...'}")
+        if st.button("✖ Cancel", key="cancel_job"):
+            cancel_meeting_job(job_queue, job['id'])
+        partial = job['partial'] or {}
+        if 'partial_transcript' in partial:
+            # Still transcribing: the latest stitched text, as it arrives
+            st.caption(partial['partial_transcript'])
+        elif partial:
+            render_report(partial)
+        return
+    
+    # Finished (or unknown): hand over to the full-page results view
+    del st.session_state.job_id
+    st.query_params.pop("job", None)
+    if job is not None and job['status'] == SUCCEEDED:
+        st.session_state.last_response = job['result']['response']
+        st.session_state.transcript = job['result']['transcript']
+        st.session_state.last_report = job['result'].get('report')
+    elif job is not None and job['status'] == CANCELLED:
+        st.session_state.job_error = "Analysis cancelled"
+    elif job is not None:
+        st.session_state.job_error = job['error']
+    st.rerun()
 
 with col2:
     st.header("📊 Results")
     
-    if 'last_response' in st.session_state:
+    if 'job_error' in st.session_state:
+        st.error(f"❌ {st.session_state.pop('job_error')}")
+    
+    if 'job_id' in st.session_state:
+        job_panel()
+    
+    elif 'last_response' in st.session_state:
         
         # Show the report path
         st.success(st.session_state.last_response)
         
         # Try to load and display the report
         try:
-            # Find the most recent report
-            if os.path.exists("reports"):
-                reports = sorted(
-                    [f for f in os.listdir("reports") if f.endswith('.json')],
-                    key=lambda x: os.path.getmtime(os.path.join("reports", x)),
-                    reverse=True
+            # A job shared with an identical upload carries its report, which
+            # was stored under the session that submitted first
+            report_data = st.session_state.get('last_report')
+            latest_entry = None
+            if report_data is None:
+                # Find the most recent report of this session
+                latest_entry = report_store.latest(session_id=st.session_state.session_id)
+                report_data = report_store.load(latest_entry) if latest_entry else None
+            
+            if report_data:
+                latest_report = f"{latest_entry['meeting_id']}.json" if latest_entry else "meeting_report.json"
+                
+                render_report(report_data, counts=latest_entry)
+                
+                # Download button
+                st.download_button(
+                    label="📥 Download JSON Report",
+                    data=json.dumps(report_data, indent=2),
+                    file_name=latest_report,
+                    mime="application/json"
                 )
                 
-                if reports:
-                    latest_report = reports[0]
-                    report_path = os.path.join("reports", latest_report)
-                    
-                    with open(report_path, 'r', encoding='utf-8') as f:
-                        report_data = json.load(f)
-                    
-                    # Display structured report
-                    st.markdown("### 📋 Meeting Report")
-                    
-                    # Summary card
-                    st.info(f"**{report_data['meeting_title']}**\n\n{report_data['summary']}")
-                    
-                    # Metrics
-                    col_a, col_b, col_c = st.columns(3)
-                    with col_a:
-                        st.metric("Attendees", len(report_data['attendees']))
-                    with col_b:
-                        st.metric("Topics", len(report_data['key_topics']))
-                    with col_c:
-                        st.metric("Action Items", len(report_data['action_items']))
-                    
-                    # Tabs for different sections
-                    tab1, tab2, tab3, tab4, tab5 = st.tabs([
-                        "📝 Summary", "👥 Attendees", "💡 Topics", "✅ Actions", "🎯 Decisions"
-                    ])
-                    
-                    with tab1:
-                        st.markdown(f"**Date:** {report_data['date']}")
-                        st.markdown(report_data['summary'])
-                    
-                    with tab2:
-                        for attendee in report_data['attendees']:
-                            st.markdown(f"- {attendee}")
-                    
-                    with tab3:
-                        for topic in report_data['key_topics']:
-                            st.markdown(f"- {topic}")
-                    
-                    with tab4:
-                        for item in report_data['action_items']:
-                            priority_emoji = {"high": "🔴", "medium": "🟡", "low": "🟢"}.get(item['priority'], "⚪")
-                            st.markdown(f"{priority_emoji} **{item['task']}**")
-                            if item.get('assignee'):
-                                st.markdown(f"  - Assigned to: {item['assignee']}")
-                            if item.get('deadline'):
-                                st.markdown(f"  - Deadline: {item['deadline']}")
-                            st.markdown("")
-                    
-                    with tab5:
-                        if report_data.get('decisions_made'):
-                            for decision in report_data['decisions_made']:
-                                st.markdown(f"- {decision}")
-                        else:
-                            st.info("No specific decisions recorded")
-                    
-                    # Download button
-                    st.download_button(
-                        label="📥 Download JSON Report",
-                        data=json.dumps(report_data, indent=2),
-                        file_name=latest_report,
-                        mime="application/json"
-                    )
-                    
-                    # Show transcript
-                    with st.expander("📜 View Transcript"):
-                        if 'transcript' in st.session_state:
-                            st.text_area("Transcript", st.session_state.transcript, height=200)
-        
+                # Show transcript
+                with st.expander("📜 View Transcript"):
+                    if 'transcript' in st.session_state:
+                        st.text_area("Transcript", st.session_state.transcript, height=200)
+    
         except Exception as e:
             st.error(f"Could not load report: {e}")
             
@@ -274,6 +284,103 @@ with col2:
         - **Full Transcript** - Complete text version
         """)
 
+# Search across all saved reports
+st.markdown("---")
+st.header("🔎 Search Reports")
+
+facets = search_index.facets()
+col_q, col_assignee, col_priority, col_deadline = st.columns([2, 1, 1, 1])
+with col_q:
+    search_query = st.text_input("Keywords", placeholder="e.g. Q4 launch")
+with col_assignee:
+    search_assignee = st.selectbox(
+        "Assignee",
+        [None] + list(facets['assignee']),
+        format_func=lambda name: "Any" if name is None else f"{name} ({facets['assignee'][name]})"
+    )
+with col_priority:
+    search_priority = st.selectbox(
+        "Priority",
+        [None, "high", "medium", "low"],
+        format_func=lambda p: "Any" if p is None else f"{p} ({facets['priority'].get(p, 0)})"
+    )
+with col_deadline:
+    search_deadline = st.text_input("Deadline contains", placeholder="e.g. Friday")
+
+search_mode = st.radio("Search in", ["Meetings", "Action Items"], horizontal=True)
+
+if search_query or search_assignee or search_priority or search_deadline:
+    if search_mode == "Meetings":
+        matches = search_index.search_reports(
+            search_query,
+            assignee=search_assignee,
+            priority=search_priority
+        )
+        for match in matches:
+            st.markdown(f"**{match['title'] or match['meeting_id']}** — {match['date']}")
+            if match['snippet']:
+                st.caption(match['snippet'])
+    else:
+        matches = search_index.search_action_items(
+            search_query,
+            assignee=search_assignee,
+            priority=search_priority,
+            deadline=search_deadline
+        )
+        for match in matches:
+            priority_emoji = PRIORITY_EMOJI.get(match['priority'], "⚪")
+            details = " · ".join(filter(None, [match['assignee'], match['deadline'], match['title']]))
+            st.markdown(f"{priority_emoji} **{match['task']}** — {details}")
+
+    if not matches:
+        st.info("No matching reports")
+
+# Open action items across all meetings, by when they are due
+st.markdown("---")
+st.header("📋 Action Item Tracker")
+
+col_today, col_horizon, col_owner, col_level = st.columns(4)
+with col_today:
+    tracker_today = st.date_input("As of", value=date.today())
+with col_horizon:
+    tracker_horizon = st.slider("Upcoming days", 1, 60, 14)
+with col_owner:
+    tracker_assignee = st.selectbox("Owner", [None] + list(facets['assignee']),
+                                    format_func=lambda name: "Anyone" if name is None else name)
+with col_level:
+    tracker_priority = st.selectbox("Level", [None, "high", "medium", "low"],
+                                    format_func=lambda p: "Any" if p is None else p)
+
+due_counts = search_index.due_counts(tracker_today, tracker_horizon, tracker_assignee, tracker_priority)
+overdue_col, today_col, upcoming_col, undated_col = st.columns(4)
+overdue_col.metric("Overdue", due_counts['overdue'])
+today_col.metric("Due today", due_counts['due_today'])
+upcoming_col.metric(f"Next {tracker_horizon} days", due_counts['upcoming'])
+undated_col.metric("No date", due_counts['undated'])
+
+
+def tracker_list(items):
+    for item in items:
+        priority_emoji = PRIORITY_EMOJI.get(item['priority'], "⚪")
+        details = " · ".join(filter(None, [item['assignee'], item['due_date'], item['title']]))
+        if st.checkbox(f"{priority_emoji} **{item['task']}** — {details}", key=f"done_{item['id']}"):
+            search_index.set_action_item_done(item['id'])
+            st.rerun()
+
+
+tab_overdue, tab_upcoming = st.tabs(["Overdue", "Upcoming"])
+with tab_overdue:
+    tracker_list(search_index.due_action_items(
+        due_before=tracker_today, assignee=tracker_assignee, priority=tracker_priority
+    ))
+with tab_upcoming:
+    tracker_list(search_index.due_action_items(
+        due_from=tracker_today,
+        due_before=tracker_today + timedelta(days=tracker_horizon),
+        assignee=tracker_assignee,
+        priority=tracker_priority
+    ))
+
 # Footer
 st.markdown("---")
 st.markdown("Built with Google ADK, Streamlit, and Gemini 2.5 | LectureLink MVP")
\ No newline at end of file
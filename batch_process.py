@@ -0,0 +1,250 @@
+"""
+Headless batch processing for bulk recordings.
+
+Transcribes and analyzes every recording in a directory or manifest,
+pipelining the two stages: transcription runs on a process (or thread)
+pool while finished transcripts are analyzed concurrently on the event
+loop. Completed items are appended to a checkpoint file so reruns skip
+them.
+
+Usage:
+    python batch_process.py recordings/
+    python batch_process.py manifest.jsonl --transcribe-workers 4 --analyze-concurrency 8
+
+A manifest holds one JSON object per line with a "path" and optional
+"meeting_title" and "attendees" (list of names).
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+from dotenv import load_dotenv
+from tools.clients import get_client_registry
+
+AUDIO_EXTENSIONS = ('.wav', '.mp3', '.m4a', '.ogg', '.raw')
+CHECKPOINT_FILE = "batch_checkpoint.jsonl"
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile; 0.0 for an empty list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, math.ceil(fraction * len(ordered)) - 1)
+    return ordered[rank]
+
+
+def load_items(source: str) -> List[Dict[str, Any]]:
+    """
+    Reads the work list from a directory of recordings or a JSONL manifest.
+
+    Args:
+        source: Directory path or manifest file path
+
+    Returns:
+        List of items with at least a "path" key
+    """
+    if os.path.isdir(source):
+        return [
+            {"path": os.path.join(source, name)}
+            for name in sorted(os.listdir(source))
+            if name.lower().endswith(AUDIO_EXTENSIONS)
+        ]
+
+    items = []
+    base = os.path.dirname(os.path.abspath(source))
+    with open(source, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                item = json.loads(line)
+                item["path"] = os.path.join(base, item["path"])
+                items.append(item)
+    return items
+
+
+def item_key(item: Dict[str, Any]) -> str:
+    """Identifies an input by path, size and mtime so edited files are redone."""
+    stat = os.stat(item["path"])
+    return f"{os.path.abspath(item['path'])}:{stat.st_size}:{int(stat.st_mtime)}"
+
+
+def load_checkpoint(path: str) -> Dict[str, Dict[str, Any]]:
+    done = {}
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # Partial line from an interrupted run
+                if record.get("status") == "success":
+                    done[record["key"]] = record
+    return done
+
+
+def _transcribe(path: str, attendees: Optional[List[str]] = None) -> Dict[str, Any]:
+    # Imported here so process-pool workers only load what they need
+    from tools.transcription import transcribe_audio
+
+    started = time.perf_counter()
+    result = transcribe_audio(path, attendees=attendees)
+    result["elapsed"] = time.perf_counter() - started
+    return result
+
+
+async def run_batch(
+    items: List[Dict[str, Any]],
+    checkpoint_path: str = CHECKPOINT_FILE,
+    transcribe_workers: int = 2,
+    analyze_concurrency: int = 4,
+    use_processes: bool = True
+) -> Dict[str, Any]:
+    """
+    Processes items through transcription and analysis.
+
+    Args:
+        items: Work list from load_items
+        checkpoint_path: JSONL file recording completed items
+        transcribe_workers: Size of the transcription pool
+        analyze_concurrency: Maximum concurrent workflow runs
+        use_processes: Use a process pool (else threads) for transcription
+
+    Returns:
+        Throughput summary
+    """
+    from google.adk.runners import Runner
+    from agents.analysis import APP_NAME, analyze_transcript
+    from agents.analyst_agent.cache import AnalysisCache
+    from agents.workflow import root_agent
+    from services.memory_service import PersistentMemoryService
+    from services.session_service import PersistentSessionService
+    from tools.telemetry import TelemetryPlugin
+
+    session_service = PersistentSessionService()
+    runner = Runner(
+        agent=root_agent,
+        app_name=APP_NAME,
+        session_service=session_service,
+        memory_service=PersistentMemoryService(),
+        plugins=[TelemetryPlugin()]
+    )
+    analysis_cache = AnalysisCache()
+
+    done = load_checkpoint(checkpoint_path)
+
+    def is_done(item: Dict[str, Any]) -> bool:
+        try:
+            return item_key(item) in done
+        except OSError:
+            return False  # Missing or unreadable; recorded as failed below
+
+    pending = [item for item in items if not is_done(item)]
+    skipped = len(items) - len(pending)
+
+    timings: Dict[str, List[float]] = {"transcribe": [], "analyze": [], "total": []}
+    audio_seconds = 0.0
+    failures = 0
+    semaphore = asyncio.Semaphore(analyze_concurrency)
+    checkpoint_lock = asyncio.Lock()
+    loop = asyncio.get_running_loop()
+
+    pool_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    started = time.perf_counter()
+
+    with pool_class(max_workers=transcribe_workers) as pool, \
+            open(checkpoint_path, 'a', encoding='utf-8') as checkpoint:
+
+        async def process(item: Dict[str, Any]) -> None:
+            nonlocal audio_seconds, failures
+            item_started = time.perf_counter()
+            record = {"key": None, "path": item["path"]}
+            try:
+                record["key"] = item_key(item)
+                transcription = await loop.run_in_executor(pool, _transcribe, item["path"], item.get("attendees"))
+                if transcription["status"] != "success":
+                    raise RuntimeError(transcription.get("error_message"))
+                timings["transcribe"].append(transcription["elapsed"])
+
+                async with semaphore:
+                    analyze_started = time.perf_counter()
+                    result = await analyze_transcript(
+                        runner,
+                        session_service,
+                        transcription["transcript"],
+                        session_id=str(uuid.uuid4()),
+                        meeting_title=item.get("meeting_title"),
+                        attendees=item.get("attendees"),
+                        user_id="batch",
+                        cache=analysis_cache
+                    )
+                    timings["analyze"].append(time.perf_counter() - analyze_started)
+
+                audio_seconds += transcription.get("audio_seconds", 0.0)
+                timings["total"].append(time.perf_counter() - item_started)
+                record.update(status="success", response=result["response"])
+            except Exception as e:
+                failures += 1
+                record.update(status="error", error_message=str(e))
+
+            async with checkpoint_lock:
+                checkpoint.write(json.dumps(record) + "\n")
+                checkpoint.flush()
+            print(f"[{record['status']}] {item['path']}", file=sys.stderr)
+
+        await asyncio.gather(*(process(item) for item in pending))
+
+    wall = time.perf_counter() - started
+    completed = len(pending) - failures
+    return {
+        "files": len(items),
+        "skipped": skipped,
+        "completed": completed,
+        "failed": failures,
+        "wall_seconds": round(wall, 2),
+        "files_per_minute": round(completed / wall * 60, 2) if wall else 0.0,
+        "audio_hours_per_hour": round(audio_seconds / wall, 2) if wall else 0.0,
+        "stages": {
+            stage: {
+                "p50": round(percentile(values, 0.50), 3),
+                "p95": round(percentile(values, 0.95), 3)
+            }
+            for stage, values in timings.items()
+        },
+        # Clients of this process; transcription workers keep their own
+        "clients": get_client_registry().stats()
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="Directory of recordings or JSONL manifest")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_FILE)
+    parser.add_argument("--transcribe-workers", type=int, default=2)
+    parser.add_argument("--analyze-concurrency", type=int, default=4)
+    parser.add_argument("--threads", action="store_true", help="Transcribe on threads instead of processes")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    summary = asyncio.run(run_batch(
+        load_items(args.source),
+        checkpoint_path=args.checkpoint,
+        transcribe_workers=args.transcribe_workers,
+        analyze_concurrency=args.analyze_concurrency,
+        use_processes=not args.threads
+    ))
+
+    # Report emails are sent in the background; deliver them before exiting
+    from tools.email_outbox import get_email_outbox
+    get_email_outbox().drain()
+    print(json.dumps(summary, indent=2))
+    return 0 if summary["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
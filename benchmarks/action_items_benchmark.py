@@ -0,0 +1,129 @@
+"""
+Cost of the overdue and upcoming action item queries as reports pile up.
+
+``--reports`` synthetic reports, each with a few action items whose
+deadlines are written the way the analyst writes them ("Friday", "end of
+month", "March 5", "ASAP"), are saved with store_report. The tracker
+queries (overdue, due in the next two weeks, one assignee's open items)
+are then answered two ways:
+- scan: open every report file, resolve its deadlines and filter, which
+  is what answering them without the tracker takes;
+- index: ReportSearchIndex.due_action_items and due_counts, reading the
+  due-date indexes maintained as each report is saved.
+
+Both must return the same items.
+
+Usage:
+    python -m benchmarks.action_items_benchmark --reports 5000
+"""
+import argparse
+import glob
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import Dict, Set, Tuple
+
+DEADLINES = ["Friday", "next Monday", "end of month", "end of week", "tomorrow", "in two weeks",
+             "March 5", "15th June", "Q3", "ASAP", "", "2025-02-28", "next week"]
+ASSIGNEES = ["Alice", "Bob", "Carol", "Dan", "Erin"]
+TODAY = date(2025, 6, 1)
+HORIZON_DAYS = 14
+
+
+def make_report(rng: random.Random, index: int) -> str:
+    from models.schemas import ActionItem, MeetingReport
+
+    meeting_date = TODAY - timedelta(days=rng.randint(0, 365))
+    return MeetingReport(
+        meeting_title=f"Meeting {index}",
+        date=meeting_date.isoformat(),
+        attendees=ASSIGNEES,
+        summary="Weekly sync.",
+        key_topics=["Status"],
+        action_items=[
+            ActionItem(task=f"Task {index}.{item}", assignee=rng.choice(ASSIGNEES),
+                       deadline=rng.choice(DEADLINES), priority=rng.choice(["high", "medium", "low"]))
+            for item in range(rng.randint(1, 5))
+        ],
+        decisions_made=[]
+    ).model_dump_json()
+
+
+def scan(assignee: str) -> Tuple[Set[str], Set[str], Set[str]]:
+    """Overdue, upcoming and one assignee's open task names, from the files."""
+    from tools.deadlines import parse_date, parse_deadline
+    from tools.report_format import REPORT_EXTENSION, ReportFile
+
+    overdue, upcoming, assigned = set(), set(), set()
+    for path in glob.glob(f"reports/*{REPORT_EXTENSION}"):
+        report = ReportFile(path).report()
+        reference = parse_date(report.date) or date.today()
+        for item in report.action_items:
+            due = parse_deadline(item.deadline, reference)
+            if due is None:
+                continue
+            if due < TODAY:
+                overdue.add(item.task)
+            elif due < TODAY + timedelta(days=HORIZON_DAYS):
+                upcoming.add(item.task)
+            if item.assignee == assignee:
+                assigned.add(item.task)
+    return overdue, upcoming, assigned
+
+
+def query(assignee: str) -> Tuple[Set[str], Set[str], Set[str], Dict[str, int]]:
+    """The same answers from the tracker's indexes."""
+    from tools.report_search import get_search_index
+
+    index = get_search_index()
+    tasks = lambda items: {item["task"] for item in items}  # noqa: E731
+    counts = index.due_counts(TODAY, HORIZON_DAYS)
+    return (
+        tasks(index.due_action_items(due_before=TODAY, limit=10 ** 6)),
+        tasks(index.due_action_items(due_from=TODAY, due_before=TODAY + timedelta(days=HORIZON_DAYS), limit=10 ** 6)),
+        tasks(index.due_action_items(assignee=assignee, limit=10 ** 6)),
+        counts
+    )
+
+
+def timed(fn, *args, repeat: int = 3) -> Tuple[float, object]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - started)
+    return best * 1e3, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reports", type=int, default=5000)
+    args = parser.parse_args()
+
+    # Reports, indexes and telemetry stay in a scratch directory
+    scratch = tempfile.mkdtemp(prefix="action_items_benchmark_")
+    os.chdir(scratch)
+    from tools.local_storage import store_report
+
+    rng = random.Random(0)
+    started = time.perf_counter()
+    for index in range(args.reports):
+        result = store_report(make_report(rng, index), f"meeting_{index}")
+        if result["status"] != "success":
+            raise SystemExit(result["error_message"])
+    save_ms = (time.perf_counter() - started) / args.reports * 1e3
+    print(f"{args.reports} reports saved, {save_ms:.2f} ms each including indexing")
+
+    scan_ms, scanned = timed(scan, "Bob", repeat=1)
+    index_ms, (overdue, upcoming, assigned, counts) = timed(query, "Bob")
+    if (overdue, upcoming, assigned) != scanned:
+        raise SystemExit("Indexed results differ from the scan")
+    print(f"{len(overdue)} overdue, {len(upcoming)} due in {HORIZON_DAYS} days, {len(assigned)} open for Bob; "
+          f"counts {counts}")
+    print(f"\n{'method':>6} {'ms':>9}")
+    print(f"{'scan':>6} {scan_ms:>9.1f}")
+    print(f"{'index':>6} {index_ms:>9.1f}")
+    shutil.rmtree(scratch, ignore_errors=True)
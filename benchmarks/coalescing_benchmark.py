@@ -0,0 +1,101 @@
+"""
+Burst benchmark for coalescing identical meeting jobs.
+
+Simulates the start of a course: many users upload the same lecture
+within a few seconds. The burst goes through the real job queue and
+run_meeting_job, served by in-process worker threads; every external
+service is a fake from benchmarks.fakes, so upstream spend is counted
+as fake Speech and model calls.
+
+Usage:
+    python -m benchmarks.coalescing_benchmark --uploads 20 --workers 4
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import Dict
+
+from benchmarks.fakes import FakeGemini, FakeRecognizer, install_fakes
+from benchmarks.preprocessing_benchmark import write_meeting_wav
+
+
+def run_burst(uploads: int, workers: int, minutes: float, coalesce: bool) -> Dict[str, float]:
+    from services.job_queue import FINISHED_STATES, QUEUED, RUNNING, JobQueue
+    from services.meeting_jobs import run_meeting_job, submit_meeting_job
+    from tools.transcript_cache import CACHE_DIR
+    from worker import build_services
+
+    # Neither mode may benefit from transcripts cached by the other
+    shutil.rmtree(CACHE_DIR, ignore_errors=True)
+    queue = JobQueue(os.path.join(tempfile.mkdtemp(dir="."), "queue.db"))
+    lecture = os.path.join("audio", "lecture.wav")
+    write_meeting_wav(lecture, minutes, 16000, 1, seed=0)
+    uploaded = []
+    for index in range(uploads):
+        uploaded.append(os.path.join("audio", f"upload_{index}.wav"))
+        shutil.copyfile(lecture, uploaded[-1])
+
+    fakes = dict(speech=FakeRecognizer(0.2, 0.01, seed=1), model=FakeGemini(model="fake-gemini", seed=2))
+    stop = threading.Event()
+
+    def serve(worker_id: str) -> None:
+        services = build_services()
+        while not stop.is_set():
+            job = queue.claim(worker_id)
+            if job is None:
+                time.sleep(0.05)
+                continue
+            run_meeting_job(queue, job, services)
+
+    with install_fakes(**fakes):
+        threads = [threading.Thread(target=serve, args=(f"w{i}",), daemon=True) for i in range(workers)]
+        for thread in threads:
+            thread.start()
+
+        started = time.perf_counter()
+        job_ids = []
+        for index, path in enumerate(uploaded):
+            job_ids.append(submit_meeting_job(
+                queue, path, session_id=f"user{index}", meeting_title="Lecture 1", coalesce=coalesce
+            ))
+
+        peak_depth = 0
+        while True:
+            depth = queue.depth()
+            peak_depth = max(peak_depth, depth.get(QUEUED, 0) + depth.get(RUNNING, 0))
+            if all(queue.get(job_id)["status"] in FINISHED_STATES for job_id in job_ids):
+                break
+            time.sleep(0.05)
+        wall = time.perf_counter() - started
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+    return {
+        "seconds": wall,
+        "peak_depth": peak_depth,
+        "speech_calls": fakes["speech"].calls,
+        "model_calls": fakes["model"].calls,
+        "succeeded": sum(queue.get(job_id)["status"] == "succeeded" for job_id in job_ids),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--minutes", type=float, default=3.0, help="Length of the lecture recording")
+    args = parser.parse_args()
+
+    # Reports, caches and uploads stay in a scratch directory
+    os.chdir(tempfile.mkdtemp(prefix="coalescing_benchmark_"))
+    os.makedirs("audio")
+    print(f"{'mode':>12} {'seconds':>8} {'peak depth':>10} {'speech':>7} {'model':>6} {'succeeded':>9}")
+    for coalesce in (False, True):
+        result = run_burst(args.uploads, args.workers, args.minutes, coalesce)
+        print(f"{'coalesced' if coalesce else 'independent':>12} {result['seconds']:>8.2f} "
+              f"{result['peak_depth']:>10} {result['speech_calls']:>7} {result['model_calls']:>6} "
+              f"{result['succeeded']:>9}/{args.uploads}")
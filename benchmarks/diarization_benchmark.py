@@ -0,0 +1,81 @@
+"""
+Size of diarized transcripts and how analysis windows fall on speaker turns.
+
+A synthetic meeting of ``--minutes`` at 150 words a minute is spoken by
+``--speakers`` people in turns of random length. Two measurements:
+- storage: the words as one JSON object per word (speaker, start, end,
+  text) against DiarizedWords.to_dict(), and the time to write and read
+  each back;
+- windows: split_transcript over the plain text and over the
+  turn-segmented transcript, counting windows that begin in the middle
+  of someone's turn, where the analyst cannot tell who is speaking.
+
+Usage:
+    python -m benchmarks.diarization_benchmark --minutes 60 --speakers 5
+"""
+import argparse
+import json
+import random
+import re
+import time
+from typing import List
+
+from agents.map_reduce import estimate_tokens, split_transcript
+from tools.diarization import DiarizedWords, Word, format_turns, speaker_turns
+
+WORDS_PER_MINUTE = 150
+
+
+def make_words(minutes: int, speakers: int, seed: int = 0) -> List[Word]:
+    rng = random.Random(seed)
+    words, speaker, t = [], 1, 0.0
+    while len(words) < minutes * WORDS_PER_MINUTE:
+        for index in range(rng.randint(5, 120)):
+            text = f"word{rng.randint(0, 999)}" + ("." if index % 12 == 11 else "")
+            words.append(Word(text, speaker, round(t, 2), round(t + 0.35, 2)))
+            t += 0.4
+        speaker = rng.choice([s for s in range(1, speakers + 1) if s != speaker] or [speaker])
+    return words
+
+
+def mid_turn_windows(windows: List[str], turn_starts: set) -> int:
+    # A window begins mid-turn unless its first words, after any speaker
+    # label, open a turn
+    return sum(
+        " ".join(re.sub(r"^Speaker \d+: ", "", window).split()[:3]) not in turn_starts
+        for window in windows
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=int, default=60)
+    parser.add_argument("--speakers", type=int, default=5)
+    parser.add_argument("--window-tokens", type=int, default=2000)
+    args = parser.parse_args()
+
+    words = make_words(args.minutes, args.speakers)
+    turns = speaker_turns(words)
+    print(f"{len(words)} words, {len(turns)} turns")
+
+    print(f"\n{'storage':>10} {'bytes':>9} {'write ms':>9} {'read ms':>8}")
+    started = time.perf_counter()
+    objects = json.dumps([w._asdict() for w in words])
+    written = time.perf_counter()
+    [Word(**w) for w in json.loads(objects)]
+    read = time.perf_counter()
+    print(f"{'objects':>10} {len(objects):>9} {(written - started) * 1e3:>9.1f} {(read - written) * 1e3:>8.1f}")
+
+    started = time.perf_counter()
+    arrays = json.dumps(DiarizedWords(words).to_dict())
+    written = time.perf_counter()
+    list(DiarizedWords.from_dict(json.loads(arrays)))
+    read = time.perf_counter()
+    print(f"{'arrays':>10} {len(arrays):>9} {(written - started) * 1e3:>9.1f} {(read - written) * 1e3:>8.1f}")
+
+    turn_starts = {" ".join(turn.text.split()[:3]) for turn in turns}
+    print(f"\n{'transcript':>10} {'tokens':>7} {'windows':>8} {'mid-turn':>9}")
+    for name, text in (("plain", " ".join(w.text for w in words)), ("turns", format_turns(words))):
+        windows = split_transcript(text, args.window_tokens)
+        print(f"{name:>10} {estimate_tokens(text):>7} {len(windows):>8} "
+              f"{mid_turn_windows(windows, turn_starts):>9}")
@@ -0,0 +1,130 @@
+"""
+Throughput of report email delivery against a local SendGrid stand-in.
+
+A day's reports are sent to several attendee lists each. The stand-in is
+an HTTP server speaking enough of the v3 mail/send API for the real
+SendGrid client, answering each request after ``--latency`` seconds.
+
+Two ways of sending are compared:
+- direct: one blocking request per report and list, as send_report_email
+  used to do;
+- outbox: everything goes through the persistent outbox, which batches
+  identical content and sends requests concurrently.
+
+Messages are (report, list) pairs. Lists overlap, so the direct path
+also emails some people the same report twice; the outbox does not.
+
+Usage:
+    python -m benchmarks.email_benchmark --reports 50 --lists 4 --list-size 25
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+from models.schemas import ActionItem, MeetingReport
+
+
+class StandIn:
+    """Counts requests and recipients accepted by the local mail/send endpoint."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.requests = 0
+        self.recipients = 0
+        self._lock = threading.Lock()
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                time.sleep(stand_in.latency)
+                with stand_in._lock:
+                    stand_in.requests += 1
+                    stand_in.recipients += sum(len(p.get("to", [])) for p in body["personalizations"])
+                self.send_response(202)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.host = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+
+def make_reports(count: int) -> List[MeetingReport]:
+    return [
+        MeetingReport(
+            meeting_title=f"Meeting {index} <weekly>",
+            date="2025-01-01",
+            attendees=[f"Person {i}" for i in range(6)],
+            summary="We discussed the plan & agreed on next steps. " * 3,
+            key_topics=[f"Topic {i}" for i in range(5)],
+            action_items=[ActionItem(task=f"Task {i}", assignee=f"Person {i}", priority="high") for i in range(4)],
+            decisions_made=["Ship on Friday"]
+        )
+        for index in range(count)
+    ]
+
+
+def make_lists(lists: int, list_size: int) -> List[List[str]]:
+    # Neighbouring lists overlap by half, as team and project lists do
+    step = max(1, list_size // 2)
+    return [[f"user{i * step + j}@example.com" for j in range(list_size)] for i in range(lists)]
+
+
+def run_direct(client, reports: List[MeetingReport], lists: List[List[str]]) -> None:
+    from tools.email_sender import render_report_html
+    from sendgrid.helpers.mail import Mail
+
+    for report in reports:
+        html = render_report_html(report)
+        for recipients in lists:
+            client.send(Mail(from_email='noreply@sendgrid.net', to_emails=recipients,
+                             subject=f"Meeting Report: {report.meeting_title}", html_content=html))
+
+
+def run_outbox(client, reports: List[MeetingReport], lists: List[List[str]]) -> None:
+    from tools.email_outbox import get_email_outbox
+    from tools.email_sender import send_report_email
+
+    for index, report in enumerate(reports):
+        report_json = report.model_dump_json()
+        for recipients in lists:
+            send_report_email(recipients, report_json, report.meeting_title, meeting_id=f"meeting_{index}")
+    get_email_outbox().drain(timeout=600)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reports", type=int, default=50)
+    parser.add_argument("--lists", type=int, default=4, help="Attendee lists each report goes to")
+    parser.add_argument("--list-size", type=int, default=25)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds the stand-in takes per request")
+    args = parser.parse_args()
+
+    from sendgrid import SendGridAPIClient
+    from tools.clients import SENDGRID, get_client_registry
+
+    # The outbox and rate limiter files stay in a scratch directory
+    os.chdir(tempfile.mkdtemp(prefix="email_benchmark_"))
+    reports, lists = make_reports(args.reports), make_lists(args.lists, args.list_size)
+
+    messages = len(reports) * len(lists)
+    print(f"{'mode':>7} {'seconds':>8} {'requests':>9} {'emails':>7} {'messages/s':>11}")
+    for mode, run in (("direct", run_direct), ("outbox", run_outbox)):
+        stand_in = StandIn(args.latency)
+        client = SendGridAPIClient("benchmark", host=stand_in.host)
+        with get_client_registry().override(SENDGRID, client):
+            started = time.perf_counter()
+            run(client, reports, lists)
+            seconds = time.perf_counter() - started
+        stand_in.server.shutdown()
+        print(f"{mode:>7} {seconds:>8.2f} {stand_in.requests:>9} {stand_in.recipients:>7} "
+              f"{messages / seconds:>11.1f}")
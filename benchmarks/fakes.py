@@ -0,0 +1,378 @@
+"""
+Deterministic local stand-ins for every external service of the pipeline.
+
+Each fake has configurable latency, jitter, failure rate and quota,
+draws from its own seeded random generator and counts its calls, so
+benchmark runs are repeatable and need no credentials or network.
+"""
+import array
+import asyncio
+import base64
+import io
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack, contextmanager
+from datetime import timedelta
+from types import SimpleNamespace
+from typing import Any, AsyncGenerator, BinaryIO, Dict, Iterator, List, Optional
+
+import google_crc32c
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.api_core import exceptions as api_exceptions
+from google.genai import errors as genai_errors
+from google.genai import types
+
+from tools.clients import SENDGRID, SPEECH, STORAGE, get_client_registry
+
+CHARS_PER_TOKEN = 4
+
+# Every block of audio carries a constant sample value that the fake
+# recognizer reads back as one word, so stitched output can be verified.
+WORD_SECONDS = 0.5
+
+DEFAULT_REPORT = {
+    "meeting_title": "Quarterly Planning",
+    "date": "2025-01-15",
+    "attendees": ["Alice", "Bob", "Carol"],
+    "summary": "The team reviewed the roadmap and agreed on launch dates. Hiring was discussed.",
+    "key_topics": ["Roadmap", "Launch dates", "Hiring"],
+    "action_items": [
+        {"task": "Draft launch plan", "assignee": "Alice", "deadline": "Friday", "priority": "high"},
+        {"task": "Open two backend roles", "assignee": "Bob", "deadline": None, "priority": "medium"},
+    ],
+    "decisions_made": ["Launch moves to March"],
+}
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+class Faults:
+    """Latency, failure and quota injection shared by the fakes."""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, failure_rate: float = 0.0, seed: int = 0,
+                 quota_per_second: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.quota_per_second = quota_per_second
+        self.calls = 0
+        self.failures = 0
+        self.throttled = 0
+        self._accepted = deque()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def over_quota(self) -> bool:
+        """Counts a call against the quota; True when it must be rejected with a 429."""
+        if not self.quota_per_second:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            while self._accepted and now - self._accepted[0] >= 1.0:
+                self._accepted.popleft()
+            if len(self._accepted) >= self.quota_per_second:
+                self.throttled += 1
+                return True
+            self._accepted.append(now)
+            return False
+
+    def draw(self, extra_latency: float = 0.0) -> tuple:
+        """Returns (delay, fail) for one call."""
+        with self._lock:
+            self.calls += 1
+            delay = self.latency + extra_latency + self._random.uniform(0, self.jitter)
+            fail = self._random.random() < self.failure_rate
+            self.failures += fail
+        return delay, fail
+
+
+class FakeRecognizer:
+    """Stand-in for speech.SpeechClient with latency proportional to audio length."""
+
+    def __init__(self, base_latency: float = 0.05, seconds_per_audio_second: float = 0.01,
+                 failure_rate: float = 0.0, jitter: float = 0.0, seed: int = 0, quota_per_second: float = 0.0):
+        self.seconds_per_audio_second = seconds_per_audio_second
+        self.faults = Faults(base_latency, jitter, failure_rate, seed, quota_per_second)
+
+    @property
+    def calls(self) -> int:
+        return self.faults.calls
+
+    def recognize(self, config, audio):
+        if self.faults.over_quota():
+            raise api_exceptions.ResourceExhausted("Quota exceeded for Speech-to-Text requests per second")
+        samples = array.array('h')
+        samples.frombytes(audio.content)
+        duration = len(samples) / float(config.sample_rate_hertz)
+        delay, fail = self.faults.draw(duration * self.seconds_per_audio_second)
+        time.sleep(delay)
+        if fail:
+            raise api_exceptions.ServiceUnavailable("Injected Speech-to-Text failure")
+
+        word_frames = int(config.sample_rate_hertz * WORD_SECONDS)
+        words = []
+        for offset in range(0, len(samples), word_frames):
+            start = offset / float(config.sample_rate_hertz)
+            words.append(SimpleNamespace(
+                word=f"w{samples[offset]}",
+                start_time=timedelta(seconds=start),
+                end_time=timedelta(seconds=start + WORD_SECONDS),
+                speaker_tag=1 + (samples[offset] // 20) % 2
+            ))
+
+        alternative = SimpleNamespace(transcript=" ".join(w.word for w in words), words=words)
+        return SimpleNamespace(results=[SimpleNamespace(alternatives=[alternative])])
+
+
+class FakeGemini(BaseLlm):
+    """
+    Deterministic stand-in for Gemini with size-proportional latency.
+
+    Agents without tools get ``report`` back as JSON. Agents with tools
+    first get a save_report_locally call and, once it has been answered,
+    a short confirmation. Usage metadata estimates tokens from text size.
+    """
+
+    first_token_latency: float = 0.4
+    seconds_per_output_token: float = 0.004
+    failure_rate: float = 0.0
+    seed: int = 0
+    quota_per_second: float = 0.0
+    report: Dict[str, Any] = DEFAULT_REPORT
+
+    def model_post_init(self, context: Any) -> None:
+        super().model_post_init(context)
+        self._faults = Faults(self.first_token_latency, 0.0, self.failure_rate, self.seed, self.quota_per_second)
+
+    @property
+    def faults(self) -> Faults:
+        return self._faults
+
+    @property
+    def calls(self) -> int:
+        return self._faults.calls
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        if self._faults.over_quota():
+            raise genai_errors.ClientError(429, {"error": {
+                "code": 429, "message": "Resource has been exhausted", "status": "RESOURCE_EXHAUSTED",
+                "details": [{"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": "1s"}]
+            }})
+        prompt = str(llm_request.config.system_instruction or "") if llm_request.config else ""
+        answered_tool = False
+        for content in llm_request.contents:
+            for part in content.parts or []:
+                prompt += part.text or ""
+                if part.function_call:
+                    prompt += json.dumps(part.function_call.args)
+                if part.function_response:
+                    prompt += json.dumps(part.function_response.response, default=str)
+                    answered_tool = True
+
+        if not llm_request.tools_dict:
+            part = types.Part(text=json.dumps(self.report))
+        elif not answered_tool:
+            part = types.Part(function_call=types.FunctionCall(
+                name="save_report_locally",
+                args={"report_json": json.dumps(self.report, indent=2), "meeting_id": "meeting_benchmark"}
+            ))
+        else:
+            part = types.Part(text="The report was saved to reports/meeting_benchmark.json.")
+
+        output = part.text or json.dumps(part.function_call.args)
+        prompt_tokens, output_tokens = estimate_tokens(prompt), estimate_tokens(output)
+        delay, fail = self._faults.draw(output_tokens * self.seconds_per_output_token)
+        await asyncio.sleep(delay)
+        if fail:
+            raise ConnectionError("Injected model failure")
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[part]),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=prompt_tokens,
+                candidates_token_count=output_tokens,
+                total_token_count=prompt_tokens + output_tokens
+            )
+        )
+
+
+class _FakeBlob:
+    def __init__(self, client: "FakeStorageClient", bucket: str, name: str, chunk_size: Optional[int] = None):
+        self.client = client
+        self.bucket = bucket
+        self.name = name
+        self.chunk_size = chunk_size
+
+    @property
+    def crc32c(self) -> Optional[str]:
+        return self.client.checksums.get((self.bucket, self.name))
+
+    def _upload(self, f: BinaryIO, size: int) -> None:
+        # Without a chunk size the object is one request and fails as a whole;
+        # with one, every chunk is a request of a resumable session and only
+        # the failed chunk is sent again, as the client library does.
+        checksum = google_crc32c.Checksum()
+        parts = []
+        for data in iter(lambda: f.read(self.chunk_size or max(size, 1)), b""):
+            while True:
+                delay, fail = self.client.faults.draw(len(data) * self.client.seconds_per_byte)
+                time.sleep(delay)
+                if not fail:
+                    break
+                if not self.chunk_size:
+                    raise api_exceptions.ServiceUnavailable("Injected GCS failure")
+                self.client.chunk_retries += 1
+            checksum.update(data)
+            parts.append(data)
+        self.client.store(self.bucket, self.name, b"".join(parts), base64.b64encode(checksum.digest()).decode())
+
+    def upload_from_string(self, data, content_type: Optional[str] = None, **kwargs) -> None:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self._upload(io.BytesIO(data), len(data))
+
+    def upload_from_filename(self, filename: str, content_type: Optional[str] = None, **kwargs) -> None:
+        with open(filename, 'rb') as f:
+            self._upload(f, os.path.getsize(filename))
+
+    def generate_signed_url(self, **kwargs) -> str:
+        delay, _ = self.client.faults.draw()
+        time.sleep(delay)
+        self.client.signed += 1
+        return f"https://storage.example/{self.bucket}/{self.name}?signed"
+
+
+class _FakeBucket:
+    def __init__(self, client: "FakeStorageClient", name: str):
+        self.client = client
+        self.name = name
+
+    def blob(self, name: str, chunk_size: Optional[int] = None) -> _FakeBlob:
+        return _FakeBlob(self.client, self.name, name, chunk_size)
+
+    def get_blob(self, name: str, **kwargs) -> Optional[_FakeBlob]:
+        delay, fail = self.client.faults.draw()
+        time.sleep(delay)
+        if fail:
+            raise api_exceptions.ServiceUnavailable("Injected GCS failure")
+        with self.client.lock:
+            exists = (self.name, name) in self.client.objects
+        return _FakeBlob(self.client, self.name, name) if exists else None
+
+
+class FakeStorageClient:
+    """
+    Stand-in for storage.Client.
+
+    Objects are kept in memory, or written under ``root`` (one directory
+    per bucket) so large uploads do not have to fit in memory. Listings
+    report each object's CRC32C like GCS does.
+    """
+
+    def __init__(self, latency: float = 0.05, seconds_per_byte: float = 0.0,
+                 failure_rate: float = 0.0, jitter: float = 0.0, seed: int = 0, root: Optional[str] = None):
+        self.seconds_per_byte = seconds_per_byte
+        self.root = root
+        self.faults = Faults(latency, jitter, failure_rate, seed)
+        self.objects: Dict[tuple, Any] = {}
+        self.checksums: Dict[tuple, str] = {}
+        self.chunk_retries = 0
+        self.signed = 0
+        self.lock = threading.Lock()
+
+    def store(self, bucket: str, name: str, data: bytes, crc32c: str) -> None:
+        if self.root:
+            path = os.path.join(self.root, bucket, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(data)
+            data = path
+        with self.lock:
+            self.objects[(bucket, name)] = data
+            self.checksums[(bucket, name)] = crc32c
+
+    def bucket(self, name: str) -> _FakeBucket:
+        return _FakeBucket(self, name)
+
+    def list_blobs(self, bucket_or_name: str, prefix: Optional[str] = None, delimiter: Optional[str] = None,
+                   **kwargs) -> List[_FakeBlob]:
+        delay, fail = self.faults.draw()
+        time.sleep(delay)
+        if fail:
+            raise api_exceptions.ServiceUnavailable("Injected GCS failure")
+        with self.lock:
+            keys = sorted(self.objects)
+        prefix = prefix or ""
+        return [
+            _FakeBlob(self, bucket, name) for bucket, name in keys
+            if bucket == bucket_or_name and name.startswith(prefix)
+            and not (delimiter and delimiter in name[len(prefix):])
+        ]
+
+
+class FakeSendGridClient:
+    """Stand-in for SendGridAPIClient that records sent messages."""
+
+    def __init__(self, latency: float = 0.1, failure_rate: float = 0.0, jitter: float = 0.0, seed: int = 0):
+        self.faults = Faults(latency, jitter, failure_rate, seed)
+        self.sent = []
+
+    def send(self, message):
+        delay, fail = self.faults.draw()
+        time.sleep(delay)
+        if fail:
+            raise ConnectionError("Injected SendGrid failure")
+        self.sent.append(message)
+        return SimpleNamespace(status_code=202, body="", headers={})
+
+
+@contextmanager
+def install_fakes(
+    speech: Optional[FakeRecognizer] = None,
+    model: Optional[FakeGemini] = None,
+    storage: Optional[FakeStorageClient] = None,
+    sendgrid: Optional[FakeSendGridClient] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Replaces every external service of the pipeline inside the block.
+
+    Clients are overridden in the process-wide client registry; the model
+    is swapped on analyst_agent itself (still behind the shared rate
+    limiter), so the root workflow and the map-reduce window runner both
+    use it.
+
+    Args:
+        speech: Replaces the Speech-to-Text client
+        model: Replaces the analyst's Gemini model
+        storage: Replaces the Cloud Storage client
+        sendgrid: Replaces the SendGrid client
+
+    Yields:
+        The installed fakes by name
+    """
+    from agents.analyst_agent.agent import analyst_agent
+    from tools.rate_limit import rate_limited
+
+    fakes = {
+        SPEECH: speech or FakeRecognizer(),
+        STORAGE: storage or FakeStorageClient(),
+        SENDGRID: sendgrid or FakeSendGridClient(),
+    }
+    registry = get_client_registry()
+    model = model or FakeGemini(model="fake-gemini")
+    previous_model = analyst_agent.model
+    analyst_agent.model = rate_limited(model)
+    try:
+        with ExitStack() as stack:
+            for name, fake in fakes.items():
+                stack.enter_context(registry.override(name, fake))
+            yield {**fakes, "model": model}
+    finally:
+        analyst_agent.model = previous_model
@@ -0,0 +1,108 @@
+"""
+Live versus after-the-fact processing of one meeting, fully offline.
+
+A synthetic meeting is streamed over a local socket at ``--speedup``
+times real time. The live path transcribes and analyzes it while it
+streams; the batch path starts transcribe_audio and analyze_transcript
+only once the recording is complete. Reported for each: seconds from the
+end of the meeting to the final report, Speech and model calls.
+
+Usage:
+    python -m benchmarks.live_benchmark --minutes 10 --speedup 20
+"""
+import argparse
+import asyncio
+import os
+import socket
+import tempfile
+import threading
+import time
+import uuid
+import wave
+from typing import Dict
+
+from benchmarks.fakes import FakeGemini, FakeRecognizer, install_fakes
+from benchmarks.preprocessing_benchmark import write_meeting_wav
+
+SEND_SECONDS = 0.5  # Audio sent per socket write
+
+
+def stream_wav(path: str, address, speedup: float) -> None:
+    """Sends a WAV file to ``address`` no faster than ``speedup`` times real time."""
+    with wave.open(path, 'rb') as reader, socket.create_connection(address) as connection:
+        with open(path, 'rb') as f:
+            connection.sendall(f.read(44))
+        frames = int(reader.getframerate() * SEND_SECONDS)
+        started = time.perf_counter()
+        sent = 0.0
+        while True:
+            data = reader.readframes(frames)
+            if not data:
+                break
+            sent += len(data) / (2.0 * reader.getnchannels() * reader.getframerate())
+            time.sleep(max(0.0, started + sent / speedup - time.perf_counter()))
+            connection.sendall(data)
+
+
+async def run_live(path: str, speedup: float, fakes) -> Dict[str, float]:
+    from services.live_meeting import run_live_meeting
+    from tools.live_transcription import SocketSource
+
+    source = SocketSource(port=0)
+    sender = threading.Thread(target=stream_wav, args=(path, source.address, speedup), daemon=True)
+    sender.start()
+    result = await run_live_meeting(source, meeting_title="Benchmark meeting", update_interval=5.0 / speedup)
+    return {
+        "end_to_report_s": result["finalize_seconds"],
+        "updates": result["updates"],
+        "speech_calls": fakes["speech"].calls,
+        "model_calls": fakes["model"].calls,
+    }
+
+
+async def run_batch(path: str, speedup: float, fakes) -> Dict[str, float]:
+    from google.adk.runners import Runner
+    from agents.analysis import APP_NAME, analyze_transcript
+    from agents.workflow import root_agent
+    from services.memory_service import PersistentMemoryService
+    from services.session_service import PersistentSessionService
+    from tools.telemetry import TelemetryPlugin
+    from tools.transcription import transcribe_audio
+
+    # The recording only exists once the meeting is over
+    with wave.open(path, 'rb') as reader:
+        await asyncio.sleep(reader.getnframes() / reader.getframerate() / speedup)
+
+    ended = time.perf_counter()
+    session_service = PersistentSessionService()
+    runner = Runner(agent=root_agent, app_name=APP_NAME, session_service=session_service,
+                    memory_service=PersistentMemoryService(), plugins=[TelemetryPlugin()])
+    transcription = await asyncio.to_thread(transcribe_audio, path, use_cache=False)
+    await analyze_transcript(runner, session_service, transcription["transcript"], session_id=uuid.uuid4().hex,
+                             meeting_title="Benchmark meeting", cache=None)
+    return {
+        "end_to_report_s": time.perf_counter() - ended,
+        "updates": 1,
+        "speech_calls": fakes["speech"].calls,
+        "model_calls": fakes["model"].calls,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, default=10.0, help="Length of the meeting")
+    parser.add_argument("--speedup", type=float, default=20.0, help="Streaming speed relative to real time")
+    args = parser.parse_args()
+
+    # Reports, sessions and caches stay in a scratch directory
+    os.chdir(tempfile.mkdtemp(prefix="live_benchmark_"))
+    os.environ.update({"GCS_BUCKET_NAME": "", "SENDGRID_API_KEY": ""})
+    write_meeting_wav("meeting.wav", args.minutes, 16000, 1, seed=0)
+
+    print(f"{'mode':>6} {'end->report s':>13} {'updates':>8} {'speech':>7} {'model':>6}")
+    for mode, runner in (("live", run_live), ("batch", run_batch)):
+        fakes = dict(speech=FakeRecognizer(0.3, 0.01, seed=1), model=FakeGemini(model="fake-gemini", seed=2))
+        with install_fakes(**fakes):
+            result = asyncio.run(runner("meeting.wav", args.speedup, fakes))
+        print(f"{mode:>6} {result['end_to_report_s']:>13.2f} {result['updates']:>8} "
+              f"{result['speech_calls']:>7} {result['model_calls']:>6}")
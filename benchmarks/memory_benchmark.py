@@ -0,0 +1,109 @@
+"""
+Cost and quality of cross-meeting memory as the number of meetings grows.
+
+Synthetic meetings each discuss one of ``--topics`` topics, so a snippet
+recalled for a new meeting is relevant when it comes from a meeting on
+the same topic. For every memory size the benchmark reports:
+- snippets stored and bytes of vectors on disk;
+- exact (memory-mapped, block-wise) search latency, and with
+  --approximate the inverted-file index latency and its recall of the
+  exact top-k;
+- precision of the recalled snippets and the tokens they add to the
+  prompt, which stay bounded however many meetings exist.
+
+Usage:
+    python -m benchmarks.memory_benchmark --meetings 100 1000 4000 --approximate
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+from typing import List, Tuple
+
+import numpy as np
+
+from models.schemas import ActionItem, MeetingReport
+
+QUERIES = 20
+
+
+def topic_words(topics: int, seed: int = 0) -> List[List[str]]:
+    rng = random.Random(seed)
+    return [[f"t{topic}w{rng.randint(0, 10 ** 6)}" for _ in range(40)] for topic in range(topics)]
+
+
+def make_meeting(rng: random.Random, vocabulary: List[List[str]], topic: int) -> Tuple[MeetingReport, str]:
+    common = [f"word{i}" for i in range(300)]
+    lines = []
+    for turn in range(30):
+        # A third of each turn is about the meeting's topic
+        words = [rng.choice(vocabulary[topic]) if rng.random() < 0.33 else rng.choice(common) for _ in range(40)]
+        lines.append(f"Speaker {1 + turn % 3}: " + " ".join(words) + ".")
+    report = MeetingReport(
+        meeting_title=f"Topic {topic} sync",
+        date="2025-01-01",
+        attendees=["Alice", "Bob"],
+        summary=" ".join(rng.choice(vocabulary[topic]) for _ in range(30)),
+        key_topics=[f"Topic {topic}"],
+        action_items=[ActionItem(task=" ".join(rng.choice(vocabulary[topic]) for _ in range(5)), assignee="Bob")],
+        decisions_made=[]
+    )
+    return report, "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--meetings", type=int, nargs="+", default=[100, 1000, 4000])
+    parser.add_argument("--topics", type=int, default=100)
+    parser.add_argument("--approximate", action="store_true", help="Also build and measure the approximate index")
+    args = parser.parse_args()
+
+    import tools.meeting_memory as meeting_memory
+    from tools.meeting_memory import CHARS_PER_TOKEN, MeetingMemory
+
+    # Telemetry and memory files stay in a scratch directory
+    scratch = tempfile.mkdtemp(prefix="memory_benchmark_")
+    os.chdir(scratch)
+    # Allow the approximate index at every size, however small
+    meeting_memory.APPROX_MIN_ROWS = 0
+    rng = random.Random(1)
+    vocabulary = topic_words(args.topics)
+    memory = MeetingMemory("memory")
+    queries = [(topic, make_meeting(rng, vocabulary, topic)[1])
+               for topic in (rng.randrange(args.topics) for _ in range(QUERIES))]
+
+    def recall_all(approximate: bool) -> Tuple[float, List[List[str]], List[int]]:
+        """Returns (ms per query, recalled lines per query, tokens per query)."""
+        started = time.perf_counter()
+        contexts = [memory.related_context(transcript, approximate=approximate) for _, transcript in queries]
+        ms = (time.perf_counter() - started) / len(queries) * 1e3
+        return ms, [c.splitlines() for c in contexts], [len(c) // CHARS_PER_TOKEN for c in contexts]
+
+    print(f"{'meetings':>8} {'snippets':>8} {'MB':>6} {'add/s':>6} {'exact ms':>9} {'ivf ms':>7} "
+          f"{'recall':>7} {'precision':>9} {'tokens':>7}")
+    added = 0
+    for target in args.meetings:
+        started = time.perf_counter()
+        new = target - added
+        while added < target:
+            report, transcript = make_meeting(rng, vocabulary, rng.randrange(args.topics))
+            memory.add_meeting(f"meeting_{added}", report, transcript)
+            added += 1
+        add_rate = new / (time.perf_counter() - started) if new else 0.0
+
+        exact_ms, exact_found, tokens = recall_all(approximate=False)
+        ivf_ms, recall = float("nan"), float("nan")
+        if args.approximate:
+            memory.build_index()
+            ivf_ms, ivf_found, _ = recall_all(approximate=True)
+            recall = np.mean([len(set(a) & set(e)) / max(1, len(e)) for a, e in zip(ivf_found, exact_found)])
+
+        precision = np.mean([
+            sum(line.startswith(f"- Topic {topic} sync") for line in lines) / max(1, len(lines))
+            for (topic, _), lines in zip(queries, exact_found)
+        ])
+        print(f"{target:>8} {memory.count():>8} {os.path.getsize(memory.vectors_path) / 1e6:>6.1f} {add_rate:>6.0f} "
+              f"{exact_ms:>9.2f} {ivf_ms:>7.2f} {recall:>7.2f} {precision:>9.2f} {max(tokens):>7}")
+    shutil.rmtree(scratch, ignore_errors=True)
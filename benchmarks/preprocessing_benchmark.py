@@ -0,0 +1,108 @@
+"""
+Benchmark of the audio preprocessing stage (decode, resample, VAD).
+
+Builds a seeded corpus of synthetic meetings: bursts of noise-modulated
+tones standing in for speech, separated by pauses of 0.3 to 12 seconds
+over a low noise floor, at several sample rates and channel counts.
+Each recording is transcribed with a fake recognizer, whose latency is
+proportional to the audio it receives, once as-is and once
+preprocessed. The table shows the audio seconds sent (billed), the
+recognize() requests made and the wall time.
+
+Usage:
+    python -m benchmarks.preprocessing_benchmark --files 6 --minutes 5
+"""
+import argparse
+import os
+import tempfile
+import time
+import wave
+
+import numpy as np
+
+from benchmarks.transcription_benchmark import FakeRecognizer
+from tools.audio_preprocessing import preprocess_audio
+from tools.transcription import transcribe_audio
+
+FORMATS = [(16000, 1), (44100, 2), (48000, 1), (8000, 1)]
+
+
+def write_meeting_wav(path: str, minutes: float, sample_rate: int, channels: int, seed: int) -> float:
+    """Writes a synthetic meeting; returns the seconds of "speech" in it."""
+    rng = np.random.default_rng(seed)
+    total = int(minutes * 60 * sample_rate)
+    speech_seconds = 0.0
+    with wave.open(path, 'wb') as writer:
+        writer.setnchannels(channels)
+        writer.setsampwidth(2)
+        writer.setframerate(sample_rate)
+        written = 0
+        while written < total:
+            talk = int(rng.uniform(1.0, 8.0) * sample_rate)
+            pause = int(rng.choice([rng.uniform(0.3, 0.9), rng.uniform(1.5, 12.0)]) * sample_rate)
+            t = np.arange(talk) / sample_rate
+            envelope = 0.5 + 0.5 * np.abs(np.sin(2 * np.pi * rng.uniform(2, 5) * t))
+            voice = envelope * (3000 * np.sin(2 * np.pi * rng.uniform(120, 300) * t) + rng.normal(0, 800, talk))
+            silence = rng.normal(0, 20, pause)
+            block = np.concatenate([voice, silence])[:total - written]
+            speech_seconds += min(talk, len(block)) / sample_rate
+            samples = np.clip(block, -32768, 32767).astype('<i2')
+            writer.writeframes(np.repeat(samples, channels).tobytes())
+            written += len(block)
+    return speech_seconds
+
+
+def run(files: int, minutes: float, seconds_per_audio_second: float):
+    print(f"{'format':>10} {'audio s':>8} {'speech s':>8} {'sent s':>8} {'saved':>6} "
+          f"{'requests':>9} {'prep s':>7} {'wall s':>7} {'raw wall s':>10}")
+    totals = {"audio": 0.0, "sent": 0.0}
+    directory = tempfile.mkdtemp(prefix="preprocessing_benchmark_")
+    for index in range(files):
+        sample_rate, channels = FORMATS[index % len(FORMATS)]
+        path = os.path.join(directory, f"meeting_{index}.wav")
+        speech_seconds = write_meeting_wav(path, minutes, sample_rate, channels, seed=index)
+        try:
+            started = time.perf_counter()
+            prepared = preprocess_audio(path)
+            prep_seconds = time.perf_counter() - started
+            prepared.cleanup()
+
+            started = time.perf_counter()
+            trimmed = transcribe_audio(path, recognizer=FakeRecognizer(0.05, seconds_per_audio_second),
+                                       use_cache=False)
+            wall = time.perf_counter() - started
+
+            started = time.perf_counter()
+            raw = transcribe_audio(path, recognizer=FakeRecognizer(0.05, seconds_per_audio_second),
+                                   use_cache=False, preprocess=False)
+            raw_wall = time.perf_counter() - started
+        finally:
+            os.unlink(path)
+
+        if trimmed['status'] != 'success' or raw['status'] != 'success':
+            print(f"meeting_{index} failed: {trimmed.get('error_message') or raw.get('error_message')}")
+            continue
+
+        sent = trimmed['recognized_seconds']
+        totals["audio"] += trimmed['audio_seconds']
+        totals["sent"] += sent
+        print(f"{f'{sample_rate // 1000}k/{channels}ch':>10} {trimmed['audio_seconds']:>8.1f} {speech_seconds:>8.1f} "
+              f"{sent:>8.1f} {1 - sent / trimmed['audio_seconds']:>6.0%} "
+              f"{raw['segment_count']:>4}->{trimmed['segment_count']:<4} {prep_seconds:>7.2f} "
+              f"{wall:>7.2f} {raw_wall:>10.2f}")
+    os.rmdir(directory)
+
+    if totals["audio"]:
+        print(f"\nBilled audio reduced by {1 - totals['sent'] / totals['audio']:.0%} "
+              f"({totals['audio']:.0f}s -> {totals['sent']:.0f}s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=8)
+    parser.add_argument("--minutes", type=float, default=5)
+    parser.add_argument("--seconds-per-audio-second", type=float, default=0.01,
+                        help="Simulated recognizer latency per second of audio sent")
+    args = parser.parse_args()
+
+    run(args.files, args.minutes, args.seconds_per_audio_second)
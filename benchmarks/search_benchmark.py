@@ -0,0 +1,149 @@
+"""
+Latency of report search, and the size of its index, at ``--reports`` reports.
+
+Synthetic reports with transcripts of ``--transcript-words`` words (Zipf
+distributed, so some terms are in nearly every meeting and some in
+almost none) are saved with store_report. A fixed set of queries (rare,
+mid-frequency and common terms, phrases of several terms, transcript-only
+terms and facet filters) is then run through search_reports, and the
+median and 95th percentile latency of each are printed against the
+50 ms target.
+
+The transcripts are also indexed on their own twice, in an FTS5 table
+that stores them, as the search index did before, and in a contentless
+one, as it does now; the report files hold their own compressed copy.
+
+Usage:
+    python -m benchmarks.search_benchmark --reports 100000
+"""
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+from typing import List, Tuple
+
+TOPICS = ["budget", "hiring", "roadmap", "security", "onboarding", "pricing", "migration", "launch",
+          "retention", "compliance", "infrastructure", "partnerships", "support", "analytics", "design"]
+PEOPLE = ["Alice", "Bob", "Carol", "Dan", "Erin", "Frank", "Grace", "Heidi"]
+VOCABULARY_SIZE = 20000
+# Present in about one transcript in a thousand
+RARE_WORD = "zeppelin"
+TARGET_MS = 50.0
+
+QUERIES: List[Tuple[str, dict]] = [
+    ("zeppelin", {}),
+    ("budget", {}),
+    ("budget review", {}),
+    ("security compliance audit", {}),
+    ("word17", {}),
+    ("word3", {}),
+    ("word1", {}),
+    ("roadmap", {"assignee": "Alice"}),
+    ("pricing", {"priority": "high"}),
+    ("migration", {"attendee": "Grace"}),
+]
+
+
+def make_vocabulary() -> Tuple[List[str], List[float]]:
+    words = [f"word{rank}" for rank in range(1, VOCABULARY_SIZE + 1)]
+    return words, [1.0 / rank for rank in range(1, VOCABULARY_SIZE + 1)]
+
+
+def make_report(rng: random.Random, index: int, vocabulary: Tuple[List[str], List[float]],
+                transcript_words: int) -> Tuple[str, str]:
+    from models.schemas import ActionItem, MeetingReport
+
+    topic, other = rng.sample(TOPICS, 2)
+    attendees = rng.sample(PEOPLE, 4)
+    words = rng.choices(vocabulary[0], weights=vocabulary[1], k=transcript_words)
+    words[rng.randrange(len(words))] = topic
+    if rng.random() < 0.001:
+        words[rng.randrange(len(words))] = RARE_WORD
+    transcript = "\n".join(
+        f"{rng.choice(attendees)}: {' '.join(words[start:start + 20])}."
+        for start in range(0, len(words), 20)
+    )
+    report = MeetingReport(
+        meeting_title=f"{topic.title()} review {index}",
+        date="2025-06-01",
+        attendees=attendees,
+        summary=f"The team discussed {topic} and its effect on {other}.",
+        key_topics=[topic, other],
+        action_items=[
+            ActionItem(task=f"Follow up on {rng.choice([topic, other])} item {item}",
+                       assignee=rng.choice(attendees), deadline="Friday",
+                       priority=rng.choice(["high", "medium", "low"]))
+            for item in range(rng.randint(1, 4))
+        ],
+        decisions_made=[f"Keep the {other} plan"]
+    )
+    return report.model_dump_json(), transcript
+
+
+def transcript_index_bytes(transcripts_path: str, options: str = "") -> int:
+    """Size of an FTS5 table over the transcripts alone."""
+    path = f"transcripts{len(options)}.db"
+    conn = sqlite3.connect(path)
+    conn.execute(f"CREATE VIRTUAL TABLE t USING fts5(transcript, {options}tokenize = 'porter unicode61')")
+    with open(transcripts_path, 'r', encoding='utf-8') as f:
+        conn.executemany("INSERT INTO t (transcript) VALUES (?)", ((line.replace("\t", "\n"),) for line in f))
+    conn.commit()
+    conn.close()
+    return os.path.getsize(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reports", type=int, default=100000)
+    parser.add_argument("--transcript-words", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=20, help="Runs of each query")
+    args = parser.parse_args()
+
+    # Reports, indexes and telemetry stay in a scratch directory
+    scratch = tempfile.mkdtemp(prefix="search_benchmark_")
+    os.chdir(scratch)
+    from tools.local_storage import store_report
+    from tools.report_search import get_search_index
+
+    rng = random.Random(0)
+    vocabulary = make_vocabulary()
+    transcript_bytes = 0
+    started = time.perf_counter()
+    with open("transcripts.txt", 'w', encoding='utf-8') as transcripts:
+        for index in range(args.reports):
+            report_json, transcript = make_report(rng, index, vocabulary, args.transcript_words)
+            result = store_report(report_json, f"meeting_{index}", transcript=transcript)
+            if result["status"] != "success":
+                raise SystemExit(result["error_message"])
+            transcripts.write(transcript.replace("\n", "\t") + "\n")
+            transcript_bytes += len(transcript.encode("utf-8"))
+    save_ms = (time.perf_counter() - started) / args.reports * 1e3
+    print(f"{args.reports} reports saved, {save_ms:.2f} ms each including indexing")
+
+    index = get_search_index()
+    with sqlite3.connect(index.db_path) as conn:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    stored_bytes = transcript_index_bytes("transcripts.txt")
+    contentless_bytes = transcript_index_bytes("transcripts.txt", "content = '', ")
+    print(f"transcripts {transcript_bytes / 1e6:.1f} MB, index.db {os.path.getsize(index.db_path) / 1e6:.1f} MB; "
+          f"transcripts alone indexed stored {stored_bytes / 1e6:.1f} MB, contentless {contentless_bytes / 1e6:.1f} MB")
+
+    print(f"\n{'query':>28} {'facet':>18} {'hits':>5} {'p50 ms':>7} {'p95 ms':>7}")
+    worst = 0.0
+    for query, facets in QUERIES:
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            matches = index.search_reports(query, **facets)
+            timings.append((time.perf_counter() - started) * 1e3)
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        worst = max(worst, p95)
+        facet = ", ".join(f"{k}={v}" for k, v in facets.items())
+        print(f"{query:>28} {facet:>18} {len(matches):>5} {statistics.median(timings):>7.1f} {p95:>7.1f}")
+    print(f"\nslowest p95 {worst:.1f} ms ({'within' if worst <= TARGET_MS else 'over'} the {TARGET_MS:.0f} ms target)")
+    shutil.rmtree(scratch, ignore_errors=True)
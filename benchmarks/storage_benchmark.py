@@ -0,0 +1,110 @@
+"""
+Throughput of report and recording uploads against the filesystem-backed
+FakeStorageClient.
+
+A backfill of reports plus a few long recordings is uploaded three ways:
+- sequential: one upload and one signed URL per object, in turn, as
+  save_report_to_storage used to do;
+- uploader: GcsUploader, uploading in parallel with chunked resumable
+  uploads for the recordings and signing all URLs in one batch;
+- rerun: the same backfill again, where every object is unchanged and
+  every URL is still cached.
+
+With --failure-rate, a failed request costs the sequential path the whole
+object, while the uploader only sends the failed chunk again.
+
+Usage:
+    python -m benchmarks.storage_benchmark --reports 200 --recordings 4 --recording-mb 32
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from typing import List
+
+from benchmarks.fakes import DEFAULT_REPORT, FakeStorageClient
+
+BUCKET = "benchmark"
+
+
+def make_items(reports: int, recordings: int, recording_mb: int) -> List:
+    import json
+    from tools.gcs_uploader import UploadItem
+
+    items = [
+        UploadItem(f"reports/meeting_{index}.json", data=json.dumps({**DEFAULT_REPORT, "id": index}).encode(),
+                   content_type="application/json")
+        for index in range(reports)
+    ]
+    for index in range(recordings):
+        path = f"recording_{index}.wav"
+        with open(path, 'wb') as f:
+            for _ in range(recording_mb):
+                f.write(os.urandom(1024 * 1024))
+        items.append(UploadItem(f"audio/{path}", path=path, content_type="audio/wav"))
+    return items
+
+
+def run_sequential(client: FakeStorageClient, items: List) -> None:
+    from tools.clients import STORAGE
+    from tools.rate_limit import call_with_retry
+
+    bucket = client.bucket(BUCKET)
+    for item in items:
+        blob = bucket.blob(item.name)
+        if item.data is not None:
+            call_with_retry(STORAGE, blob.upload_from_string, item.data, content_type=item.content_type)
+        else:
+            call_with_retry(STORAGE, blob.upload_from_filename, item.path, content_type=item.content_type)
+        blob.generate_signed_url(version="v4", expiration=timedelta(days=7), method="GET")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reports", type=int, default=200)
+    parser.add_argument("--recordings", type=int, default=4)
+    parser.add_argument("--recording-mb", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.03, help="Seconds per request")
+    parser.add_argument("--mb-per-second", type=float, default=100.0, help="Upload bandwidth per request")
+    parser.add_argument("--failure-rate", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    from tools.clients import STORAGE, get_client_registry
+    from tools.gcs_uploader import ERROR, UNCHANGED, GcsUploader
+
+    # Recordings, stored objects and state files stay in a scratch directory
+    scratch = tempfile.mkdtemp(prefix="storage_benchmark_")
+    os.chdir(scratch)
+    items = make_items(args.reports, args.recordings, args.recording_mb)
+    total_mb = sum(len(i.data) if i.data is not None else os.path.getsize(i.path) for i in items) / 1e6
+
+    def fake(seed: int, root: str) -> FakeStorageClient:
+        return FakeStorageClient(args.latency, seconds_per_byte=1 / (args.mb_per_second * 1e6),
+                                 failure_rate=args.failure_rate, seed=seed, root=root)
+
+    print(f"{len(items)} objects, {total_mb:.0f} MB")
+    print(f"{'mode':>10} {'seconds':>8} {'requests':>9} {'chunk retries':>14} {'unchanged':>10} {'signed':>7}")
+    sequential = fake(1, "sequential")
+    with get_client_registry().override(STORAGE, sequential):
+        started = time.perf_counter()
+        run_sequential(sequential, items)
+        seconds = time.perf_counter() - started
+    print(f"{'sequential':>10} {seconds:>8.2f} {sequential.faults.calls:>9} {0:>14} {0:>10} {sequential.signed:>7}")
+
+    parallel = fake(2, "uploader")
+    uploader = GcsUploader(BUCKET, max_workers=args.workers, state_path="state.db")
+    with get_client_registry().override(STORAGE, parallel):
+        for mode in ("uploader", "rerun"):
+            calls, signed = parallel.faults.calls, parallel.signed
+            started = time.perf_counter()
+            results = uploader.upload_many(items)
+            seconds = time.perf_counter() - started
+            errors = [r for r in results if r["status"] == ERROR]
+            assert not errors, errors[:3]
+            unchanged = sum(r["status"] == UNCHANGED for r in results)
+            print(f"{mode:>10} {seconds:>8.2f} {parallel.faults.calls - calls:>9} {parallel.chunk_retries:>14} "
+                  f"{unchanged:>10} {parallel.signed - signed:>7}")
+    shutil.rmtree(scratch, ignore_errors=True)
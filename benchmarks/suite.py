@@ -0,0 +1,263 @@
+"""
+End-to-end benchmark suite for the meeting pipeline, fully offline.
+
+Every external service is replaced by a fake from benchmarks.fakes:
+Speech-to-Text, the Gemini model, Cloud Storage and SendGrid. Each
+workload runs the production path: preprocessing, segmented
+transcription, analysis through the root workflow (or map-reduce) and
+the report sinks. The suite records per-stage latency percentiles,
+throughput, fake-service call counts and peak memory.
+
+Results are printed as JSON (or written with --output) together with the
+commit they were measured on. Pass an earlier result file to --compare
+to print the change per workload.
+
+Usage:
+    python -m benchmarks.suite --output bench.json
+    python -m benchmarks.suite --workloads short batch-8 --failure-rate 0.05
+    python -m benchmarks.suite --scale 0.25 --compare bench.json
+    python -m benchmarks.suite --workloads batch-32 --speech-quota 5 --model-quota 2
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from benchmarks.fakes import FakeGemini, FakeRecognizer, FakeSendGridClient, FakeStorageClient, install_fakes
+from benchmarks.preprocessing_benchmark import write_meeting_wav
+from batch_process import percentile
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Workload(NamedTuple):
+    """One benchmark scenario."""
+    files: int
+    minutes: float
+    concurrency: int = 1
+    map_reduce_threshold_tokens: Optional[int] = None
+    window_tokens: Optional[int] = None
+
+
+WORKLOADS: Dict[str, Workload] = {
+    "short": Workload(files=3, minutes=2),
+    "long": Workload(files=1, minutes=45),
+    "long-windowed": Workload(files=1, minutes=45, map_reduce_threshold_tokens=200, window_tokens=1000),
+    "batch-8": Workload(files=8, minutes=3, concurrency=4),
+    "batch-32": Workload(files=32, minutes=1, concurrency=8),
+}
+DEFAULT_WORKLOADS = ["short", "long", "long-windowed", "batch-8"]
+
+
+def _stage_summary(values: List[float]) -> Dict[str, float]:
+    return {
+        "p50": round(percentile(values, 0.50), 4),
+        "p95": round(percentile(values, 0.95), 4),
+        "p99": round(percentile(values, 0.99), 4),
+        "mean": round(sum(values) / len(values), 4) if values else 0.0,
+    }
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_workload(name: str, workload: Workload, args: argparse.Namespace) -> Dict[str, Any]:
+    from google.adk.runners import Runner
+    from agents.analysis import APP_NAME, analyze_transcript
+    from agents.map_reduce import MAP_REDUCE_THRESHOLD_TOKENS, WINDOW_TOKENS
+    from agents.workflow import root_agent
+    from services.memory_service import PersistentMemoryService
+    from services.session_service import PersistentSessionService
+    from tools.email_outbox import get_email_outbox
+    from tools.telemetry import TelemetryPlugin
+    from tools.transcription import transcribe_audio
+
+    scale, failure_rate = args.latency_scale, args.failure_rate
+    fakes = dict(
+        speech=FakeRecognizer(0.15 * scale, 0.01 * scale, failure_rate, jitter=0.05 * scale, seed=1,
+                              quota_per_second=args.speech_quota),
+        model=FakeGemini(model="fake-gemini", first_token_latency=0.6 * scale,
+                         seconds_per_output_token=0.004 * scale, failure_rate=failure_rate, seed=2,
+                         quota_per_second=args.model_quota),
+        storage=FakeStorageClient(0.08 * scale, failure_rate=failure_rate, jitter=0.04 * scale, seed=3),
+        sendgrid=FakeSendGridClient(0.2 * scale, failure_rate=failure_rate, jitter=0.1 * scale, seed=4),
+    )
+
+    paths = []
+    for index in range(workload.files):
+        path = os.path.join("audio", f"{name}_{index}.wav")
+        write_meeting_wav(path, workload.minutes * args.scale, 16000, 1, seed=index)
+        paths.append(path)
+
+    session_service = PersistentSessionService()
+    runner = Runner(
+        agent=root_agent,
+        app_name=APP_NAME,
+        session_service=session_service,
+        memory_service=PersistentMemoryService(),
+        plugins=[TelemetryPlugin()]
+    )
+    threshold = workload.map_reduce_threshold_tokens or MAP_REDUCE_THRESHOLD_TOKENS
+    window_tokens = workload.window_tokens or WINDOW_TOKENS
+    timings: Dict[str, List[float]] = {"transcribe": [], "analyze": [], "total": []}
+    audio_seconds = 0.0
+    failures: List[str] = []
+    semaphore = asyncio.Semaphore(workload.concurrency)
+
+    async def process(path: str) -> None:
+        nonlocal audio_seconds
+        async with semaphore:
+            started = time.perf_counter()
+            transcription = await asyncio.to_thread(transcribe_audio, path, use_cache=False)
+            transcribed = time.perf_counter()
+            if transcription["status"] != "success":
+                failures.append(f"transcribe: {transcription.get('error_message')}")
+                return
+            try:
+                await analyze_transcript(
+                    runner,
+                    session_service,
+                    transcription["transcript"],
+                    session_id=uuid.uuid4().hex,
+                    meeting_title="Benchmark meeting",
+                    cache=None,
+                    map_reduce_threshold_tokens=threshold,
+                    window_tokens=window_tokens
+                )
+            except Exception as e:
+                failures.append(f"analyze: {e}")
+                return
+            finished = time.perf_counter()
+            timings["transcribe"].append(transcribed - started)
+            timings["analyze"].append(finished - transcribed)
+            timings["total"].append(finished - started)
+            audio_seconds += transcription["audio_seconds"]
+
+    if not args.no_tracemalloc:
+        tracemalloc.start()
+    started = time.perf_counter()
+    with install_fakes(**fakes) as installed:
+        await asyncio.gather(*(process(path) for path in paths))
+        await asyncio.to_thread(get_email_outbox().drain)
+    wall = time.perf_counter() - started
+    traced_peak = tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else None
+    tracemalloc.stop()
+
+    for path in paths:
+        os.unlink(path)
+
+    completed = len(timings["total"])
+    return {
+        "workload": workload._asdict(),
+        "files": len(paths),
+        "completed": completed,
+        "failed": len(failures),
+        "errors": sorted(set(failures))[:5],
+        "wall_seconds": round(wall, 3),
+        "files_per_minute": round(completed / wall * 60, 2) if wall else 0.0,
+        "audio_hours_per_hour": round(audio_seconds / wall, 2) if wall else 0.0,
+        "stages": {stage: _stage_summary(values) for stage, values in timings.items()},
+        "service_calls": {
+            name: {"calls": fake.faults.calls, "injected_failures": fake.faults.failures,
+                   "throttled": fake.faults.throttled}
+            for name, fake in installed.items()
+        },
+        "peak_traced_mb": round(traced_peak / 1e6, 1) if traced_peak is not None else None,
+        # Process high-water mark so far; ru_maxrss is KiB on Linux, bytes on macOS
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                             / (1e6 if sys.platform == "darwin" else 1e3), 1),
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]) -> None:
+    """Prints how each shared workload moved against a baseline result."""
+    print(f"\nvs {baseline.get('commit') or 'baseline'}:")
+    print(f"{'workload':>14} {'metric':>22} {'before':>10} {'after':>10} {'change':>8}")
+    for name, after in current["workloads"].items():
+        before = baseline.get("workloads", {}).get(name)
+        if before is None:
+            continue
+        metrics = [("files_per_minute", before["files_per_minute"], after["files_per_minute"])]
+        # Latencies of a workload where nothing completed are meaningless
+        for stage in (after["stages"] if before["completed"] and after["completed"] else []):
+            for key in ("p50", "p95"):
+                metrics.append((f"{stage} {key} s", before["stages"][stage][key], after["stages"][stage][key]))
+        metrics.append(("peak_traced_mb", before.get("peak_traced_mb"), after.get("peak_traced_mb")))
+        for metric, old, new in metrics:
+            if old is None or new is None:
+                continue
+            change = f"{(new - old) / old:+.0%}" if old else "n/a"
+            print(f"{name:>14} {metric:>22} {old:>10} {new:>10} {change:>8}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workloads", nargs="+", choices=sorted(WORKLOADS), default=DEFAULT_WORKLOADS)
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier on recording length")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Multiplier on fake service latency")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Failure probability of every fake call")
+    parser.add_argument("--speech-quota", type=float, default=0.0,
+                        help="Speech requests per second the fake accepts before answering 429 (0: unlimited)")
+    parser.add_argument("--model-quota", type=float, default=0.0,
+                        help="Model requests per second the fake accepts before answering 429 (0: unlimited)")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="Skip traced peak memory (lower overhead)")
+    parser.add_argument("--output", help="Write the JSON result here instead of stdout")
+    parser.add_argument("--compare", help="Earlier result file to compare against")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    output = os.path.abspath(args.output) if args.output else None
+
+    # Everything the pipeline writes (reports, sessions, caches) stays here
+    os.chdir(tempfile.mkdtemp(prefix="lecturelink_bench_"))
+    os.makedirs("audio")
+    os.environ.update({
+        "GCS_BUCKET_NAME": "benchmark-bucket",
+        "SENDGRID_API_KEY": "benchmark",
+        "REPORT_EMAIL_RECIPIENTS": "team@example.com",
+    })
+
+    result = {
+        "commit": _commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        "workloads": {},
+    }
+    for name in args.workloads:
+        result["workloads"][name] = asyncio.run(run_workload(name, WORKLOADS[name], args))
+
+    text = json.dumps(result, indent=2)
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if baseline is not None:
+        compare(baseline, result)
+
+    failed = sum(w["failed"] for w in result["workloads"].values())
+    return 0 if args.failure_rate or failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
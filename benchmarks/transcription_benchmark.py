@@ -0,0 +1,71 @@
+"""
+Throughput benchmark for the chunked transcription engine.
+
+Runs transcribe_audio against a local fake recognizer on synthetic
+recordings and reports the real-time factor (wall time / audio time)
+against segment count and worker pool size.
+
+Usage:
+    python -m benchmarks.transcription_benchmark --minutes 10 30 60
+"""
+import argparse
+import array
+import os
+import tempfile
+import time
+import wave
+
+from benchmarks.fakes import WORD_SECONDS, FakeRecognizer
+from tools.transcription import transcribe_audio
+
+SAMPLE_RATE = 16000
+WORD_FRAMES = int(SAMPLE_RATE * WORD_SECONDS)
+
+
+def write_synthetic_wav(path: str, minutes: float) -> int:
+    """Writes a mono LINEAR16 recording block by block; returns its word count."""
+    word_count = int(minutes * 60 / WORD_SECONDS)
+    with wave.open(path, 'wb') as writer:
+        writer.setnchannels(1)
+        writer.setsampwidth(2)
+        writer.setframerate(SAMPLE_RATE)
+        for index in range(word_count):
+            writer.writeframes(array.array('h', [index % 32767] * WORD_FRAMES).tobytes())
+    return word_count
+
+
+def run(minutes_list, workers_list, base_latency, seconds_per_audio_second):
+    print(f"{'audio min':>9} {'workers':>7} {'segments':>8} {'wall s':>8} {'RTF':>8} {'words ok':>8}")
+    for minutes in minutes_list:
+        fd, path = tempfile.mkstemp(suffix='.wav')
+        os.close(fd)
+        try:
+            expected = write_synthetic_wav(path, minutes)
+            for workers in workers_list:
+                recognizer = FakeRecognizer(base_latency, seconds_per_audio_second)
+                started = time.perf_counter()
+                result = transcribe_audio(path, recognizer=recognizer, max_workers=workers,
+                                          use_cache=False, preprocess=False)
+                elapsed = time.perf_counter() - started
+
+                if result['status'] != 'success':
+                    print(f"{minutes:>9} {workers:>7} failed: {result['error_message']}")
+                    continue
+
+                words_ok = len(result['words']['text']) == expected
+                rtf = elapsed / result['audio_seconds']
+                print(f"{minutes:>9} {workers:>7} {result['segment_count']:>8} "
+                      f"{elapsed:>8.2f} {rtf:>8.4f} {str(words_ok):>8}")
+        finally:
+            os.unlink(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, nargs="+", default=[5, 30, 60])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--base-latency", type=float, default=0.05)
+    parser.add_argument("--seconds-per-audio-second", type=float, default=0.01)
+    args = parser.parse_args()
+
+    run(args.minutes, args.workers, args.base_latency, args.seconds_per_audio_second)
@@ -0,0 +1,105 @@
+"""
+End-to-end benchmark of the meeting workflow's delivery stage.
+
+Compares the previous two-agent workflow (analyst, then an LLM action
+agent that calls save_report_locally) against the analyst followed by
+the deterministic ReportSinkAgent. Both run through a real ADK Runner;
+only the model is replaced by a local fake whose latency and token
+counts scale with prompt and response size, so the numbers show the
+cost of the extra round-trip rather than network noise.
+
+Reports are written under a temporary directory.
+
+Usage:
+    python -m benchmarks.workflow_benchmark --runs 5 --sink-latency 0.2
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from typing import Dict
+
+from google.adk.agents import SequentialAgent
+from google.adk.models import BaseLlm
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from agents.action_agent.agent import action_agent
+from agents.analysis import build_user_message
+from agents.analyst_agent.agent import analyst_agent
+from agents.sink_agent.agent import ReportSinkAgent
+from agents.sink_agent.sinks import Delivery, local_sink
+from benchmarks.fakes import FakeGemini
+
+
+def _remote_sink(latency: float):
+    def sink(delivery: Delivery) -> Dict[str, str]:
+        time.sleep(latency)
+        return {"status": "success", "message": f"Delivered {delivery.meeting_id}"}
+    return sink
+
+
+def build_workflows(model: BaseLlm, sink_latency: float) -> Dict[str, SequentialAgent]:
+    sinks = {"local": local_sink, "gcs": _remote_sink(sink_latency), "email": _remote_sink(sink_latency)}
+    return {
+        "llm action agent": SequentialAgent(
+            name="two_agent_workflow",
+            sub_agents=[analyst_agent.clone(update={"model": model}), action_agent.clone(update={"model": model})]
+        ),
+        "sink agent": SequentialAgent(
+            name="sink_workflow",
+            sub_agents=[
+                analyst_agent.clone(update={"model": model}),
+                ReportSinkAgent(name="meeting_report_sinks", sinks=sinks)
+            ]
+        ),
+    }
+
+
+async def run_once(runner: Runner, sessions: InMemorySessionService, message: str) -> Dict[str, float]:
+    session = await sessions.create_session(app_name="benchmark", user_id="bench")
+    calls = tokens = 0
+    started = time.perf_counter()
+    async for event in runner.run_async(
+        user_id="bench",
+        session_id=session.id,
+        new_message=types.Content(role="user", parts=[types.Part(text=message)])
+    ):
+        if event.usage_metadata:
+            calls += 1
+            tokens += event.usage_metadata.total_token_count or 0
+    return {"seconds": time.perf_counter() - started, "calls": calls, "tokens": tokens}
+
+
+async def run(runs: int, transcript_words: int, first_token_latency: float, sink_latency: float):
+    transcript = "\n".join(
+        f"{'Alice' if i % 2 else 'Bob'}: " + " ".join(f"word{j}" for j in range(20))
+        for i in range(max(1, transcript_words // 20))
+    )
+    message = build_user_message(transcript, "Quarterly Planning", ["Alice", "Bob", "Carol"])
+    model = FakeGemini(model="fake-gemini", first_token_latency=first_token_latency)
+
+    print(f"{'workflow':>16} {'p50 s':>8} {'max s':>8} {'LLM calls':>9} {'tokens':>8}")
+    for name, workflow in build_workflows(model, sink_latency).items():
+        sessions = InMemorySessionService()
+        runner = Runner(agent=workflow, app_name="benchmark", session_service=sessions)
+        results = [await run_once(runner, sessions, message) for _ in range(runs)]
+        seconds = [r["seconds"] for r in results]
+        print(f"{name:>16} {statistics.median(seconds):>8.3f} {max(seconds):>8.3f} "
+              f"{results[0]['calls']:>9} {results[0]['tokens']:>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--transcript-words", type=int, default=6000)
+    parser.add_argument("--first-token-latency", type=float, default=0.4)
+    parser.add_argument("--sink-latency", type=float, default=0.2,
+                        help="Simulated latency of the GCS and email sinks")
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix="workflow_benchmark_"))
+    asyncio.run(run(args.runs, args.transcript_words, args.first_token_latency, args.sink_latency))
@@ -0,0 +1,90 @@
+"""
+Live transcription and analysis of a meeting in progress.
+
+Follows a recording while it is being written, or listens on a local TCP
+port for LINEAR16 audio (a WAV stream or raw 16-bit PCM at --sample-rate),
+and prints the running report as it is updated. The meeting ends when the
+file stops growing, the sender disconnects, or on Ctrl+C; the final report
+is then saved like any other.
+
+Usage:
+    python live_meeting.py --file recording.wav --title "Weekly sync"
+    python live_meeting.py --listen 127.0.0.1:8765
+    ffmpeg -f pulse -i default -ac 1 -ar 16000 -f s16le - | nc 127.0.0.1 8765
+"""
+import argparse
+import asyncio
+import json
+import signal
+import sys
+from typing import Any, Dict, List, Optional
+from dotenv import load_dotenv
+
+
+def _print_update(update: Dict[str, Any]) -> None:
+    report = update["report"]
+    print(f"[{update['audio_seconds']:7.1f}s] {len(report.key_topics)} topics, "
+          f"{len(report.action_items)} action items, {len(report.decisions_made)} decisions",
+          file=sys.stderr)
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    from services.live_meeting import run_live_meeting
+    from tools.live_transcription import GrowingFileSource, SocketSource
+
+    if args.file:
+        source = GrowingFileSource(args.file, args.sample_rate, args.channels, idle_timeout=args.idle_timeout)
+        print(f"following {args.file}", file=sys.stderr)
+    else:
+        host, _, port = args.listen.rpartition(":")
+        source = SocketSource(host or "127.0.0.1", int(port), args.sample_rate, args.channels)
+        print(f"listening on {source.address[0]}:{source.address[1]}", file=sys.stderr)
+
+    # Ctrl+C ends the meeting; the audio received so far is still reported
+    asyncio.get_running_loop().add_signal_handler(signal.SIGINT, source.stop)
+    result = await run_live_meeting(
+        source,
+        meeting_title=args.title,
+        attendees=args.attendees,
+        update_interval=args.update_interval,
+        on_update=_print_update,
+        save=not args.no_save
+    )
+    transcription = result["transcription"]
+    return {
+        "report": result["report"].model_dump(),
+        "response": result["response"],
+        "audio_seconds": round(transcription["audio_seconds"], 1),
+        "recognized_seconds": round(transcription["recognized_seconds"], 1),
+        "updates": result["updates"],
+        "finalize_seconds": round(result["finalize_seconds"], 2),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    where = parser.add_mutually_exclusive_group(required=True)
+    where.add_argument("--file", help="Recording that is still being written")
+    where.add_argument("--listen", help="HOST:PORT to accept one audio stream on")
+    parser.add_argument("--title", help="Meeting title")
+    parser.add_argument("--attendees", nargs="*", help="Attendee names")
+    parser.add_argument("--sample-rate", type=int, default=16000, help="Rate of headerless PCM")
+    parser.add_argument("--channels", type=int, default=1, help="Channels of headerless PCM")
+    parser.add_argument("--idle-timeout", type=float, default=15.0,
+                        help="Seconds without growth after which a followed file has ended")
+    parser.add_argument("--update-interval", type=float, default=5.0, help="Seconds between report updates")
+    parser.add_argument("--no-save", action="store_true", help="Print the final report without saving it")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    result = asyncio.run(run(args))
+    if not args.no_save:
+        # The report email is sent in the background; deliver it before exiting
+        from tools.email_outbox import get_email_outbox
+        get_email_outbox().drain()
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
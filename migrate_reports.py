@@ -0,0 +1,99 @@
+"""
+Converts reports saved as JSON into the compact report format.
+
+Each reports/*.json file is validated against MeetingReport and rewritten
+as reports/<meeting_id>.llr together with its indexed session, save time
+and transcript; the index then points at the new file. Files that do not
+validate are left untouched and listed. Once no JSON report is left, the
+old search table that held their transcripts is dropped.
+
+Usage:
+    python migrate_reports.py             # convert, keep the JSON files
+    python migrate_reports.py --delete    # convert and remove them
+    python migrate_reports.py --dry-run   # only report what would happen
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Any, Dict, List, Optional
+from models.schemas import MeetingReport
+from tools.report_format import REPORT_EXTENSION, encode_report, write_report_file
+from tools.report_search import ReportSearchIndex
+from tools.report_store import REPORTS_DIR, ReportStore
+
+
+def migrate_reports(reports_dir: str = REPORTS_DIR, delete: bool = False, dry_run: bool = False) -> Dict[str, Any]:
+    """
+    Rewrites every JSON report of ``reports_dir`` in the compact format.
+
+    Args:
+        reports_dir: Directory holding the reports and their index
+        delete: Remove each JSON file once its replacement is indexed
+        dry_run: Validate and measure without writing anything
+
+    Returns:
+        Counts, sizes and the files that failed validation
+    """
+    store = ReportStore(reports_dir)
+    search = ReportSearchIndex(store)
+    migrated = 0
+    json_bytes = compact_bytes = 0
+    invalid: List[Dict[str, str]] = []
+
+    for name in sorted(os.listdir(reports_dir)):
+        if not name.endswith('.json'):
+            continue
+        meeting_id = name[:-len('.json')]
+        path = os.path.join(reports_dir, name)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                report = MeetingReport.model_validate_json(f.read())
+        except (OSError, ValueError) as e:
+            invalid.append({"path": path, "error": str(e).splitlines()[0]})
+            continue
+
+        entry = store.get(meeting_id)
+        session_id = entry["session_id"] if entry else None
+        created_at = entry["created_at"] if entry else os.path.getmtime(path)
+        transcript = search.transcript(meeting_id)
+        json_bytes += os.path.getsize(path)
+        compact_bytes += len(encode_report(report, transcript, session_id, created_at))
+        migrated += 1
+        if dry_run:
+            continue
+
+        target = os.path.abspath(os.path.join(reports_dir, meeting_id + REPORT_EXTENSION))
+        write_report_file(target, report, transcript, session_id, created_at)
+        store.add(meeting_id, target, report.model_dump(), session_id=session_id, created_at=created_at)
+        if delete:
+            os.unlink(path)
+
+    if not dry_run:
+        search.drop_legacy_text()
+    return {
+        "migrated": migrated,
+        "invalid": invalid,
+        "json_bytes": json_bytes,
+        "compact_bytes": compact_bytes,
+        "dry_run": dry_run,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reports-dir", default=REPORTS_DIR)
+    parser.add_argument("--delete", action="store_true", help="Remove JSON files once converted")
+    parser.add_argument("--dry-run", action="store_true", help="Validate and measure only")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.reports_dir):
+        print(f"No reports directory at {args.reports_dir}", file=sys.stderr)
+        return 0
+    result = migrate_reports(args.reports_dir, delete=args.delete, dry_run=args.dry_run)
+    print(json.dumps(result, indent=2))
+    return 0 if not result["invalid"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,478 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+QUEUE_PATH = ".jobs/queue.db"
+
+# Running jobs whose worker has not reported for this long are requeued
+STALE_AFTER_SECONDS = 300
+# A running job's heartbeat is refreshed this often, whether or not its
+# handler reports progress
+HEARTBEAT_INTERVAL = 30
+# A job whose worker went silent this many times is failed, not requeued
+MAX_ATTEMPTS = 3
+# Finished jobs are kept this long so callers can still read the outcome
+KEEP_FINISHED_SECONDS = 24 * 3600
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+# A waiter sharing the work of an identical in-flight job (its leader)
+ATTACHED = "attached"
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+ACTIVE_STATES = (QUEUED, RUNNING, ATTACHED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    result TEXT,
+    partial TEXT,
+    error TEXT,
+    progress REAL NOT NULL DEFAULT 0,
+    message TEXT NOT NULL DEFAULT '',
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker_id TEXT,
+    leader_id TEXT,
+    dedup_key TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    heartbeat_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs (status, created_at);
+"""
+
+# Columns added after the first release, for queue files created before them
+_ADDED_COLUMNS = {"leader_id": "TEXT", "dedup_key": "TEXT"}
+
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_jobs_dedup ON jobs (dedup_key, status);
+CREATE INDEX IF NOT EXISTS idx_jobs_leader ON jobs (leader_id, status);
+CREATE INDEX IF NOT EXISTS idx_jobs_finished ON jobs (finished_at);
+"""
+
+
+def _placeholders(values: Tuple[str, ...]) -> str:
+    """Parameter list "(?, ?, ...)" for an IN clause over values."""
+    return f"({', '.join('?' * len(values))})"
+
+
+# Copies a finished leader's outcome onto the waiters still attached to it
+_SETTLE_WAITERS = f"""
+UPDATE jobs SET (status, result, error, progress, finished_at) = (
+    SELECT leader.status, leader.result, leader.error, leader.progress, leader.finished_at
+    FROM jobs AS leader WHERE leader.id = jobs.leader_id
+)
+WHERE status = ?
+  AND leader_id IN (SELECT id FROM jobs WHERE status IN {_placeholders(FINISHED_STATES)})
+"""
+_SETTLE_WAITERS_PARAMS = (ATTACHED, *FINISHED_STATES)
+
+
+class JobCancelled(Exception):
+    """Raised inside a job handler once cancellation has been requested."""
+
+
+def _decode(row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+    if row is None:
+        return None
+    job = dict(row)
+    for key in ("payload", "result", "partial"):
+        job[key] = json.loads(job[key]) if job[key] else None
+    return job
+
+
+class JobQueue:
+    """
+    Durable SQLite-backed job queue shared by the app and worker processes.
+
+    The app submits jobs and polls their status; workers claim queued jobs
+    one at a time, keep them alive with a heartbeat, report progress and
+    record the outcome. Only the worker holding a job can finish it, so a
+    worker whose job was requeued cannot overwrite the next run's outcome.
+    Cancellation is cooperative: queued jobs are
+    cancelled immediately, running ones are flagged and stop at the
+    handler's next progress report.
+
+    Jobs submitted with a ``dedup_key`` are coalesced: while a job with
+    the same key is queued or running, a new submission only adds a
+    waiter (status ATTACHED) that mirrors the leader's progress and gets
+    its outcome. The first submission is a waiter too, so every caller
+    can cancel independently; the leader itself is cancelled only once
+    its last waiter is gone.
+    """
+
+    def __init__(self, path: str = QUEUE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            existing = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column, column_type in _ADDED_COLUMNS.items():
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+            conn.executescript(_INDEXES)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def submit(self, kind: str, payload: Dict[str, Any], dedup_key: Optional[str] = None) -> str:
+        """
+        Adds a job to the queue.
+
+        Args:
+            kind: Handler name understood by the workers
+            payload: JSON-serializable job arguments
+            dedup_key: Identifies identical work; a submission whose key
+                matches a queued or running job shares that job instead
+                of queueing another
+
+        Returns:
+            The new job id (a waiter id when dedup_key is given)
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            if dedup_key is None:
+                conn.execute(
+                    "INSERT INTO jobs (id, kind, status, payload, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (job_id, kind, QUEUED, json.dumps(payload), now)
+                )
+                return job_id
+
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                leader = conn.execute(
+                    """
+                    SELECT id FROM jobs
+                    WHERE dedup_key = ? AND kind = ? AND status IN (?, ?) AND cancel_requested = 0
+                    ORDER BY created_at LIMIT 1
+                    """,
+                    (dedup_key, kind, QUEUED, RUNNING)
+                ).fetchone()
+                if leader is None:
+                    leader_id = uuid.uuid4().hex
+                    conn.execute(
+                        """
+                        INSERT INTO jobs (id, kind, status, payload, dedup_key, created_at)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                        """,
+                        (leader_id, kind, QUEUED, json.dumps(payload), dedup_key, now)
+                    )
+                else:
+                    leader_id = leader["id"]
+                conn.execute(
+                    """
+                    INSERT INTO jobs (id, kind, status, payload, leader_id, dedup_key, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (job_id, kind, ATTACHED, json.dumps(payload), leader_id, dedup_key, now)
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the current state of a job, or None if unknown.
+
+        A waiter reports the status, progress and partial result of the
+        job it is attached to, under its own id.
+        """
+        with self._connect() as conn:
+            job = _decode(conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+            if job is None or job["status"] != ATTACHED:
+                return job
+            leader = _decode(conn.execute("SELECT * FROM jobs WHERE id = ?", (job["leader_id"],)).fetchone())
+        if leader is not None:
+            for key in ("status", "progress", "message", "partial", "result", "error", "started_at"):
+                job[key] = leader[key]
+        return job
+
+    def waiters(self, job_id: str) -> int:
+        """Returns how many callers are still waiting on a job."""
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE leader_id = ? AND status = ?", (job_id, ATTACHED)
+            ).fetchone()[0]
+
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Atomically moves the oldest queued job to running for this worker.
+
+        Args:
+            worker_id: Identifier of the claiming worker
+
+        Returns:
+            The claimed job, or None when the queue is empty
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT id FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                conn.execute(
+                    """
+                    UPDATE jobs SET status = ?, worker_id = ?, started_at = ?, heartbeat_at = ?,
+                                    attempts = attempts + 1
+                    WHERE id = ?
+                    """,
+                    (RUNNING, worker_id, now, now, row["id"])
+                )
+                job = _decode(conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone())
+                conn.execute("COMMIT")
+                return job
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def report_progress(
+        self,
+        job_id: str,
+        progress: float,
+        message: str = "",
+        partial: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Records progress of a running job and refreshes its heartbeat.
+
+        Raises:
+            JobCancelled: If cancellation was requested for the job
+        """
+        with self._connect() as conn:
+            conn.execute(
+                """
+                UPDATE jobs SET progress = ?, message = ?, heartbeat_at = ?,
+                                partial = COALESCE(?, partial)
+                WHERE id = ? AND status = ?
+                """,
+                (progress, message, time.time(), json.dumps(partial) if partial is not None else None,
+                 job_id, RUNNING)
+            )
+            row = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is not None and row["cancel_requested"]:
+            raise JobCancelled(job_id)
+
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """
+        Refreshes the heartbeat of a running job held by worker_id.
+
+        Returns:
+            False if the worker no longer holds the job
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND worker_id = ? AND status = ?",
+                (time.time(), job_id, worker_id, RUNNING)
+            )
+        return cursor.rowcount > 0
+
+    @contextmanager
+    def keep_alive(self, job_id: str, worker_id: str, interval: float = HEARTBEAT_INTERVAL) -> Iterator[None]:
+        """
+        Refreshes a job's heartbeat from a background thread while the block runs.
+
+        A handler can then wait on a rate limit or a slow call for longer
+        than STALE_AFTER_SECONDS without its job being requeued.
+        """
+        stop = threading.Event()
+
+        def beat() -> None:
+            while not stop.wait(interval):
+                try:
+                    self.heartbeat(job_id, worker_id)
+                except sqlite3.Error:
+                    pass  # The next beat tries again
+
+        thread = threading.Thread(target=beat, name=f"heartbeat-{job_id}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def complete(self, job_id: str, worker_id: str, result: Dict[str, Any]) -> bool:
+        return self._finish(job_id, worker_id, SUCCEEDED, result=json.dumps(result), progress=1.0)
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> bool:
+        return self._finish(job_id, worker_id, FAILED, error=error)
+
+    def mark_cancelled(self, job_id: str, worker_id: str) -> bool:
+        return self._finish(job_id, worker_id, CANCELLED)
+
+    def _finish(self, job_id: str, worker_id: str, status: str, result: Optional[str] = None,
+                error: Optional[str] = None, progress: Optional[float] = None) -> bool:
+        """Records the outcome of a running job; False if worker_id no longer holds it."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = conn.execute(
+                    """
+                    UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?,
+                                    progress = COALESCE(?, progress)
+                    WHERE id = ? AND status = ? AND worker_id = ?
+                    """,
+                    (status, result, error, time.time(), progress, job_id, RUNNING, worker_id)
+                )
+                conn.execute(_SETTLE_WAITERS, _SETTLE_WAITERS_PARAMS)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return cursor.rowcount > 0
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Requests cancellation of a job.
+
+        Cancelling a waiter detaches only that waiter; the shared job is
+        cancelled once no waiter is left.
+
+        Args:
+            job_id: Job to cancel
+
+        Returns:
+            False if the job had already finished
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT status, leader_id FROM jobs WHERE id = ?", (job_id,)).fetchone()
+                if row is None or row["status"] in FINISHED_STATES:
+                    conn.execute("COMMIT")
+                    return False
+                if row["status"] == ATTACHED:
+                    conn.execute("UPDATE jobs SET status = ?, finished_at = ? WHERE id = ?", (CANCELLED, now, job_id))
+                    remaining = conn.execute(
+                        "SELECT COUNT(*) FROM jobs WHERE leader_id = ? AND status = ?", (row["leader_id"], ATTACHED)
+                    ).fetchone()[0]
+                    if remaining:
+                        conn.execute("COMMIT")
+                        return True
+                    job_id = row["leader_id"]
+                    row = conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+                if row["status"] == QUEUED:
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ?",
+                        (CANCELLED, now, job_id)
+                    )
+                    conn.execute(_SETTLE_WAITERS, _SETTLE_WAITERS_PARAMS)
+                elif row["status"] == RUNNING:
+                    conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ?", (job_id,))
+                conn.execute("COMMIT")
+                return True
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def requeue_stale(
+        self,
+        stale_after: float = STALE_AFTER_SECONDS,
+        max_attempts: int = MAX_ATTEMPTS,
+        on_abandoned: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> int:
+        """
+        Returns running jobs of dead workers to the queue.
+
+        A stale job that was asked to cancel is cancelled, and one that has
+        already been claimed max_attempts times is failed, so a job that
+        crashes every worker running it does not crash them forever.
+
+        Args:
+            stale_after: Seconds without a heartbeat after which a worker
+                is considered dead
+            max_attempts: Claims after which a stale job is failed
+            on_abandoned: Called with each job cancelled or failed here,
+                to release what its handler would have released
+
+        Returns:
+            Number of jobs requeued
+        """
+        now = time.time()
+        cutoff = now - stale_after
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                abandoned = [
+                    _decode(row) for row in conn.execute(
+                        "SELECT * FROM jobs WHERE status = ? AND heartbeat_at < ? "
+                        "AND (cancel_requested = 1 OR attempts >= ?)",
+                        (RUNNING, cutoff, max_attempts)
+                    )
+                ]
+                for job in abandoned:
+                    if job["cancel_requested"]:
+                        conn.execute(
+                            "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ?", (CANCELLED, now, job["id"])
+                        )
+                    else:
+                        conn.execute(
+                            "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                            (FAILED, f"Worker stopped responding on each of {job['attempts']} attempts",
+                             now, job["id"])
+                        )
+                conn.execute(_SETTLE_WAITERS, _SETTLE_WAITERS_PARAMS)
+                cursor = conn.execute(
+                    "UPDATE jobs SET status = ?, worker_id = NULL WHERE status = ? AND heartbeat_at < ?",
+                    (QUEUED, RUNNING, cutoff)
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        if on_abandoned is not None:
+            for job in abandoned:
+                on_abandoned(job)
+        return cursor.rowcount
+
+    def prune(self, older_than: float = KEEP_FINISHED_SECONDS) -> int:
+        """
+        Deletes jobs that finished more than older_than seconds ago.
+
+        Returns:
+            Number of jobs deleted
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f"DELETE FROM jobs WHERE finished_at < ? AND status IN {_placeholders(FINISHED_STATES)}",
+                (time.time() - older_than, *FINISHED_STATES)
+            )
+        return cursor.rowcount
+
+    def depth(self) -> Dict[str, int]:
+        """Returns the number of queued, running and attached jobs."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT status, COUNT(*) AS n FROM jobs WHERE status IN {_placeholders(ACTIVE_STATES)} "
+                "GROUP BY status",
+                ACTIVE_STATES
+            ).fetchall()
+        return {row["status"]: row["n"] for row in rows}
@@ -0,0 +1,98 @@
+import asyncio
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+from agents.analysis import save_report
+from agents.live_analysis import MIN_UPDATE_TOKENS, LiveAnalyzer
+from agents.map_reduce import WindowAnalyzer, analyze_window_with_agent
+from models.schemas import MeetingReport
+from tools.diarization import Word, format_turns
+from tools.live_transcription import LiveSource, LiveTranscriber
+from tools.telemetry import annotate, traced
+
+# Seconds between checks for new final transcript
+UPDATE_INTERVAL_SECONDS = 5.0
+
+
+@traced("live")
+async def run_live_meeting(
+    source: LiveSource,
+    meeting_title: Optional[str] = None,
+    attendees: Optional[List[str]] = None,
+    session_id: Optional[str] = None,
+    recognizer: Optional[Any] = None,
+    analyze_window: WindowAnalyzer = analyze_window_with_agent,
+    update_interval: float = UPDATE_INTERVAL_SECONDS,
+    min_update_tokens: int = MIN_UPDATE_TOKENS,
+    on_update: Optional[Callable[[Dict[str, Any]], None]] = None,
+    save: bool = True
+) -> Dict[str, Any]:
+    """
+    Transcribes and analyzes a meeting while it is happening.
+
+    The source is transcribed on worker threads as audio arrives. Every
+    ``update_interval`` seconds the transcript that has become final is
+    analyzed incrementally (one update in flight at a time). When the
+    source ends, only the remaining tail is analyzed before the merged
+    report is saved, so the final report follows the end of the meeting
+    by about one segment's recognition and one small analysis.
+
+    Args:
+        source: Live audio stream
+        meeting_title: Optional title entered by the user
+        attendees: Optional list of attendee names
+        session_id: Session the report is saved under (generated if None)
+        recognizer: Speech client; the shared client when None
+        analyze_window: Coroutine turning a window message into a report
+        update_interval: Seconds between incremental analyses
+        min_update_tokens: New final text needed before an update
+        on_update: Called with {"transcript", "report", "audio_seconds"}
+            whenever the running report changes
+        save: Deliver the final report to the report sinks
+
+    Returns:
+        Dictionary with the transcription result, the report, the sinks'
+        response and "finalize_seconds" from the end of the stream to the
+        final report
+    """
+    transcriber = LiveTranscriber(recognizer=recognizer, attendees=attendees)
+    analyzer = LiveAnalyzer(meeting_title, attendees, min_update_tokens, analyze_window=analyze_window)
+
+    def notify(report: MeetingReport, words: List[Word]) -> None:
+        if on_update is not None:
+            on_update({"transcript": format_turns(words), "report": report, "audio_seconds": transcriber.audio_seconds})
+
+    consuming = asyncio.ensure_future(asyncio.to_thread(transcriber.consume, source))
+    try:
+        while not consuming.done():
+            await asyncio.wait({consuming}, timeout=update_interval)
+            if consuming.done():
+                break
+            words, stable = transcriber.snapshot()
+            report = await analyzer.update(words[:stable])
+            if report is not None:
+                notify(report, words)
+    except BaseException:
+        source.stop()
+        raise
+
+    transcription = await consuming
+    words, _ = transcriber.snapshot()
+    report = await analyzer.update(words, final=True) or analyzer.report
+    if report is None:
+        raise RuntimeError("Nothing was said in the live meeting")
+    notify(report, words)
+
+    response = None
+    if save:
+        response = await save_report(report, session_id or uuid.uuid4().hex, transcription["transcript"])
+    finalize_seconds = time.monotonic() - (source.ended_at or time.monotonic())
+    annotate(audio_seconds=transcription["audio_seconds"], updates=len(analyzer.partials),
+             finalize_seconds=finalize_seconds)
+    return {
+        "transcription": transcription,
+        "report": report,
+        "response": response,
+        "updates": len(analyzer.partials),
+        "finalize_seconds": finalize_seconds,
+    }
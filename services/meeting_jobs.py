@@ -0,0 +1,238 @@
+import asyncio
+import os
+import shutil
+import time
+import uuid
+from typing import Any, BinaryIO, Dict, List, Optional
+from services.job_queue import CANCELLED, JobCancelled, JobQueue
+from tools.transcript_cache import hash_audio
+from tools.telemetry import annotate, traced
+
+MEETING_JOB = "analyze_meeting"
+UPLOADS_DIR = ".jobs/uploads"
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+# Minimum seconds between progress writes; each write is a SQLite commit
+PROGRESS_INTERVAL = 0.5
+# Trailing characters of the partial transcript shown while transcribing
+TRANSCRIPT_PREVIEW_CHARS = 600
+
+
+def _remove(path: str) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+@traced("upload")
+def save_upload(upload: BinaryIO, suffix: str = "") -> str:
+    """
+    Streams an uploaded recording into the upload area.
+
+    The upload is copied in fixed-size chunks, so no second full copy of
+    the recording is made in memory. A partially written file is removed
+    if the copy fails.
+
+    Args:
+        upload: Readable binary file object (e.g. a Streamlit UploadedFile)
+        suffix: File extension to keep, such as ".wav"
+
+    Returns:
+        Absolute path of the stored recording
+    """
+    os.makedirs(UPLOADS_DIR, exist_ok=True)
+    path = os.path.abspath(os.path.join(UPLOADS_DIR, f"{uuid.uuid4().hex}{suffix}"))
+    if hasattr(upload, "seek"):
+        upload.seek(0)
+    try:
+        with open(path, 'wb') as stored:
+            shutil.copyfileobj(upload, stored, UPLOAD_CHUNK_BYTES)
+    except BaseException:
+        _remove(path)
+        raise
+    annotate(bytes=os.path.getsize(path))
+    return path
+
+
+def submit_meeting_job(
+    queue: JobQueue,
+    audio_path: str,
+    session_id: str,
+    meeting_title: Optional[str] = None,
+    attendees: Optional[List[str]] = None,
+    user_id: str = "streamlit_user",
+    coalesce: bool = True
+) -> str:
+    """
+    Queues a recording for transcription and analysis.
+
+    The audio file is moved into the queue's upload area (unless
+    save_upload already put it there). It is deleted when the job
+    finishes or is cancelled, or right away if the submit fails.
+
+    Identical requests (same audio bytes, title and attendees) submitted
+    while one is still queued or running share that job: the recording
+    is transcribed and analyzed once, and every submitter gets the same
+    report. A duplicate's own copy of the audio is deleted immediately.
+
+    Args:
+        queue: Job queue to submit to
+        audio_path: Recording to process (moved, not copied)
+        session_id: Session the resulting report belongs to
+        meeting_title: Optional title entered by the user
+        attendees: Optional list of attendee names
+        user_id: Owner of the session
+        coalesce: Share the work of an identical in-flight request
+
+    Returns:
+        The job id
+    """
+    stored_path = os.path.abspath(audio_path)
+    if os.path.dirname(stored_path) != os.path.abspath(UPLOADS_DIR):
+        os.makedirs(UPLOADS_DIR, exist_ok=True)
+        stored_path = os.path.abspath(
+            os.path.join(UPLOADS_DIR, f"{uuid.uuid4().hex}{os.path.splitext(audio_path)[1]}")
+        )
+        shutil.move(audio_path, stored_path)
+
+    payload = {
+        "audio_path": stored_path,
+        "session_id": session_id,
+        "user_id": user_id,
+        "meeting_title": meeting_title,
+        "attendees": attendees or []
+    }
+    try:
+        dedup_key = hash_audio(stored_path, {
+            "kind": MEETING_JOB, "meeting_title": meeting_title, "attendees": payload["attendees"]
+        }) if coalesce else None
+        job_id = queue.submit(MEETING_JOB, payload, dedup_key=dedup_key)
+    except BaseException:
+        _remove(stored_path)
+        raise
+
+    job = queue.get(job_id)
+    leader = queue.get(job["leader_id"]) if job["leader_id"] else None
+    # Joined an earlier identical job, which works from its own copy
+    if leader is not None and leader["payload"]["audio_path"] != stored_path:
+        _remove(stored_path)
+    return job_id
+
+
+def cancel_meeting_job(queue: JobQueue, job_id: str) -> bool:
+    """
+    Cancels a meeting job, deleting its recording if no worker has it yet.
+
+    Args:
+        queue: Queue the job was submitted to
+        job_id: Job to cancel
+
+    Returns:
+        False if the job had already finished
+    """
+    if not queue.cancel(job_id):
+        return False
+    job = queue.get(job_id)
+    # The recording belongs to the shared job, which ends with its last waiter
+    if job is not None and job["leader_id"]:
+        job = queue.get(job["leader_id"])
+    # A running job is cancelled cooperatively; its worker removes the file
+    if job is not None and job["status"] == CANCELLED:
+        _remove(job["payload"]["audio_path"])
+    return True
+
+
+def release_meeting_job(job: Dict[str, Any]) -> None:
+    """Deletes the recording of a meeting job the queue gave up on."""
+    _remove(job["payload"]["audio_path"])
+
+
+class _ProgressReporter:
+    """Rate-limits progress writes; every write also checks for cancellation."""
+
+    def __init__(self, queue: JobQueue, job_id: str):
+        self.queue = queue
+        self.job_id = job_id
+        self._last = 0.0
+
+    def __call__(self, progress: float, message: str,
+                 partial: Optional[Dict[str, Any]] = None, force: bool = False) -> None:
+        now = time.monotonic()
+        if force or now - self._last >= PROGRESS_INTERVAL:
+            self._last = now
+            self.queue.report_progress(self.job_id, progress, message, partial)
+
+
+@traced("job")
+def run_meeting_job(queue: JobQueue, job: Dict[str, Any], services: Dict[str, Any]) -> None:
+    """
+    Runs the transcribe → analyze → save pipeline for one claimed job.
+
+    The recording is deleted once the job is finished. If this worker lost
+    the job in the meantime (it was requeued after missing heartbeats),
+    the recording is left for the worker that holds it now.
+
+    Args:
+        queue: Queue the job was claimed from
+        job: Claimed job
+        services: Per-process runner, session_service and analysis_cache
+    """
+    from agents.analysis import analyze_transcript
+    from tools.transcription import transcribe_audio
+
+    payload = job["payload"]
+    worker_id = job["worker_id"]
+    annotate(job_id=job["id"])
+    report = _ProgressReporter(queue, job["id"])
+    finished = False
+    try:
+        report(0.0, "Transcribing audio", force=True)
+
+        def on_transcription_progress(update: Dict[str, Any]) -> None:
+            fraction = update["audio_seconds_done"] / max(update["audio_seconds"], 1e-9)
+            report(
+                0.5 * fraction,
+                f"Transcribing audio: {update['audio_seconds_done']:.0f}s of {update['audio_seconds']:.0f}s",
+                {"partial_transcript": update["partial_transcript"][-TRANSCRIPT_PREVIEW_CHARS:]}
+            )
+
+        with queue.keep_alive(job["id"], worker_id):
+            transcription = transcribe_audio(
+                payload["audio_path"], on_progress=on_transcription_progress, attendees=payload.get("attendees")
+            )
+        # transcribe_audio reports a cancellation from the callback as an error
+        report(0.5, "Analyzing transcript", force=True)
+        if transcription["status"] != "success":
+            raise RuntimeError(f"Transcription failed: {transcription.get('error_message')}")
+
+        def on_analysis_update(update: Dict[str, Any]) -> None:
+            report(0.5 + 0.45 * update.get("progress", 0.5), "Analyzing transcript", update["partial_report"])
+
+        with queue.keep_alive(job["id"], worker_id):
+            result = asyncio.run(analyze_transcript(
+                services["runner"],
+                services["session_service"],
+                transcription["transcript"],
+                session_id=payload["session_id"],
+                meeting_title=payload.get("meeting_title"),
+                attendees=payload.get("attendees"),
+                user_id=payload.get("user_id", "streamlit_user"),
+                cache=services["analysis_cache"],
+                on_update=on_analysis_update
+            ))
+
+        finished = queue.complete(job["id"], worker_id, {
+            "response": result["response"],
+            "transcript": transcription["transcript"],
+            # Waiters of other sessions render the report from here
+            "report": result["report"].model_dump() if result["report"] is not None else None,
+            "cached": result["cached"]
+        })
+    except JobCancelled:
+        finished = queue.mark_cancelled(job["id"], worker_id)
+    except Exception as e:
+        finished = queue.fail(job["id"], worker_id, str(e))
+    finally:
+        if finished:
+            _remove(payload["audio_path"])
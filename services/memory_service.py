@@ -0,0 +1,119 @@
+import os
+import re
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Iterator
+from google.adk.memory import BaseMemoryService
+from google.adk.memory.base_memory_service import SearchMemoryResponse
+from google.adk.memory.memory_entry import MemoryEntry
+from google.adk.sessions import Session
+from google.genai import types
+
+MEMORY_PATH = ".sessions/memory.db"
+
+# Oldest memories of a user are dropped beyond this many
+MAX_MEMORIES_PER_USER = 5000
+MAX_SEARCH_RESULTS = 10
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS memories (
+    id INTEGER PRIMARY KEY,
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    event_id TEXT NOT NULL,
+    author TEXT,
+    timestamp REAL NOT NULL,
+    text TEXT NOT NULL,
+    UNIQUE (app_name, user_id, event_id)
+);
+CREATE INDEX IF NOT EXISTS idx_memories_user ON memories (app_name, user_id, timestamp);
+
+-- rowid mirrors memories.id
+CREATE VIRTUAL TABLE IF NOT EXISTS memory_text USING fts5(text, tokenize = 'porter unicode61');
+"""
+
+
+class PersistentMemoryService(BaseMemoryService):
+    """
+    SQLite-backed ADK memory service with keyword (FTS5/BM25) search.
+
+    Only the text of events is stored, capped per user, so the store stays
+    bounded and survives restarts.
+    """
+
+    def __init__(self, path: str = MEMORY_PATH, max_memories_per_user: int = MAX_MEMORIES_PER_USER):
+        self.path = path
+        self.max_memories_per_user = max_memories_per_user
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    async def add_session_to_memory(self, session: Session) -> None:
+        with self._connect() as conn:
+            for event in session.events:
+                if not event.content or not event.content.parts:
+                    continue
+                text = " ".join(part.text for part in event.content.parts if part.text)
+                if not text.strip():
+                    continue
+                cursor = conn.execute(
+                    """
+                    INSERT OR IGNORE INTO memories (app_name, user_id, session_id, event_id, author, timestamp, text)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (session.app_name, session.user_id, session.id, event.id, event.author, event.timestamp, text)
+                )
+                if cursor.rowcount:
+                    conn.execute("INSERT INTO memory_text (rowid, text) VALUES (?, ?)", (cursor.lastrowid, text))
+
+            # Enforce the per-user cap, oldest first
+            stale = conn.execute(
+                """
+                SELECT id FROM memories WHERE app_name = ? AND user_id = ?
+                ORDER BY timestamp DESC LIMIT -1 OFFSET ?
+                """,
+                (session.app_name, session.user_id, self.max_memories_per_user)
+            ).fetchall()
+            for row in stale:
+                conn.execute("DELETE FROM memory_text WHERE rowid = ?", (row["id"],))
+                conn.execute("DELETE FROM memories WHERE id = ?", (row["id"],))
+
+    async def search_memory(self, *, app_name: str, user_id: str, query: str) -> SearchMemoryResponse:
+        terms = re.findall(r"\w+", query)
+        if not terms:
+            return SearchMemoryResponse(memories=[])
+
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT m.author, m.timestamp, m.text FROM memory_text
+                JOIN memories m ON m.id = memory_text.rowid
+                WHERE memory_text MATCH ? AND m.app_name = ? AND m.user_id = ?
+                ORDER BY bm25(memory_text)
+                LIMIT ?
+                """,
+                (" OR ".join(f'"{term}"' for term in terms), app_name, user_id, MAX_SEARCH_RESULTS)
+            ).fetchall()
+
+        return SearchMemoryResponse(memories=[
+            MemoryEntry(
+                content=types.Content(role="user", parts=[types.Part(text=row["text"])]),
+                author=row["author"],
+                timestamp=datetime.fromtimestamp(row["timestamp"], tz=timezone.utc).isoformat()
+            )
+            for row in rows
+        ])
@@ -0,0 +1,365 @@
+import copy
+import json
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, Session
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+from google.adk.sessions.state import State
+
+SESSIONS_PATH = ".sessions/sessions.db"
+
+# Per-session caps: older events are compacted away once either is exceeded.
+# Session state is stored separately, so dropping events never loses state.
+MAX_EVENTS_PER_SESSION = 200
+MAX_EVENT_BYTES_PER_SESSION = 2 * 1024 * 1024
+KEEP_RECENT_EVENTS = 50
+
+# Sessions idle longer than this, or beyond the newest MAX_SESSIONS, are removed
+IDLE_TTL_SECONDS = 7 * 24 * 3600
+MAX_SESSIONS = 10000
+EVICT_EVERY_CREATES = 100
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    last_update_time REAL NOT NULL,
+    PRIMARY KEY (app_name, user_id, id)
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_updated ON sessions (last_update_time);
+
+CREATE TABLE IF NOT EXISTS events (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    timestamp REAL NOT NULL,
+    size INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (app_name, user_id, session_id, seq)
+);
+
+CREATE TABLE IF NOT EXISTS app_states (
+    app_name TEXT PRIMARY KEY,
+    state TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS user_states (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    PRIMARY KEY (app_name, user_id)
+);
+"""
+
+
+def _split_state(state: Dict[str, Any]) -> tuple:
+    """Splits a state dict into app-, user- and session-scoped parts."""
+    app_state, user_state, session_state = {}, {}, {}
+    for key, value in state.items():
+        if key.startswith(State.APP_PREFIX):
+            app_state[key[len(State.APP_PREFIX):]] = value
+        elif key.startswith(State.USER_PREFIX):
+            user_state[key[len(State.USER_PREFIX):]] = value
+        elif not key.startswith(State.TEMP_PREFIX):
+            session_state[key] = value
+    return app_state, user_state, session_state
+
+
+class PersistentSessionService(BaseSessionService):
+    """
+    SQLite-backed ADK session service with bounded history.
+
+    Nothing is held in process memory between calls, so the footprint stays
+    flat however many sessions exist, and a restarted app sees the sessions
+    of the previous run. Each session keeps at most MAX_EVENTS_PER_SESSION
+    events and MAX_EVENT_BYTES_PER_SESSION of serialized events; beyond that
+    the history is compacted to its KEEP_RECENT_EVENTS newest events. Idle
+    sessions are evicted least-recently-updated first.
+    """
+
+    def __init__(
+        self,
+        path: str = SESSIONS_PATH,
+        max_events: int = MAX_EVENTS_PER_SESSION,
+        max_event_bytes: int = MAX_EVENT_BYTES_PER_SESSION,
+        keep_recent_events: int = KEEP_RECENT_EVENTS,
+        idle_ttl_seconds: float = IDLE_TTL_SECONDS,
+        max_sessions: int = MAX_SESSIONS
+    ):
+        self.path = path
+        self.max_events = max_events
+        self.max_event_bytes = max_event_bytes
+        self.keep_recent_events = keep_recent_events
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_sessions = max_sessions
+        self._creates = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        # Takes the write lock before the first read, so read-modify-write
+        # updates (next event seq, shared user:/app: state) cannot interleave
+        # with another process's
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            yield conn
+
+    @staticmethod
+    def _load_scoped_state(conn: sqlite3.Connection, app_name: str, user_id: str) -> Dict[str, Any]:
+        merged = {}
+        row = conn.execute("SELECT state FROM app_states WHERE app_name = ?", (app_name,)).fetchone()
+        for key, value in (json.loads(row["state"]) if row else {}).items():
+            merged[State.APP_PREFIX + key] = value
+        row = conn.execute(
+            "SELECT state FROM user_states WHERE app_name = ? AND user_id = ?", (app_name, user_id)
+        ).fetchone()
+        for key, value in (json.loads(row["state"]) if row else {}).items():
+            merged[State.USER_PREFIX + key] = value
+        return merged
+
+    @staticmethod
+    def _merge_scoped_state(conn: sqlite3.Connection, app_name: str, user_id: str,
+                            app_delta: Dict[str, Any], user_delta: Dict[str, Any]) -> None:
+        if app_delta:
+            row = conn.execute("SELECT state FROM app_states WHERE app_name = ?", (app_name,)).fetchone()
+            state = {**(json.loads(row["state"]) if row else {}), **app_delta}
+            conn.execute(
+                "INSERT OR REPLACE INTO app_states (app_name, state) VALUES (?, ?)",
+                (app_name, json.dumps(state))
+            )
+        if user_delta:
+            row = conn.execute(
+                "SELECT state FROM user_states WHERE app_name = ? AND user_id = ?", (app_name, user_id)
+            ).fetchone()
+            state = {**(json.loads(row["state"]) if row else {}), **user_delta}
+            conn.execute(
+                "INSERT OR REPLACE INTO user_states (app_name, user_id, state) VALUES (?, ?, ?)",
+                (app_name, user_id, json.dumps(state))
+            )
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None
+    ) -> Session:
+        session_id = (session_id or "").strip() or str(uuid.uuid4())
+        app_delta, user_delta, session_state = _split_state(state or {})
+        now = time.time()
+
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO sessions (app_name, user_id, id, state, last_update_time) VALUES (?, ?, ?, ?, ?)",
+                (app_name, user_id, session_id, json.dumps(session_state), now)
+            )
+            self._merge_scoped_state(conn, app_name, user_id, app_delta, user_delta)
+            merged = {**session_state, **self._load_scoped_state(conn, app_name, user_id)}
+
+        self._creates += 1
+        if self._creates % EVICT_EVERY_CREATES == 0:
+            self.evict_idle()
+
+        return Session(
+            id=session_id,
+            app_name=app_name,
+            user_id=user_id,
+            state=merged,
+            events=[],
+            last_update_time=now
+        )
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None
+    ) -> Optional[Session]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+                (app_name, user_id, session_id)
+            ).fetchone()
+            if row is None:
+                return None
+
+            clauses = ["app_name = ? AND user_id = ? AND session_id = ?"]
+            params = [app_name, user_id, session_id]
+            if config and config.after_timestamp:
+                clauses.append("timestamp >= ?")
+                params.append(config.after_timestamp)
+            limit = -1
+            if config and config.num_recent_events is not None:
+                limit = config.num_recent_events
+            event_rows = conn.execute(
+                f"SELECT data FROM events WHERE {' AND '.join(clauses)} ORDER BY seq DESC LIMIT ?",
+                (*params, limit)
+            ).fetchall()
+            scoped = self._load_scoped_state(conn, app_name, user_id)
+
+        return Session(
+            id=session_id,
+            app_name=app_name,
+            user_id=user_id,
+            state={**json.loads(row["state"]), **scoped},
+            events=[Event.model_validate_json(r["data"]) for r in reversed(event_rows)],
+            last_update_time=row["last_update_time"]
+        )
+
+    async def list_sessions(self, *, app_name: str, user_id: Optional[str] = None) -> ListSessionsResponse:
+        with self._connect() as conn:
+            if user_id is None:
+                rows = conn.execute(
+                    "SELECT * FROM sessions WHERE app_name = ? ORDER BY last_update_time", (app_name,)
+                ).fetchall()
+            else:
+                rows = conn.execute(
+                    "SELECT * FROM sessions WHERE app_name = ? AND user_id = ? ORDER BY last_update_time",
+                    (app_name, user_id)
+                ).fetchall()
+        return ListSessionsResponse(sessions=[
+            Session(
+                id=row["id"],
+                app_name=row["app_name"],
+                user_id=row["user_id"],
+                state={},
+                events=[],
+                last_update_time=row["last_update_time"]
+            )
+            for row in rows
+        ])
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        with self._connect() as conn:
+            self._delete(conn, app_name, user_id, session_id)
+
+    @staticmethod
+    def _delete(conn: sqlite3.Connection, app_name: str, user_id: str, session_id: str) -> None:
+        conn.execute(
+            "DELETE FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?",
+            (app_name, user_id, session_id)
+        )
+        conn.execute(
+            "DELETE FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+            (app_name, user_id, session_id)
+        )
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+
+        delta = copy.deepcopy(event.actions.state_delta) if event.actions and event.actions.state_delta else {}
+        event = await super().append_event(session, event)
+        session.last_update_time = event.timestamp
+
+        app_delta, user_delta, _ = _split_state(delta)
+        _, _, session_state = _split_state(session.state)
+        data = event.model_dump_json(exclude_none=True)
+        key = (session.app_name, session.user_id, session.id)
+
+        with self._transaction() as conn:
+            seq = conn.execute(
+                "SELECT COALESCE(MAX(seq), 0) + 1 FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?",
+                key
+            ).fetchone()[0]
+            conn.execute(
+                "INSERT INTO events (app_name, user_id, session_id, seq, timestamp, size, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (*key, seq, event.timestamp, len(data), data)
+            )
+            conn.execute(
+                "UPDATE sessions SET state = ?, last_update_time = ? WHERE app_name = ? AND user_id = ? AND id = ?",
+                (json.dumps(session_state), event.timestamp, *key)
+            )
+            self._merge_scoped_state(conn, session.app_name, session.user_id, app_delta, user_delta)
+            kept = self._compact(conn, key)
+
+        if kept:
+            session.events[:] = session.events[-kept:]
+        return event
+
+    def _compact(self, conn: sqlite3.Connection, key: tuple) -> int:
+        """
+        Drops the oldest events of a session that is over its caps.
+
+        Returns:
+            Number of events kept, or 0 if the session was within its caps
+        """
+        count, size = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM events "
+            "WHERE app_name = ? AND user_id = ? AND session_id = ?",
+            key
+        ).fetchone()
+        if count <= self.max_events and size <= self.max_event_bytes:
+            return 0
+
+        # Keep the newest events that fit both the count and byte budget
+        kept, kept_bytes = 0, 0
+        for row in conn.execute(
+            "SELECT size FROM events WHERE app_name = ? AND user_id = ? AND session_id = ? ORDER BY seq DESC",
+            key
+        ):
+            if kept >= self.keep_recent_events or kept_bytes + row["size"] > self.max_event_bytes:
+                break
+            kept += 1
+            kept_bytes += row["size"]
+        kept = max(kept, 1)
+
+        conn.execute(
+            """
+            DELETE FROM events WHERE app_name = ? AND user_id = ? AND session_id = ? AND seq <= (
+                SELECT MAX(seq) FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?
+            ) - ?
+            """,
+            (*key, *key, kept)
+        )
+        return kept
+
+    def evict_idle(self) -> int:
+        """
+        Removes sessions idle past the TTL and the oldest beyond max_sessions.
+
+        Returns:
+            Number of sessions removed
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT app_name, user_id, id FROM sessions WHERE last_update_time < ?
+                UNION
+                SELECT app_name, user_id, id FROM (
+                    SELECT app_name, user_id, id FROM sessions
+                    ORDER BY last_update_time DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (time.time() - self.idle_ttl_seconds, self.max_sessions)
+            ).fetchall()
+            for row in rows:
+                self._delete(conn, row["app_name"], row["user_id"], row["id"])
+        return len(rows)
@@ -1,7 +1,7 @@
 import asyncio
 from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from google.adk.memory import InMemoryMemoryService
+from services.session_service import PersistentSessionService
+from services.memory_service import PersistentMemoryService
 from agents.workflow import root_agent
 from google.genai import types
 from dotenv import load_dotenv
@@ -18,8 +18,8 @@ else:
 
 async def test_agent():
     # Initialize services
-    session_service = InMemorySessionService()
-    memory_service = InMemoryMemoryService()
+    session_service = PersistentSessionService()
+    memory_service = PersistentMemoryService()
     
     runner = Runner(
         agent=root_agent,
@@ -28,7 +28,12 @@ async def test_agent():
         memory_service=memory_service
     )
     
-    # Create session
+    # Start from a fresh session; the store persists across runs
+    await session_service.delete_session(
+        app_name="test_app",
+        user_id="test_user",
+        session_id="test-123"
+    )
     session = await session_service.create_session(
         app_name="test_app",
         user_id="test_user",
@@ -0,0 +1,342 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import wave
+from bisect import bisect_right
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+import numpy as np
+from tools.telemetry import annotate, traced
+
+# Everything handed to the recognizer is LINEAR16 mono at this rate
+TARGET_SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+
+# Headerless uploads are treated as LINEAR16 mono at this rate
+RAW_SAMPLE_RATE = 16000
+RAW_EXTENSIONS = ('.raw', '.pcm')
+
+CHUNK_SECONDS = 10.0
+
+# Voice activity detection
+FRAME_SECONDS = 0.03
+NOISE_PERCENTILE = 10  # Frame level taken as the recording's noise floor
+NOISE_MARGIN_DB = 10.0  # Speech is at least this much louder than the floor
+ABSOLUTE_FLOOR_DBFS = -50.0  # Frames quieter than this are always silence
+SPEECH_PERCENTILE = 90  # Frame level taken as the recording's speech level
+SPEECH_HEADROOM_DB = 6.0  # The threshold stays at least this far below it
+MIN_KEPT_FRACTION = 0.05  # Keeping less than this is taken as a detection failure
+MIN_SILENCE_SECONDS = 1.0  # Shorter pauses are left untouched
+KEEP_SILENCE_SECONDS = 0.25  # Padding kept around speech so word edges survive
+
+# Bump whenever decoding or detection changes the audio that is recognized
+PREPROCESS_VERSION = "2"
+
+
+class Span(NamedTuple):
+    """A stretch of the source recording kept in the trimmed output."""
+    source_start: float
+    output_start: float
+    duration: float
+
+
+class TimeMap:
+    """Maps offsets in the trimmed audio back to the source recording."""
+
+    def __init__(self, spans: List[Span]):
+        self.spans = spans
+        self._output_starts = [span.output_start for span in spans]
+
+    def to_source(self, seconds: Optional[float]) -> Optional[float]:
+        if seconds is None or not self.spans:
+            return seconds
+        span = self.spans[max(0, bisect_right(self._output_starts, seconds) - 1)]
+        return span.source_start + min(max(seconds - span.output_start, 0.0), span.duration)
+
+
+class PreparedAudio(NamedTuple):
+    """Result of preprocess_audio; the caller owns (and removes) ``path``."""
+    path: str
+    time_map: TimeMap
+    source_seconds: float
+    speech_seconds: float
+
+    def cleanup(self) -> None:
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class _Resampler:
+    """Streaming linear-interpolation resampler with a box anti-alias filter."""
+
+    def __init__(self, source_rate: int, target_rate: int):
+        self.step = source_rate / float(target_rate)
+        self.taps = max(1, int(round(self.step))) if self.step > 1 else 1
+        self.history = np.zeros(self.taps - 1)
+        self.tail = np.zeros(0)
+        self.position = 0.0  # Next output sample, in samples from the start of tail
+
+    def __call__(self, samples: np.ndarray) -> np.ndarray:
+        if self.taps > 1:
+            padded = np.concatenate([self.history, samples])
+            self.history = padded[len(padded) - (self.taps - 1):]
+            samples = np.convolve(padded, np.full(self.taps, 1.0 / self.taps), mode='valid')
+
+        buffer = np.concatenate([self.tail, samples])
+        last = len(buffer) - 1
+        if last < 1 or self.position > last:
+            self.tail = buffer
+            return np.zeros(0)
+
+        count = int((last - self.position) // self.step) + 1
+        positions = self.position + self.step * np.arange(count)
+        resampled = np.interp(positions, np.arange(len(buffer)), buffer)
+
+        following = self.position + self.step * count
+        keep_from = min(int(following), last)
+        self.tail = buffer[keep_from:]
+        self.position = following - keep_from
+        return resampled
+
+
+def _wav_chunks(audio_file_path: str, sample_rate: int) -> Iterator[np.ndarray]:
+    with wave.open(audio_file_path, 'rb') as reader:
+        channels = reader.getnchannels()
+        width = reader.getsampwidth()
+        rate = reader.getframerate()
+        if width not in (1, 2, 4):
+            raise ValueError(f"Unsupported WAV sample width: {width * 8} bits")
+        resample = _Resampler(rate, sample_rate) if rate != sample_rate else None
+        chunk_frames = int(CHUNK_SECONDS * rate)
+
+        while True:
+            data = reader.readframes(chunk_frames)
+            if not data:
+                return
+            if width == 1:
+                samples = (np.frombuffer(data, dtype=np.uint8).astype(np.float64) - 128) * 256
+            elif width == 2:
+                samples = np.frombuffer(data, dtype='<i2').astype(np.float64)
+            else:
+                samples = np.frombuffer(data, dtype='<i4').astype(np.float64) / 65536
+            samples = samples.reshape(-1, channels).mean(axis=1)
+            yield resample(samples) if resample else samples
+
+
+def _raw_chunks(audio_file_path: str, sample_rate: int) -> Iterator[np.ndarray]:
+    resample = _Resampler(RAW_SAMPLE_RATE, sample_rate) if RAW_SAMPLE_RATE != sample_rate else None
+    with open(audio_file_path, 'rb') as reader:
+        while True:
+            data = reader.read(int(CHUNK_SECONDS * RAW_SAMPLE_RATE) * SAMPLE_WIDTH)
+            if len(data) < SAMPLE_WIDTH:
+                return
+            samples = np.frombuffer(data[:len(data) - len(data) % SAMPLE_WIDTH], dtype='<i2').astype(np.float64)
+            yield resample(samples) if resample else samples
+
+
+def _ffmpeg_chunks(audio_file_path: str, sample_rate: int) -> Iterator[np.ndarray]:
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        extension = os.path.splitext(audio_file_path)[1] or "this"
+        raise ValueError(f"Decoding {extension} files requires ffmpeg on PATH")
+
+    process = subprocess.Popen(
+        [ffmpeg, "-nostdin", "-loglevel", "error", "-i", audio_file_path,
+         "-f", "s16le", "-ac", "1", "-ar", str(sample_rate), "-"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    )
+    try:
+        chunk_bytes = int(CHUNK_SECONDS * sample_rate) * SAMPLE_WIDTH
+        while True:
+            data = process.stdout.read(chunk_bytes)
+            if not data:
+                break
+            yield np.frombuffer(data[:len(data) - len(data) % SAMPLE_WIDTH], dtype='<i2').astype(np.float64)
+        if process.wait() != 0:
+            raise ValueError(f"ffmpeg could not decode audio: {process.stderr.read().decode(errors='replace').strip()}")
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        process.stderr.close()
+
+
+def decode_audio(audio_file_path: str, sample_rate: int = TARGET_SAMPLE_RATE) -> Iterator[np.ndarray]:
+    """
+    Streams a recording as mono samples at ``sample_rate``, chunk by chunk.
+
+    WAV and headerless LINEAR16 files are decoded in-process; every other
+    format (mp3, m4a, ogg, ...) is decoded by an ffmpeg subprocess.
+
+    Args:
+        audio_file_path: Path to the audio file
+        sample_rate: Output sample rate
+
+    Yields:
+        Float arrays of samples on the int16 scale
+    """
+    extension = os.path.splitext(audio_file_path)[1].lower()
+    if extension in RAW_EXTENSIONS:
+        return _raw_chunks(audio_file_path, sample_rate)
+    if extension == '.wav':
+        try:
+            with wave.open(audio_file_path, 'rb') as reader:
+                supported = reader.getsampwidth() in (1, 2, 4)
+        except (wave.Error, EOFError):
+            supported = False
+        if supported:
+            return _wav_chunks(audio_file_path, sample_rate)
+    return _ffmpeg_chunks(audio_file_path, sample_rate)
+
+
+def detect_speech(
+    levels_db: np.ndarray,
+    frame_seconds: float = FRAME_SECONDS,
+    min_silence_seconds: float = MIN_SILENCE_SECONDS,
+    keep_silence_seconds: float = KEEP_SILENCE_SECONDS
+) -> List[Tuple[int, int]]:
+    """
+    Energy-based voice activity detection over per-frame levels.
+
+    A frame is speech when it is louder than both ABSOLUTE_FLOOR_DBFS and
+    the recording's noise floor plus NOISE_MARGIN_DB. The threshold never
+    rises above the speech level less SPEECH_HEADROOM_DB, so a recording
+    with no real silence (steady room noise, continuous speech) is kept
+    whole instead of being dropped entirely. Speech is padded by
+    ``keep_silence_seconds`` on each side and pauses shorter than
+    ``min_silence_seconds`` are kept, so only long silences are dropped.
+
+    Args:
+        levels_db: RMS level of each frame in dBFS
+        frame_seconds: Duration of one frame
+        min_silence_seconds: Shortest silence that is trimmed
+        keep_silence_seconds: Silence kept next to speech
+
+    Returns:
+        Kept [start, end) frame ranges in order
+    """
+    if len(levels_db) == 0:
+        return []
+
+    noise_db, speech_db = np.percentile(levels_db, [NOISE_PERCENTILE, SPEECH_PERCENTILE])
+    threshold = max(ABSOLUTE_FLOOR_DBFS, min(noise_db + NOISE_MARGIN_DB, speech_db - SPEECH_HEADROOM_DB))
+    speech = levels_db > threshold
+
+    pad = int(round(keep_silence_seconds / frame_seconds))
+    if pad:
+        speech = np.convolve(speech, np.ones(2 * pad + 1), mode='same') > 0
+
+    edges = np.diff(np.concatenate([[0], speech.astype(np.int8), [0]]))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    if len(starts) == 0:
+        return []
+
+    min_gap = max(1, int(round(min_silence_seconds / frame_seconds)) - 2 * pad)
+    breaks = np.flatnonzero(starts[1:] - ends[:-1] >= min_gap)
+    run_starts = np.concatenate([starts[:1], starts[breaks + 1]])
+    run_ends = np.concatenate([ends[breaks], ends[-1:]])
+    return list(zip(run_starts.tolist(), run_ends.tolist()))
+
+
+def _write_wav(path: str, sample_rate: int) -> wave.Wave_write:
+    writer = wave.open(path, 'wb')
+    writer.setnchannels(1)
+    writer.setsampwidth(SAMPLE_WIDTH)
+    writer.setframerate(sample_rate)
+    return writer
+
+
+@traced("preprocess")
+def preprocess_audio(
+    audio_file_path: str,
+    sample_rate: int = TARGET_SAMPLE_RATE,
+    min_silence_seconds: float = MIN_SILENCE_SECONDS,
+    keep_silence_seconds: float = KEEP_SILENCE_SECONDS
+) -> PreparedAudio:
+    """
+    Decodes, resamples and silence-trims a recording for the recognizer.
+
+    The recording is decoded once into a temporary mono WAV while frame
+    levels are measured; long silences are then cut while copying it into
+    the output WAV. Memory stays bounded by the chunk size whatever the
+    recording length.
+
+    Args:
+        audio_file_path: Path to the audio file
+        sample_rate: Sample rate of the output
+        min_silence_seconds: Shortest silence that is trimmed
+        keep_silence_seconds: Silence kept next to speech
+
+    Returns:
+        PreparedAudio with the trimmed LINEAR16 WAV and its time map
+    """
+    frame_samples = max(1, int(FRAME_SECONDS * sample_rate))
+    frame_seconds = frame_samples / float(sample_rate)
+
+    fd, decoded_path = tempfile.mkstemp(suffix='.wav')
+    os.close(fd)
+    try:
+        levels = []
+        remainder = np.zeros(0)
+        total = 0
+        with _write_wav(decoded_path, sample_rate) as writer:
+            for chunk in decode_audio(audio_file_path, sample_rate):
+                chunk = np.clip(np.round(chunk), -32768, 32767)
+                writer.writeframes(chunk.astype('<i2').tobytes())
+                total += len(chunk)
+
+                samples = np.concatenate([remainder, chunk])
+                whole = len(samples) // frame_samples * frame_samples
+                frames = samples[:whole].reshape(-1, frame_samples)
+                remainder = samples[whole:]
+                levels.append(np.sqrt(np.mean(np.square(frames), axis=1)))
+            if len(remainder):
+                levels.append(np.sqrt(np.mean(np.square(remainder), keepdims=True)))
+
+        rms = np.concatenate(levels) if levels else np.zeros(0)
+        levels_db = 20 * np.log10(rms / 32768.0 + 1e-10)
+        kept = detect_speech(levels_db, frame_seconds, min_silence_seconds, keep_silence_seconds)
+        if sum(end - start for start, end in kept) < MIN_KEPT_FRACTION * len(levels_db):
+            # Too little speech to be believable: recognize the recording
+            # as it is rather than risk dropping it
+            annotate(speech_detection="fallback")
+            kept = [(0, len(levels_db))]
+
+        source_seconds = total / float(sample_rate)
+        annotate(source_seconds=source_seconds)
+        if kept == [(0, len(levels_db))]:
+            spans = [Span(0.0, 0.0, source_seconds)]
+            return PreparedAudio(decoded_path, TimeMap(spans), source_seconds, source_seconds)
+
+        fd, output_path = tempfile.mkstemp(suffix='.wav')
+        os.close(fd)
+        spans = []
+        written = 0
+        try:
+            with wave.open(decoded_path, 'rb') as reader, _write_wav(output_path, sample_rate) as writer:
+                for start, end in kept:
+                    first = start * frame_samples
+                    count = min(end * frame_samples, total) - first
+                    spans.append(Span(first / float(sample_rate), written / float(sample_rate), count / float(sample_rate)))
+                    reader.setpos(first)
+                    while count > 0:
+                        data = reader.readframes(min(count, int(CHUNK_SECONDS * sample_rate)))
+                        writer.writeframes(data)
+                        count -= len(data) // SAMPLE_WIDTH
+                        written += len(data) // SAMPLE_WIDTH
+        except BaseException:
+            os.unlink(output_path)
+            raise
+        os.unlink(decoded_path)
+        annotate(speech_seconds=written / float(sample_rate))
+        return PreparedAudio(output_path, TimeMap(spans), source_seconds, written / float(sample_rate))
+
+    except BaseException:
+        if os.path.exists(decoded_path):
+            os.unlink(decoded_path)
+        raise
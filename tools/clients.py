@@ -0,0 +1,247 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+from google.api_core import exceptions as api_exceptions
+from requests import exceptions as http_exceptions
+
+SPEECH = "speech"
+STORAGE = "storage"
+SENDGRID = "sendgrid"
+
+# Clients are rebuilt after this long so credentials and DNS get refreshed
+MAX_CLIENT_AGE_SECONDS = 3600
+HEALTH_CHECK_INTERVAL_SECONDS = 60
+
+# Errors after which a client's connection is assumed broken
+CONNECTION_ERRORS = (
+    ConnectionError,
+    http_exceptions.ConnectionError,
+    api_exceptions.ServiceUnavailable,
+)
+
+
+class _Entry:
+    __slots__ = ("client", "pid", "created_at", "checked_at")
+
+    def __init__(self, client: Any):
+        self.client = client
+        self.pid = os.getpid()
+        self.created_at = self.checked_at = time.monotonic()
+
+
+class _Registration:
+    def __init__(self, factory: Callable[[], Any], health_check: Optional[Callable[[Any], bool]], per_thread: bool):
+        self.factory = factory
+        self.health_check = health_check
+        self.per_thread = per_thread
+        self.lock = threading.Lock()
+        self.shared: Optional[_Entry] = None
+        self.local = threading.local()
+        self.override: Optional[Any] = None
+        self.stats = {"created": 0, "reused": 0, "recycled": 0, "invalidated": 0}
+
+
+class ClientRegistry:
+    """
+    Lazily created, cached API clients shared by all tool calls of a process.
+
+    A client is created on first use and handed out again on every later
+    call, so channel setup, auth and TLS handshakes are paid once. Clients
+    are rebuilt when they exceed ``max_age_seconds``, fail their health
+    check, are invalidated after a connection error, or when the process
+    has forked since they were created (gRPC channels do not survive a
+    fork). Clients that are not safe to share between threads are
+    registered ``per_thread`` and cached per thread instead.
+    """
+
+    def __init__(
+        self,
+        max_age_seconds: float = MAX_CLIENT_AGE_SECONDS,
+        health_check_interval: float = HEALTH_CHECK_INTERVAL_SECONDS
+    ):
+        self.max_age_seconds = max_age_seconds
+        self.health_check_interval = health_check_interval
+        self._registrations: Dict[str, _Registration] = {}
+        self._lock = threading.Lock()
+
+    def register(
+        self,
+        name: str,
+        factory: Callable[[], Any],
+        health_check: Optional[Callable[[Any], bool]] = None,
+        per_thread: bool = False
+    ) -> None:
+        """
+        Declares how to build a client; nothing is created until get().
+
+        Args:
+            name: Name the client is requested by
+            factory: Builds a new client
+            health_check: Returns False (or raises) when a cached client
+                must be replaced; run at most once per health check interval
+            per_thread: Cache one client per thread instead of per process
+        """
+        with self._lock:
+            self._registrations[name] = _Registration(factory, health_check, per_thread)
+
+    def _registration(self, name: str) -> _Registration:
+        registration = self._registrations.get(name)
+        if registration is None:
+            raise KeyError(f"No client registered as {name!r}")
+        return registration
+
+    def _usable(self, registration: _Registration, entry: _Entry) -> bool:
+        now = time.monotonic()
+        if entry.pid != os.getpid() or now - entry.created_at > self.max_age_seconds:
+            return False
+        if registration.health_check is None or now - entry.checked_at < self.health_check_interval:
+            return True
+        entry.checked_at = now
+        try:
+            return bool(registration.health_check(entry.client))
+        except Exception:
+            return False
+
+    def get(self, name: str) -> Any:
+        """
+        Returns the cached client for name, creating or replacing it if needed.
+
+        Args:
+            name: Registered client name
+
+        Returns:
+            The client
+        """
+        registration = self._registration(name)
+        if registration.override is not None:
+            return registration.override
+
+        with registration.lock:
+            entry = getattr(registration.local, "entry", None) if registration.per_thread else registration.shared
+            if entry is not None:
+                if self._usable(registration, entry):
+                    registration.stats["reused"] += 1
+                    return entry.client
+                registration.stats["recycled"] += 1
+
+        # Build outside the lock; a racing thread may build a spare that is
+        # simply dropped.
+        client = registration.factory()
+        with registration.lock:
+            registration.stats["created"] += 1
+            if registration.per_thread:
+                registration.local.entry = _Entry(client)
+            elif registration.shared is None or not self._usable(registration, registration.shared):
+                registration.shared = _Entry(client)
+            else:
+                return registration.shared.client
+        return client
+
+    def invalidate(self, name: str) -> None:
+        """Drops the calling thread's (or the shared) client so the next get() rebuilds it."""
+        registration = self._registration(name)
+        with registration.lock:
+            if registration.per_thread:
+                registration.local.entry = None
+            else:
+                registration.shared = None
+            registration.stats["invalidated"] += 1
+
+    @contextmanager
+    def override(self, name: str, client: Any) -> Iterator[Any]:
+        """
+        Serves ``client`` for name inside the block, e.g. a local fake in tests.
+
+        Args:
+            name: Registered client name
+            client: Object returned by get() while the block runs
+        """
+        registration = self._registration(name)
+        previous, registration.override = registration.override, client
+        try:
+            yield client
+        finally:
+            registration.override = previous
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns creation and reuse counts of every client.
+
+        Returns:
+            Counters per client name, with the share of get() calls that
+            reused an existing client
+        """
+        report = {}
+        for name, registration in list(self._registrations.items()):
+            with registration.lock:
+                counts = dict(registration.stats)
+            calls = counts["created"] + counts["reused"]
+            counts["reuse_ratio"] = round(counts["reused"] / calls, 3) if calls else 0.0
+            report[name] = counts
+        return report
+
+
+def _speech_client() -> Any:
+    from google.cloud import speech_v1p1beta1 as speech
+    return speech.SpeechClient()
+
+
+def _speech_healthy(client: Any) -> bool:
+    """False once the gRPC channel is shut down or failing to connect."""
+    import grpc
+
+    channel = getattr(getattr(getattr(client, "transport", None), "grpc_channel", None), "_channel", None)
+    if channel is None:
+        return True  # Not a gRPC transport; nothing to inspect
+    broken = (grpc.ChannelConnectivity.TRANSIENT_FAILURE.value[0], grpc.ChannelConnectivity.SHUTDOWN.value[0])
+    # Raises once the channel has been closed
+    return channel.check_connectivity_state(False) not in broken
+
+
+def _storage_client() -> Any:
+    from google.cloud import storage
+    return storage.Client()
+
+
+def _storage_healthy(client: Any) -> bool:
+    """
+    False once the client's access token has expired.
+
+    A rebuilt client loads credentials again, so rotated keys are picked
+    up instead of refreshing a token from the old ones.
+    """
+    return not getattr(getattr(client, "_credentials", None), "expired", False)
+
+
+def _sendgrid_client() -> Any:
+    from sendgrid import SendGridAPIClient
+    return SendGridAPIClient(os.getenv('SENDGRID_API_KEY'))
+
+
+def _sendgrid_healthy(client: Any) -> bool:
+    """False once SENDGRID_API_KEY has been changed (a rotated key)."""
+    return getattr(client, "api_key", None) == os.getenv('SENDGRID_API_KEY')
+
+
+_default_registry: Optional[ClientRegistry] = None
+_default_registry_lock = threading.Lock()
+
+
+def get_client_registry() -> ClientRegistry:
+    """Returns the process-wide registry with the Speech, Storage and SendGrid clients."""
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = ClientRegistry()
+            _default_registry.register(SPEECH, _speech_client, _speech_healthy)
+            # storage.Client wraps a requests.Session, which is not thread-safe
+            _default_registry.register(STORAGE, _storage_client, _storage_healthy, per_thread=True)
+            _default_registry.register(SENDGRID, _sendgrid_client, _sendgrid_healthy)
+        return _default_registry
+
+
+def get_client(name: str) -> Any:
+    """Returns a client from the process-wide registry."""
+    return get_client_registry().get(name)
@@ -0,0 +1,196 @@
+"""
+Normalization of free-form action item deadlines to calendar dates.
+
+The analyst writes deadlines the way people say them: "Friday", "by end
+of month", "next week", "March 5", "2025-03-05", "in two weeks". They
+are resolved against the date of the meeting they were set in. Phrases
+without a date ("ASAP", "soon", "Q&A session") resolve to None and keep
+only their text.
+"""
+import calendar
+import re
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+WEEKDAYS = {name: index for index, name in enumerate(
+    ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+)}
+WEEKDAYS.update({name[:3]: index for name, index in list(WEEKDAYS.items())})
+WEEKDAYS.update({"tues": 1, "thur": 3, "thurs": 3})
+
+MONTHS = {name.lower(): index for index, name in enumerate(calendar.month_name) if name}
+MONTHS.update({name.lower(): index for index, name in enumerate(calendar.month_abbr) if name})
+MONTHS["sept"] = 9
+
+NUMBERS = {"a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+           "seven": 7, "eight": 8, "nine": 9, "ten": 10, "couple of": 2, "few": 3}
+
+# Friday is the end of a working week
+END_OF_WEEK = 4
+
+# Month-day dates more than this far before the meeting mean next year
+PAST_GRACE_DAYS = 60
+
+_DATE_FORMATS = ("%Y-%m-%d", "%Y/%m/%d", "%d.%m.%Y", "%m/%d/%Y", "%m/%d/%y", "%Y%m%d")
+_LEADING_WORDS = re.compile(
+    r"^(?:(?:due|by|before|on|until|till|no later than|deadline|complete by|for|the)\b[\s:]*)+"
+)
+_NUMBER = r"(\d+|a|an|one|two|three|four|five|six|seven|eight|nine|ten|couple of|few)"
+_MONTH_DAY = re.compile(r"^([a-z]+)\.?\s+(\d{1,2})(?:st|nd|rd|th)?(?:,?\s+(\d{4}))?$")
+_DAY_MONTH = re.compile(r"^(\d{1,2})(?:st|nd|rd|th)?(?:\s+of)?\s+([a-z]+)\.?(?:,?\s+(\d{4}))?$")
+_MONTH_YEAR = re.compile(r"^(?:end of\s+)?([a-z]+)\.?(?:\s+(\d{4}))?$")
+_SLASH_MONTH_DAY = re.compile(r"^(\d{1,2})/(\d{1,2})$")
+_RELATIVE = re.compile(rf"^(?:in\s+)?{_NUMBER}\s+(day|week|month)s?(?:\s+from now)?$")
+_QUARTER = re.compile(r"^(?:end of\s+)?q([1-4])(?:\s+(\d{4}))?$")
+
+
+def _month_end(year: int, month: int) -> date:
+    return date(year, month, calendar.monthrange(year, month)[1])
+
+
+def _add_months(day: date, months: int) -> date:
+    index = day.month - 1 + months
+    year, month = day.year + index // 12, index % 12 + 1
+    return date(year, month, min(day.day, calendar.monthrange(year, month)[1]))
+
+
+def _number(text: str) -> int:
+    return int(text) if text.isdigit() else NUMBERS[text]
+
+
+def _upcoming(reference: date, month: int, day: int, year: Optional[int]) -> Optional[date]:
+    """A month-day, in the given year or the one that makes it upcoming."""
+    try:
+        resolved = date(year or reference.year, month, day)
+    except ValueError:
+        return None
+    if year is None and resolved < reference - timedelta(days=PAST_GRACE_DAYS):
+        resolved = _upcoming(reference, month, day, reference.year + 1) or resolved
+    return resolved
+
+
+def parse_date(text: Optional[str]) -> Optional[date]:
+    """
+    Parses an absolute date such as a report's "2025-01-15" or "January 15, 2025".
+
+    Args:
+        text: Date as written
+
+    Returns:
+        The date, or None if it is not a complete date
+    """
+    text = (text or "").strip()
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    cleaned = re.sub(r"^[a-z]+day,?\s+", "", text.lower())
+    match = _MONTH_DAY.match(cleaned) or _DAY_MONTH.match(cleaned)
+    if match and match.group(3):
+        month_text, day_text = (match.group(1), match.group(2)) if match.re is _MONTH_DAY else \
+            (match.group(2), match.group(1))
+        if month_text in MONTHS:
+            try:
+                return date(int(match.group(3)), MONTHS[month_text], int(day_text))
+            except ValueError:
+                return None
+    return None
+
+
+def parse_deadline(text: Optional[str], reference: date) -> Optional[date]:
+    """
+    Resolves a spoken deadline to the date it falls on.
+
+    Args:
+        text: Deadline as the analyst wrote it
+        reference: Date of the meeting the deadline was set in
+
+    Returns:
+        The due date, or None when the text names no date or one outside
+        date.min..date.max ("in 99999999 days")
+    """
+    absolute = parse_date(text)
+    if absolute is not None:
+        return absolute
+    try:
+        return _resolve_phrase(text, reference)
+    except (OverflowError, ValueError):
+        return None
+
+
+def _resolve_phrase(text: Optional[str], reference: date) -> Optional[date]:
+    """Resolves a relative or partial deadline; may overflow on huge amounts."""
+    phrase = re.sub(r"[^\w/\s.]", " ", (text or "").lower())
+    phrase = re.sub(r"\s+", " ", phrase).strip(" .")
+    phrase = _LEADING_WORDS.sub("", phrase).strip()
+    if not phrase:
+        return None
+
+    if phrase in ("today", "tonight", "eod", "end of day", "end of the day", "close of business", "cob"):
+        return reference
+    if phrase in ("tomorrow", "tmrw", "end of day tomorrow"):
+        return reference + timedelta(days=1)
+    if phrase in ("end of week", "end of the week", "eow", "this week"):
+        return reference + timedelta(days=(END_OF_WEEK - reference.weekday()) % 7)
+    if phrase in ("next week", "end of next week"):
+        return reference + timedelta(days=(END_OF_WEEK - reference.weekday()) % 7 + 7)
+    if phrase in ("end of month", "end of the month", "eom", "this month"):
+        return _month_end(reference.year, reference.month)
+    if phrase in ("next month", "end of next month"):
+        upcoming = _add_months(reference, 1)
+        return _month_end(upcoming.year, upcoming.month)
+    if phrase in ("end of quarter", "end of the quarter", "eoq", "this quarter"):
+        last_month = (reference.month - 1) // 3 * 3 + 3
+        return _month_end(reference.year, last_month)
+    if phrase in ("end of year", "end of the year", "eoy", "this year"):
+        return date(reference.year, 12, 31)
+
+    words = phrase.split()
+    if words and words[-1] in WEEKDAYS and len(words) <= 2 and words[0] in (words[-1], "this", "next", "coming"):
+        days = (WEEKDAYS[words[-1]] - reference.weekday()) % 7
+        if words[0] == "next" and days and days <= (END_OF_WEEK - reference.weekday()) % 7:
+            # "next Friday" said on a Monday is the Friday after this one
+            days += 7
+        elif words[0] != "this" and not days:
+            # "Wednesday" said on a Wednesday is a week away
+            days = 7
+        return reference + timedelta(days=days)
+
+    match = _RELATIVE.match(phrase)
+    if match:
+        amount, unit = _number(match.group(1)), match.group(2)
+        if unit == "day":
+            return reference + timedelta(days=amount)
+        if unit == "week":
+            return reference + timedelta(weeks=amount)
+        return _add_months(reference, amount)
+
+    match = _QUARTER.match(phrase)
+    if match:
+        year = int(match.group(2)) if match.group(2) else reference.year
+        resolved = _month_end(year, int(match.group(1)) * 3)
+        return resolved if match.group(2) or resolved >= reference else _month_end(year + 1, int(match.group(1)) * 3)
+
+    match = _SLASH_MONTH_DAY.match(phrase)
+    if match:
+        return _upcoming(reference, int(match.group(1)), int(match.group(2)), None) \
+            if 1 <= int(match.group(1)) <= 12 else None
+
+    match = _MONTH_DAY.match(phrase)
+    if match and match.group(1) in MONTHS:
+        return _upcoming(reference, MONTHS[match.group(1)], int(match.group(2)),
+                         int(match.group(3)) if match.group(3) else None)
+    match = _DAY_MONTH.match(phrase)
+    if match and match.group(2) in MONTHS:
+        return _upcoming(reference, MONTHS[match.group(2)], int(match.group(1)),
+                         int(match.group(3)) if match.group(3) else None)
+
+    match = _MONTH_YEAR.match(phrase)
+    if match and match.group(1) in MONTHS:
+        month = MONTHS[match.group(1)]
+        year = int(match.group(2)) if match.group(2) else reference.year
+        if not match.group(2) and month < reference.month:
+            year += 1
+        return _month_end(year, month)
+    return None
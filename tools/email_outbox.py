@@ -0,0 +1,404 @@
+"""
+Persistent outbox for report emails.
+
+Messages are written to a local SQLite queue and delivered in the
+background, so sending a report never waits on SendGrid. The dispatcher
+claims due messages in batches and merges messages with identical
+content (the same report going to several lists) into one request, with
+one personalization per recipient so nobody sees the other addresses.
+
+Delivery is tracked per recipient. A failed request is retried later,
+with backoff, for its unsent recipients only; nobody who already got the
+same content, through any message, gets it again. Messages enqueued
+twice under the same dedup key are stored once. Requests go through the
+shared SendGrid rate limits.
+
+Usage:
+    python -m tools.email_outbox            # show queue status
+    python -m tools.email_outbox --flush    # deliver everything due now
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set
+from sendgrid.helpers.mail import Mail
+from tools.clients import CONNECTION_ERRORS, SENDGRID, get_client, get_client_registry
+from tools.rate_limit import FAILED, OK, RetryPolicy, backoff_delay, classify_error, get_rate_limiter, retry_after_seconds
+from tools.telemetry import count, span
+
+OUTBOX_PATH = ".outbox/outbox.db"
+FROM_EMAIL = 'noreply@sendgrid.net'
+
+PENDING = "pending"
+SENDING = "sending"
+SENT = "sent"
+FAILED_STATUS = "failed"
+
+# SendGrid accepts at most 1000 personalizations per request
+MAX_RECIPIENTS_PER_REQUEST = 1000
+BATCH_MESSAGES = 200  # Messages claimed per dispatcher pass
+MAX_CONCURRENT_REQUESTS = 4
+# A claimed message whose dispatcher has not finished it by then is reclaimed
+LEASE_SECONDS = 300
+POLL_SECONDS = 1.0
+RETRY_POLICY = RetryPolicy(max_attempts=8, base_delay=2.0, max_delay=600.0)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id TEXT PRIMARY KEY,
+    dedup_key TEXT NOT NULL UNIQUE,
+    subject TEXT NOT NULL,
+    html TEXT NOT NULL,
+    content_key TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    lease_until REAL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    sent_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_messages_due ON messages (status, next_attempt_at);
+
+CREATE TABLE IF NOT EXISTS recipients (
+    message_id TEXT NOT NULL,
+    address TEXT NOT NULL,
+    sent_at REAL,
+    PRIMARY KEY (message_id, address)
+);
+"""
+
+
+def _normalize(addresses: Iterable[str]) -> List[str]:
+    unique = {}
+    for address in addresses:
+        address = address.strip()
+        if address:
+            unique.setdefault(address.lower(), address)
+    return sorted(unique.values(), key=str.lower)
+
+
+def _digest(*parts: str) -> str:
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+def build_message(recipients: List[str], subject: str, html: str) -> Mail:
+    """One request carrying a separate personalization per recipient."""
+    return Mail(from_email=FROM_EMAIL, to_emails=recipients, subject=subject, html_content=html, is_multiple=True)
+
+
+class EmailOutbox:
+    """
+    SQLite-backed email queue with a background dispatcher.
+
+    Every operation is one short transaction on its own connection, so
+    any number of processes can enqueue and dispatch from the same file;
+    claims use leases, so a message is only in flight in one place.
+    """
+
+    def __init__(self, path: str = OUTBOX_PATH, send: Optional[Callable[[Mail], Any]] = None):
+        self.path = path
+        self._send = send
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def enqueue(self, recipients: Iterable[str], subject: str, html: str, dedup_key: Optional[str] = None) -> str:
+        """
+        Queues one message and wakes this process's dispatcher.
+
+        Args:
+            recipients: Addresses to send to; duplicates are dropped
+            subject: Subject line
+            html: HTML body
+            dedup_key: Messages with a key already queued are not stored
+                again; defaults to a digest of recipients and content
+
+        Returns:
+            Id of the stored message (the existing one for a duplicate)
+        """
+        recipients = _normalize(recipients)
+        if not recipients:
+            raise ValueError("No recipients to send to")
+        content_key = _digest(subject, html)
+        dedup_key = dedup_key or _digest(content_key, *(r.lower() for r in recipients))
+        now = time.time()
+        message_id = uuid.uuid4().hex
+        with self._transaction() as conn:
+            existing = conn.execute("SELECT id FROM messages WHERE dedup_key = ?", (dedup_key,)).fetchone()
+            if existing is not None:
+                count("emails_deduplicated_total", 1)
+                return existing["id"]
+            conn.execute(
+                """
+                INSERT INTO messages (id, dedup_key, subject, html, content_key, status, next_attempt_at, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (message_id, dedup_key, subject, html, content_key, PENDING, now, now)
+            )
+            conn.executemany(
+                "INSERT INTO recipients (message_id, address) VALUES (?, ?)",
+                [(message_id, address) for address in recipients]
+            )
+        self._wake.set()
+        return message_id
+
+    def claim(self, limit: int = BATCH_MESSAGES) -> List[Dict[str, Any]]:
+        """
+        Leases due messages to the caller.
+
+        Args:
+            limit: Most messages to claim
+
+        Returns:
+            Messages with their still unsent ``recipients``
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            # Content already in flight elsewhere waits, so its recipients
+            # can be recognized as served once that request finishes
+            rows = conn.execute(
+                """
+                SELECT id, subject, html, content_key, attempts FROM messages
+                WHERE (status = ? AND next_attempt_at <= ? AND content_key NOT IN (
+                           SELECT content_key FROM messages WHERE status = ? AND lease_until >= ?))
+                   OR (status = ? AND lease_until < ?)
+                ORDER BY next_attempt_at LIMIT ?
+                """,
+                (PENDING, now, SENDING, now, SENDING, now, limit)
+            ).fetchall()
+            messages = []
+            for row in rows:
+                conn.execute(
+                    "UPDATE messages SET status = ?, lease_until = ? WHERE id = ?",
+                    (SENDING, now + LEASE_SECONDS, row["id"])
+                )
+                conn.execute(
+                    """
+                    UPDATE recipients SET sent_at = ?
+                    WHERE message_id = ? AND sent_at IS NULL AND lower(address) IN (
+                        SELECT lower(r.address) FROM recipients AS r JOIN messages AS m ON m.id = r.message_id
+                        WHERE m.content_key = ? AND r.sent_at IS NOT NULL
+                    )
+                    """,
+                    (now, row["id"], row["content_key"])
+                )
+                recipients = [r["address"] for r in conn.execute(
+                    "SELECT address FROM recipients WHERE message_id = ? AND sent_at IS NULL", (row["id"],)
+                )]
+                messages.append({**dict(row), "recipients": recipients})
+        return messages
+
+    def _finish(self, message: Dict[str, Any], delivered: Set[str], error: Optional[BaseException],
+                retry_at: float) -> None:
+        now = time.time()
+        with self._transaction() as conn:
+            conn.executemany(
+                "UPDATE recipients SET sent_at = ? WHERE message_id = ? AND address = ?",
+                [(now, message["id"], address) for address in message["recipients"] if address in delivered]
+            )
+            if all(address in delivered for address in message["recipients"]):
+                conn.execute(
+                    "UPDATE messages SET status = ?, sent_at = ?, lease_until = NULL WHERE id = ?",
+                    (SENT, now, message["id"])
+                )
+                return
+
+            attempts = message["attempts"] + 1
+            retryable = classify_error(error) is not None if error is not None else True
+            if retryable and attempts < RETRY_POLICY.max_attempts:
+                status, next_attempt_at = PENDING, retry_at
+            else:
+                status, next_attempt_at = FAILED_STATUS, now
+            conn.execute(
+                """
+                UPDATE messages SET status = ?, attempts = ?, next_attempt_at = ?, lease_until = NULL, last_error = ?
+                WHERE id = ?
+                """,
+                (status, attempts, next_attempt_at, str(error) if error else None, message["id"])
+            )
+
+    def _deliver(self, mail: Mail) -> None:
+        if self._send is not None:
+            self._send(mail)
+            return
+        try:
+            get_client(SENDGRID).send(mail)
+        except CONNECTION_ERRORS:
+            get_client_registry().invalidate(SENDGRID)
+            raise
+
+    async def _request(self, recipients: List[str], subject: str, html: str) -> Optional[BaseException]:
+        """Sends one request under the shared SendGrid limits; returns its error, if any."""
+        limiter = get_rate_limiter()
+        lease = await limiter.acquire_async(SENDGRID)
+        try:
+            with span("email.send", recipients=len(recipients)):
+                await asyncio.to_thread(self._deliver, build_message(recipients, subject, html))
+        except Exception as e:
+            limiter.release(lease, classify_error(e) or FAILED, retry_after_seconds(e))
+            return e
+        limiter.release(lease, OK)
+        count("emails_sent_total", len(recipients))
+        return None
+
+    async def flush(self, max_concurrency: int = MAX_CONCURRENT_REQUESTS) -> int:
+        """
+        Delivers every message that is due, batching identical content.
+
+        Args:
+            max_concurrency: Requests in flight at once
+
+        Returns:
+            Number of requests made
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        requests = 0
+        while True:
+            messages = self.claim()
+            if not messages:
+                return requests
+
+            groups: Dict[str, List[Dict[str, Any]]] = {}
+            for message in messages:
+                groups.setdefault(message["content_key"], []).append(message)
+
+            async def send_group(group: List[Dict[str, Any]]) -> int:
+                addresses = _normalize(a for m in group for a in m["recipients"])
+                delivered: Set[str] = set()
+                errors: List[BaseException] = []
+
+                async def send_chunk(chunk: List[str]) -> None:
+                    async with semaphore:
+                        error = await self._request(chunk, group[0]["subject"], group[0]["html"])
+                    if error is None:
+                        delivered.update(a.lower() for a in chunk)
+                    else:
+                        errors.append(error)
+
+                chunks = [addresses[i:i + MAX_RECIPIENTS_PER_REQUEST]
+                          for i in range(0, len(addresses), MAX_RECIPIENTS_PER_REQUEST)]
+                await asyncio.gather(*(send_chunk(chunk) for chunk in chunks))
+                error = errors[0] if errors else None
+                # Messages that shared a request are retried together
+                attempt = max(m["attempts"] for m in group) + 1
+                retry_at = time.time() + backoff_delay(attempt, RETRY_POLICY, retry_after_seconds(error) if error else None)
+                for message in group:
+                    sent = {a for a in message["recipients"] if a.lower() in delivered}
+                    await asyncio.to_thread(self._finish, message, sent, error, retry_at)
+                return len(chunks)
+
+            requests += sum(await asyncio.gather(*(send_group(g) for g in groups.values())))
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(POLL_SECONDS)
+            self._wake.clear()
+            try:
+                asyncio.run(self.flush())
+            except Exception as e:
+                count("outbox_errors_total", 1, error=type(e).__name__)
+
+    def start(self) -> None:
+        """Starts this process's background dispatcher, once."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="email-outbox", daemon=True)
+                self._thread.start()
+
+    def drain(self, timeout: float = 60.0) -> bool:
+        """
+        Delivers what is due and waits until nothing is pending or in flight.
+
+        Messages waiting for a retry later than ``timeout`` keep them
+        pending; they are sent by whichever dispatcher runs next.
+
+        Returns:
+            True when the outbox is empty of undelivered messages
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            asyncio.run(self.flush())
+            status = self.status()
+            if not status.get(PENDING) and not status.get(SENDING):
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(min(POLL_SECONDS, max(0.0, deadline - time.monotonic())))
+
+    def status(self) -> Dict[str, int]:
+        """Returns the number of messages in each status."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) AS n FROM messages GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+    def failures(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Returns the most recent messages that were given up on."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT id, subject, attempts, last_error, created_at FROM messages
+                WHERE status = ? ORDER BY next_attempt_at DESC LIMIT ?
+                """,
+                (FAILED_STATUS, limit)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+
+_default_outbox: Optional[EmailOutbox] = None
+_default_outbox_lock = threading.Lock()
+
+
+def get_email_outbox() -> EmailOutbox:
+    """Returns the process-wide outbox, with its dispatcher running."""
+    global _default_outbox
+    with _default_outbox_lock:
+        if _default_outbox is None:
+            _default_outbox = EmailOutbox()
+        _default_outbox.start()
+        return _default_outbox
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--flush", action="store_true", help="Deliver everything due, then exit")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    outbox = EmailOutbox()
+    if args.flush:
+        outbox.drain()
+    print(json.dumps({"status": outbox.status(), "failures": outbox.failures()}, indent=2))
@@ -1,81 +1,109 @@
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
-import os
-from typing import Dict, List
-import json
+from html import escape
+from string import Template
+from typing import Dict, List, Optional
+from models.schemas import MeetingReport
+from tools.email_outbox import get_email_outbox
+from tools.telemetry import traced
 
+# Compiled once at import; every value is HTML-escaped before substitution
+_PAGE = Template("""<html>
+<body>
+    <h2>$title</h2>
+    <p><strong>Date:</strong> $date</p>
+    <p><strong>Attendees:</strong> $attendees</p>
+
+    <h3>Summary</h3>
+    <p>$summary</p>
+
+    <h3>Key Topics</h3>
+    <ul>$topics</ul>
+
+    <h3>Action Items</h3>
+    <ul>$action_items</ul>
+
+    <h3>Decisions Made</h3>
+    <ul>$decisions</ul>
+</body>
+</html>
+""")
+_LIST_ITEM = Template("<li>$text</li>")
+_ACTION_ITEM = Template("<li><strong>$task</strong> - Assigned to: $assignee - Priority: $priority</li>")
+
+
+def _items(values: List[str]) -> str:
+    return "".join(_LIST_ITEM.substitute(text=escape(value)) for value in values)
+
+
+def render_report_html(report: MeetingReport) -> str:
+    """
+    Renders the email body of a report.
+
+    Args:
+        report: Validated meeting report
+
+    Returns:
+        HTML document with every report value escaped
+    """
+    return _PAGE.substitute(
+        title=escape(report.meeting_title),
+        date=escape(report.date),
+        attendees=escape(", ".join(report.attendees)),
+        summary=escape(report.summary),
+        topics=_items(report.key_topics),
+        action_items="".join(
+            _ACTION_ITEM.substitute(
+                task=escape(item.task),
+                assignee=escape(item.assignee or "Unassigned"),
+                priority=escape(item.priority)
+            )
+            for item in report.action_items
+        ),
+        decisions=_items(report.decisions_made)
+    )
+
+
+@traced("email.enqueue")
 def send_report_email(
     recipient_emails: List[str],
     report_json: str,
-    meeting_title: str
+    meeting_title: str,
+    meeting_id: Optional[str] = None
 ) -> Dict[str, str]:
     """
-    Sends meeting report via email using SendGrid.
-    
+    Queues a meeting report email for delivery via SendGrid.
+
+    The message goes to the persistent outbox and is sent in the
+    background, batched with other messages of the same content.
+
     Args:
         recipient_emails: List of email addresses
         report_json: JSON string of the meeting report
         meeting_title: Title of the meeting
-        
+        meeting_id: Identifies the report, so delivering it again to the
+            same recipients does not send a second email
+
     Returns:
-        Dictionary with send status
+        Dictionary with queue status
     """
     try:
-        # Parse the report
-        report = json.loads(report_json)
-        
-        # Create HTML email body
-        html_content = f"""
-        <html>
-        <body>
-            <h2>{report['meeting_title']}</h2>
-            <p><strong>Date:</strong> {report['date']}</p>
-            <p><strong>Attendees:</strong> {', '.join(report['attendees'])}</p>
-            
-            <h3>Summary</h3>
-            <p>{report['summary']}</p>
-            
-            <h3>Key Topics</h3>
-            <ul>
-                {''.join([f'<li>{topic}</li>' for topic in report['key_topics']])}
-            </ul>
-            
-            <h3>Action Items</h3>
-            <ul>
-                {''.join([
-                    f"<li><strong>{item['task']}</strong> - "
-                    f"Assigned to: {item.get('assignee', 'Unassigned')} - "
-                    f"Priority: {item['priority']}</li>"
-                    for item in report['action_items']
-                ])}
-            </ul>
-            
-            <h3>Decisions Made</h3>
-            <ul>
-                {''.join([f'<li>{decision}</li>' for decision in report.get('decisions_made', [])])}
-            </ul>
-        </body>
-        </html>
-        """
-        
-        # Send email
-        message = Mail(
-            from_email='noreply@sendgrid.net',  
-            to_emails=recipient_emails,
-            subject=f"Meeting Report: {meeting_title}",
-            html_content=html_content
+        report = MeetingReport.model_validate_json(report_json)
+        recipients = sorted({r.strip().lower() for r in recipient_emails if r.strip()})
+        dedup_key = f"report:{meeting_id}:{','.join(recipients)}" if meeting_id else None
+        message_id = get_email_outbox().enqueue(
+            recipient_emails,
+            f"Meeting Report: {meeting_title}",
+            render_report_html(report),
+            dedup_key=dedup_key
         )
-        
-        sg = SendGridAPIClient(os.getenv('SENDGRID_API_KEY'))
-        response = sg.send(message)
-        
+
         return {
             "status": "success",
-            "message": f"Report sent to {len(recipient_emails)} recipients"
+            "message": f"Report queued for {len(recipients)} recipients",
+            "message_id": message_id
         }
-        
+
     except Exception as e:
         return {
             "status": "error",
             "error_message": str(e)
-        }
\ No newline at end of file
+        }
@@ -0,0 +1,311 @@
+"""
+Bulk uploads to Google Cloud Storage.
+
+GcsUploader pushes many objects in parallel. Objects whose content
+already matches the bucket (same CRC32C) are skipped; remote checksums
+of a few objects are fetched one by one, and those of a larger batch come
+from one paged listing per directory. Files above ``resumable_threshold`` use chunked resumable
+uploads, and the client library's retry policy resends a failed chunk
+request on its own. Only a failure that outlasts those retries reaches
+call_with_retry, which restarts the object from its first byte.
+
+Signed URLs are generated for all finished objects in one batch at the
+end and cached with the object checksum, so an unchanged object keeps its
+URL until it is close to expiring.
+
+Set STORAGE_EMULATOR_HOST to run against a local GCS emulator; the
+benchmarks use the filesystem-backed FakeStorageClient.
+
+Usage:
+    python -m tools.gcs_uploader --bucket my-bucket --prefix backfill/ reports/*.llr audio/*.wav
+"""
+import argparse
+import base64
+import json
+import mimetypes
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional
+import google_crc32c
+from google.cloud.storage.retry import DEFAULT_RETRY
+from tools.clients import CONNECTION_ERRORS, STORAGE, get_client, get_client_registry
+from tools.rate_limit import call_with_retry
+from tools.telemetry import count, span
+
+STATE_PATH = ".gcs/state.db"
+MAX_WORKERS = 8
+# Resumable chunks must be a multiple of 256 KiB
+CHUNK_SIZE = 8 * 1024 * 1024
+RESUMABLE_THRESHOLD = 8 * 1024 * 1024
+READ_BYTES = 1024 * 1024
+URL_TTL = timedelta(days=7)
+# Cached URLs with less validity left than this are signed again
+URL_MIN_REMAINING = timedelta(days=1)
+# Up to this many names are looked up one by one rather than listed
+DIRECT_LOOKUP_MAX = 16
+# Names per query when reading cached URLs, under SQLite's variable limit
+URL_QUERY_BATCH = 500
+
+UPLOADED = "uploaded"
+UNCHANGED = "unchanged"
+ERROR = "error"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS signed_urls (
+    bucket TEXT NOT NULL,
+    name TEXT NOT NULL,
+    crc32c TEXT NOT NULL,
+    url TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (bucket, name)
+);
+"""
+
+
+class UploadItem(NamedTuple):
+    """One object to upload, from memory (``data``) or from a file (``path``)."""
+    name: str
+    data: Optional[bytes] = None
+    path: Optional[str] = None
+    content_type: str = "application/octet-stream"
+
+
+def crc32c_of(item: UploadItem) -> str:
+    """Base64 CRC32C of an item's content, as GCS reports it."""
+    checksum = google_crc32c.Checksum()
+    if item.data is not None:
+        checksum.update(item.data)
+    else:
+        with open(item.path, 'rb') as f:
+            for block in iter(lambda: f.read(READ_BYTES), b""):
+                checksum.update(block)
+    return base64.b64encode(checksum.digest()).decode("ascii")
+
+
+class GcsUploader:
+    """
+    Parallel, checksum-aware uploader for one bucket.
+
+    Storage clients come from the client registry (one per worker
+    thread); every call goes through the shared STORAGE limits and is
+    retried on transient errors.
+    """
+
+    def __init__(
+        self,
+        bucket_name: str,
+        max_workers: int = MAX_WORKERS,
+        chunk_size: int = CHUNK_SIZE,
+        resumable_threshold: int = RESUMABLE_THRESHOLD,
+        state_path: str = STATE_PATH
+    ):
+        self.bucket_name = bucket_name
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.resumable_threshold = resumable_threshold
+        self.state_path = state_path
+        os.makedirs(os.path.dirname(os.path.abspath(state_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.state_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _bucket(self) -> Any:
+        return get_client(STORAGE).bucket(self.bucket_name)
+
+    def remote_checksums(self, names: Iterable[str]) -> Dict[str, str]:
+        """
+        Returns the CRC32C of those of ``names`` that exist in the bucket.
+
+        Up to DIRECT_LOOKUP_MAX names are fetched one by one, so saving a
+        single report does not list its whole directory. A larger batch
+        lists each directory holding any of the names once, one page per
+        thousand objects; subdirectories are not descended into.
+        """
+        names = set(names)
+        if len(names) <= DIRECT_LOOKUP_MAX:
+            def lookup(name: str) -> Optional[Any]:
+                bucket = self._bucket()
+                return call_with_retry(STORAGE, bucket.get_blob, name)
+
+            with ThreadPoolExecutor(min(self.max_workers, max(1, len(names)))) as pool:
+                blobs = [blob for blob in pool.map(lookup, names) if blob is not None]
+            return {blob.name: blob.crc32c for blob in blobs if blob.crc32c}
+
+        directories = {name.rpartition("/")[0] + "/" if "/" in name else "" for name in names}
+
+        def listing(directory: str) -> List[Any]:
+            client = get_client(STORAGE)
+            return call_with_retry(STORAGE, lambda: list(client.list_blobs(
+                self.bucket_name, prefix=directory or None, delimiter="/",
+                fields="items(name,crc32c),nextPageToken,prefixes"
+            )))
+
+        with ThreadPoolExecutor(min(self.max_workers, max(1, len(directories)))) as pool:
+            listings = list(pool.map(listing, directories))
+        return {
+            blob.name: blob.crc32c for blobs in listings for blob in blobs
+            if blob.name in names and blob.crc32c
+        }
+
+    def _upload(self, item: UploadItem) -> int:
+        size = len(item.data) if item.data is not None else os.path.getsize(item.path)
+        resumable = size > self.resumable_threshold
+        with span("gcs.upload", bytes=size, resumable=resumable):
+            # A chunk size makes the client use a chunked resumable upload
+            blob = self._bucket().blob(item.name, chunk_size=self.chunk_size if resumable else None)
+            if item.data is not None:
+                upload, source = blob.upload_from_string, item.data
+            else:
+                upload, source = blob.upload_from_filename, item.path
+            # checksum="crc32c" has the client verify the stored object;
+            # retry=DEFAULT_RETRY retries each chunk request of a resumable
+            # upload where it failed
+            call_with_retry(
+                STORAGE, upload, source, content_type=item.content_type, checksum="crc32c", retry=DEFAULT_RETRY
+            )
+        count("gcs_bytes_uploaded_total", size)
+        return size
+
+    def sign_urls(self, objects: Dict[str, str]) -> Dict[str, str]:
+        """
+        Returns a signed GET URL for each object, reusing cached ones.
+
+        Args:
+            objects: CRC32C of each object name
+
+        Returns:
+            URL of each object name
+        """
+        now = time.time()
+        names = list(objects)
+        rows = []
+        with self._connect() as conn:
+            for start in range(0, len(names), URL_QUERY_BATCH):
+                batch = names[start:start + URL_QUERY_BATCH]
+                rows += conn.execute(
+                    "SELECT name, crc32c, url, expires_at FROM signed_urls "
+                    f"WHERE bucket = ? AND name IN ({','.join('?' * len(batch))})",
+                    [self.bucket_name, *batch]
+                ).fetchall()
+        cached = {
+            row["name"]: row["url"] for row in rows
+            if row["crc32c"] == objects[row["name"]]
+            and row["expires_at"] - now > URL_MIN_REMAINING.total_seconds()
+        }
+        missing = [name for name in objects if name not in cached]
+
+        def sign(name: str) -> str:
+            return self._bucket().blob(name).generate_signed_url(version="v4", expiration=URL_TTL, method="GET")
+
+        with ThreadPoolExecutor(self.max_workers) as pool:
+            signed = dict(zip(missing, pool.map(sign, missing)))
+        if signed:
+            expires_at = now + URL_TTL.total_seconds()
+            with self._connect() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO signed_urls (bucket, name, crc32c, url, expires_at) VALUES (?, ?, ?, ?, ?)",
+                    [(self.bucket_name, name, objects[name], url, expires_at) for name, url in signed.items()]
+                )
+        count("signed_urls_total", len(signed), source="signed")
+        count("signed_urls_total", len(cached), source="cache")
+        return {**cached, **signed}
+
+    def upload_many(self, items: List[UploadItem], sign: bool = True) -> List[Dict[str, Any]]:
+        """
+        Uploads items in parallel, skipping unchanged objects.
+
+        Args:
+            items: Objects to upload; later items win on duplicate names
+            sign: Also return a signed URL for every object
+
+        Returns:
+            One result per item with "name", "status" (uploaded, unchanged
+            or error), "bytes", "url" and "error_message"
+        """
+        with ThreadPoolExecutor(self.max_workers) as pool:
+            checksums = list(pool.map(crc32c_of, items))
+        remote = self.remote_checksums(item.name for item in items)
+
+        def process(index: int) -> Dict[str, Any]:
+            item, checksum = items[index], checksums[index]
+            result = {"name": item.name, "crc32c": checksum, "bytes": 0}
+            if remote.get(item.name) == checksum:
+                return {**result, "status": UNCHANGED}
+            try:
+                return {**result, "status": UPLOADED, "bytes": self._upload(item)}
+            except Exception as e:
+                if isinstance(e, CONNECTION_ERRORS):
+                    get_client_registry().invalidate(STORAGE)
+                return {**result, "status": ERROR, "error_message": str(e)}
+
+        with ThreadPoolExecutor(self.max_workers) as pool:
+            results = list(pool.map(process, range(len(items))))
+
+        if sign:
+            done = {r["name"]: r["crc32c"] for r in results if r["status"] != ERROR}
+            try:
+                urls = self.sign_urls(done)
+            except Exception as e:
+                urls = {}
+                for result in results:
+                    result.setdefault("error_message", f"Could not sign URL: {e}")
+            for result in results:
+                result["url"] = urls.get(result["name"])
+        return results
+
+
+_uploaders: Dict[str, GcsUploader] = {}
+_uploaders_lock = threading.Lock()
+
+
+def get_uploader(bucket_name: str) -> GcsUploader:
+    """Returns the process-wide uploader of a bucket."""
+    with _uploaders_lock:
+        if bucket_name not in _uploaders:
+            _uploaders[bucket_name] = GcsUploader(bucket_name)
+        return _uploaders[bucket_name]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="Files to upload")
+    parser.add_argument("--bucket", default=os.getenv("GCS_BUCKET_NAME"))
+    parser.add_argument("--prefix", default="", help="Prepended to each file name")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    parser.add_argument("--no-sign", action="store_true", help="Skip signed URL generation")
+    args = parser.parse_args()
+    if not args.bucket:
+        parser.error("--bucket or GCS_BUCKET_NAME is required")
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    uploader = GcsUploader(args.bucket, max_workers=args.workers)
+    started = time.perf_counter()
+    results = uploader.upload_many(
+        [
+            UploadItem(args.prefix + os.path.basename(path), path=path,
+                       content_type=mimetypes.guess_type(path)[0] or "application/octet-stream")
+            for path in args.paths
+        ],
+        sign=not args.no_sign
+    )
+    summary = {status: sum(r["status"] == status for r in results) for status in (UPLOADED, UNCHANGED, ERROR)}
+    summary["seconds"] = round(time.perf_counter() - started, 2)
+    summary["errors"] = [r for r in results if r["status"] == ERROR][:10]
+    print(json.dumps(summary, indent=2))
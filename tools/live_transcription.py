@@ -0,0 +1,433 @@
+"""
+Incremental transcription of a meeting that is still going on.
+
+Audio arrives from a LiveSource: a recording that is still being written
+(GrowingFileSource) or LINEAR16 audio pushed over a local TCP socket
+(SocketSource). LiveTranscriber keeps at most ``max_segment_seconds`` of
+it in memory, cuts a segment at the first pause after
+``min_segment_seconds`` (or with an overlap once the buffer is full),
+recognizes segments on a small worker pool and stitches them in order, so
+the transcript trails the speakers by roughly one segment.
+"""
+import contextvars
+import os
+import socket
+import struct
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from google.cloud import speech_v1p1beta1 as speech
+from tools.audio_preprocessing import ABSOLUTE_FLOOR_DBFS, FRAME_SECONDS, NOISE_MARGIN_DB, NOISE_PERCENTILE
+from tools.clients import SPEECH, get_client
+from tools.diarization import DiarizedWords, Word, format_turns
+from tools.telemetry import count
+from tools.transcription import (
+    SAMPLE_WIDTH, AudioSegment, SegmentStitcher, recognition_params, recognize_segment
+)
+
+DEFAULT_SAMPLE_RATE = 16000
+READ_BYTES = 32000  # One second of 16 kHz mono LINEAR16
+
+# Segments are cut at a pause once they are this long ...
+MIN_SEGMENT_SECONDS = 8.0
+# ... or, without a pause, at this length with an overlap into the next one
+MAX_SEGMENT_SECONDS = 30.0
+LIVE_OVERLAP_SECONDS = 2.0
+PAUSE_SECONDS = 0.3  # Shortest silence a segment is cut at
+
+MAX_WORKERS = 2
+MAX_PENDING_SEGMENTS = 4  # Segments awaiting recognition before feed() blocks
+NOISE_HISTORY_SECONDS = 120.0  # Audio the noise floor is estimated over
+
+IDLE_TIMEOUT_SECONDS = 15.0  # A growing file that stops growing this long has ended
+POLL_SECONDS = 0.2
+DEFAULT_PORT = 8765
+
+
+class LiveSource:
+    """
+    LINEAR16 audio arriving over time.
+
+    A WAV header at the start of the stream is parsed (its sizes are
+    ignored, since recorders fill them in only when they finish); anything
+    else is taken as raw little-endian 16-bit PCM at the configured rate.
+    ``sample_rate`` and ``channels`` are final once chunks() has yielded;
+    ``ended_at`` is the time.monotonic() at which the stream ended.
+    """
+
+    def __init__(self, sample_rate: int = DEFAULT_SAMPLE_RATE, channels: int = 1):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self._stop = threading.Event()
+        self.ended_at: Optional[float] = None
+
+    def _read(self, size: int) -> bytes:
+        """Returns up to ``size`` bytes, blocking until some arrive; b"" at the end."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        """Ends the stream after the audio received so far."""
+        self._stop.set()
+
+    def _read_exact(self, size: int) -> bytes:
+        data = b""
+        while len(data) < size:
+            chunk = self._read(size - len(data))
+            if not chunk:
+                break
+            data += chunk
+        return data
+
+    def _parse_wav_header(self) -> None:
+        while True:
+            header = self._read_exact(8)
+            if len(header) < 8:
+                raise ValueError("Stream ended inside the WAV header")
+            chunk_id, size = header[:4], struct.unpack('<I', header[4:])[0]
+            if chunk_id == b'data':
+                return
+            body = self._read_exact(size + (size & 1))
+            if chunk_id == b'fmt ':
+                tag, channels, rate, _, _, bits = struct.unpack('<HHIIHH', body[:16])
+                if tag not in (1, 0xFFFE) or bits != 16:
+                    raise ValueError("Live audio must be 16-bit PCM")
+                self.sample_rate, self.channels = rate, channels
+
+    def chunks(self) -> Iterator[bytes]:
+        """Yields whole sample frames as they arrive until the stream ends."""
+        try:
+            head = self._read_exact(12)
+            if head[:4] == b'RIFF' and head[8:12] == b'WAVE':
+                self._parse_wav_header()
+                pending = b""
+            else:
+                pending = head
+            frame_bytes = SAMPLE_WIDTH * self.channels
+            while True:
+                data = self._read(READ_BYTES)
+                if not data:
+                    self.ended_at = time.monotonic()
+                    break
+                pending += data
+                whole = len(pending) // frame_bytes * frame_bytes
+                if whole:
+                    yield pending[:whole]
+                    pending = pending[whole:]
+            whole = len(pending) // frame_bytes * frame_bytes
+            if whole:
+                yield pending[:whole]
+        finally:
+            self.close()
+
+
+class GrowingFileSource(LiveSource):
+    """
+    Follows a recording while another program appends to it.
+
+    The stream ends when the file has not grown for ``idle_timeout``
+    seconds or stop() is called.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        sample_rate: int = DEFAULT_SAMPLE_RATE,
+        channels: int = 1,
+        idle_timeout: float = IDLE_TIMEOUT_SECONDS,
+        poll_seconds: float = POLL_SECONDS
+    ):
+        super().__init__(sample_rate, channels)
+        self.path = path
+        self.idle_timeout = idle_timeout
+        self.poll_seconds = poll_seconds
+        self._file = None
+
+    def _read(self, size: int) -> bytes:
+        last_growth = time.monotonic()
+        while self._file is None:
+            if os.path.exists(self.path):
+                self._file = open(self.path, 'rb')
+            elif self._stop.is_set() or time.monotonic() - last_growth > self.idle_timeout:
+                return b""
+            else:
+                time.sleep(self.poll_seconds)
+        while True:
+            data = self._file.read(size)
+            if data:
+                return data
+            if self._stop.is_set() or time.monotonic() - last_growth > self.idle_timeout:
+                return b""
+            time.sleep(self.poll_seconds)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class SocketSource(LiveSource):
+    """
+    Accepts one TCP connection and reads audio from it until it closes.
+
+    Binds on construction, so ``address`` is known before the sender
+    connects (pass port 0 for any free port).
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = DEFAULT_PORT,
+        sample_rate: int = DEFAULT_SAMPLE_RATE,
+        channels: int = 1
+    ):
+        super().__init__(sample_rate, channels)
+        self._server = socket.create_server((host, port))
+        self._server.settimeout(POLL_SECONDS)
+        self.address: Tuple[str, int] = self._server.getsockname()[:2]
+        self._connection: Optional[socket.socket] = None
+
+    def _read(self, size: int) -> bytes:
+        while self._connection is None:
+            if self._stop.is_set():
+                return b""
+            try:
+                self._connection, _ = self._server.accept()
+            except socket.timeout:
+                continue
+            self._connection.settimeout(POLL_SECONDS)
+        while not self._stop.is_set():
+            try:
+                return self._connection.recv(size)
+            except socket.timeout:
+                continue
+        return b""
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+        self._server.close()
+
+
+class LiveTranscriber:
+    """
+    Transcribes LINEAR16 audio fed to it in arbitrary chunks.
+
+    Audio is mixed down to mono. Segments that are entirely below the
+    noise threshold are never sent. When ``max_pending`` segments await
+    recognition, feed() blocks, so a slow recognizer slows the reader
+    rather than growing memory.
+    """
+
+    def __init__(
+        self,
+        recognizer: Optional[Any] = None,
+        min_segment_seconds: float = MIN_SEGMENT_SECONDS,
+        max_segment_seconds: float = MAX_SEGMENT_SECONDS,
+        overlap_seconds: float = LIVE_OVERLAP_SECONDS,
+        max_workers: int = MAX_WORKERS,
+        max_pending: int = MAX_PENDING_SEGMENTS,
+        on_words: Optional[Callable[[List[Word], int], None]] = None,
+        attendees: Optional[List[str]] = None
+    ):
+        self.min_segment_seconds = min_segment_seconds
+        self.max_segment_seconds = max_segment_seconds
+        self.overlap_seconds = overlap_seconds
+        self.on_words = on_words
+        self.attendees = list(attendees or [])
+        self.sample_rate: Optional[int] = None
+        self.audio_seconds = 0.0
+        self.recognized_seconds = 0.0
+        self.segment_count = 0
+
+        self._recognizer = recognizer
+        self._config = None
+        self._stitcher = SegmentStitcher(overlap_seconds)
+        self._buffer = np.zeros(0, dtype=np.int16)
+        self._buffer_start = 0  # Absolute sample index of _buffer[0]
+        self._levels: Deque[float] = deque()
+        self._executor = ThreadPoolExecutor(max_workers)
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._results: Dict[int, Tuple[float, float, List[Word]]] = {}
+        self._next_index = 0
+        self._next_stitch = 0
+        self._overlap_next = 0.0
+        self._error: Optional[BaseException] = None
+
+    @property
+    def _frame(self) -> int:
+        return max(1, int(FRAME_SECONDS * self.sample_rate))
+
+    def _frame_levels(self, samples: np.ndarray) -> np.ndarray:
+        whole = len(samples) // self._frame * self._frame
+        frames = samples[:whole].astype(np.float64).reshape(-1, self._frame)
+        return 20 * np.log10(np.sqrt(np.mean(np.square(frames), axis=1)) / 32768.0 + 1e-10)
+
+    def _threshold(self, levels: np.ndarray) -> float:
+        history = np.concatenate([np.fromiter(self._levels, dtype=np.float64, count=len(self._levels)), levels])
+        if len(history) == 0:
+            return ABSOLUTE_FLOOR_DBFS
+        return max(ABSOLUTE_FLOOR_DBFS, float(np.percentile(history, NOISE_PERCENTILE)) + NOISE_MARGIN_DB)
+
+    def feed(self, pcm: bytes, sample_rate: int = DEFAULT_SAMPLE_RATE, channels: int = 1) -> None:
+        """
+        Adds audio and submits every segment that is ready.
+
+        Args:
+            pcm: Whole LINEAR16 sample frames
+            sample_rate: Sample rate of the audio; fixed by the first call
+            channels: Interleaved channels in ``pcm``
+        """
+        self._raise_error()
+        if self._config is None:
+            self.sample_rate = sample_rate
+            self._config = speech.RecognitionConfig(**recognition_params(sample_rate, 1, self.attendees))
+            self._recognizer = self._recognizer or get_client(SPEECH)
+        elif sample_rate != self.sample_rate:
+            raise ValueError(f"Sample rate changed from {self.sample_rate} to {sample_rate} Hz")
+
+        samples = np.frombuffer(pcm, dtype='<i2')
+        if channels > 1:
+            samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+        self.audio_seconds += len(samples) / float(sample_rate)
+        self._buffer = np.concatenate([self._buffer, samples])
+
+        while True:
+            cut = self._find_cut()
+            if cut is None:
+                break
+            self._submit(*cut)
+
+    def _find_cut(self) -> Optional[Tuple[int, int]]:
+        """Returns the (end, next start) buffer offsets of the next segment, if one is ready."""
+        rate = self.sample_rate
+        min_samples = int(self.min_segment_seconds * rate)
+        max_samples = int(self.max_segment_seconds * rate)
+        if len(self._buffer) < min_samples:
+            return None
+
+        levels = self._frame_levels(self._buffer)
+        silent = levels <= self._threshold(levels)
+        pause = max(1, int(round(PAUSE_SECONDS / FRAME_SECONDS)))
+        first = min_samples // self._frame
+        run = 0
+        for index in range(first, len(silent)):
+            run = run + 1 if silent[index] else 0
+            if run >= pause:
+                cut = (index + 1 - run // 2) * self._frame
+                return cut, cut
+
+        if len(self._buffer) >= max_samples:
+            return max_samples, max_samples - int(self.overlap_seconds * rate)
+        return None
+
+    def _submit(self, end: int, next_start: int) -> None:
+        content = self._buffer[:end]
+        start_seconds = self._buffer_start / float(self.sample_rate)
+        overlap, self._overlap_next = self._overlap_next, (end - next_start) / float(self.sample_rate)
+        index = self._next_index
+        self._next_index += 1
+
+        levels = self._frame_levels(content)
+        has_speech = bool(np.any(levels > self._threshold(levels)))
+        self._levels.extend(levels.tolist())
+        max_levels = int(NOISE_HISTORY_SECONDS / FRAME_SECONDS)
+        while len(self._levels) > max_levels:
+            self._levels.popleft()
+        self._buffer = self._buffer[next_start:]
+        self._buffer_start += next_start
+
+        if not has_speech:
+            with self._lock:
+                self._results[index] = (start_seconds, overlap, [])
+                self._stitch_ready()
+            return
+
+        self._slots.acquire()
+        seconds = len(content) / float(self.sample_rate)
+        self.recognized_seconds += seconds
+        self.segment_count += 1
+        count("audio_seconds_total", seconds, kind="live")
+        future = self._executor.submit(
+            contextvars.copy_context().run, recognize_segment, self._recognizer, self._config,
+            AudioSegment(index, start_seconds, content.tobytes())
+        )
+        future.add_done_callback(lambda f: self._collect(f, start_seconds, overlap))
+
+    def _collect(self, future: Future, start_seconds: float, overlap: float) -> None:
+        self._slots.release()
+        with self._lock:
+            error = future.exception()
+            if error is not None:
+                self._error = self._error or error
+                return
+            index, words = future.result()
+            self._results[index] = (start_seconds, overlap, words)
+            self._stitch_ready()
+
+    def _stitch_ready(self) -> None:
+        added = False
+        while self._next_stitch in self._results:
+            start_seconds, overlap, words = self._results.pop(self._next_stitch)
+            self._stitcher.add(words, start_seconds, overlap)
+            self._next_stitch += 1
+            added = True
+        if added and self.on_words is not None:
+            self.on_words(list(self._stitcher.words), self._stitcher.stable_count)
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            raise RuntimeError(f"Live transcription failed: {self._error}") from self._error
+
+    def snapshot(self) -> Tuple[List[Word], int]:
+        """Returns the words stitched so far and how many of them are final."""
+        with self._lock:
+            return list(self._stitcher.words), self._stitcher.stable_count
+
+    def finish(self) -> Dict[str, Any]:
+        """
+        Flushes the buffered audio and waits for every segment.
+
+        Returns:
+            Dictionary shaped like transcribe_audio's result
+        """
+        if self._config is not None and len(self._buffer):
+            self._submit(len(self._buffer), len(self._buffer))
+        self._executor.shutdown(wait=True)
+        self._raise_error()
+
+        diarized = DiarizedWords(self._stitcher.words)
+        return {
+            "status": "success",
+            "transcript": format_turns(diarized),
+            "words": diarized.to_dict(),
+            "audio_seconds": self.audio_seconds,
+            "recognized_seconds": self.recognized_seconds,
+            "segment_count": self.segment_count,
+            "speaker_count": diarized.speaker_count,
+        }
+
+    def consume(self, source: LiveSource) -> Dict[str, Any]:
+        """
+        Transcribes a source until it ends.
+
+        Args:
+            source: Stream to read
+
+        Returns:
+            Result of finish()
+        """
+        try:
+            for chunk in source.chunks():
+                self.feed(chunk, source.sample_rate, source.channels)
+        except BaseException:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        return self.finish()
@@ -1,40 +1,99 @@
-import json
-from typing import Dict
+from typing import Dict, Optional
 import os
+import time
+from google.adk.tools import ToolContext
+from google.genai import types
+from pydantic import ValidationError
+from models.schemas import MeetingReport
+from tools.report_format import REPORT_EXTENSION, write_report_file
+from tools.report_store import get_report_store
+from tools.report_search import get_search_index
+from tools.telemetry import traced
 
-def save_report_locally(
+@traced("report.write")
+def store_report(
     report_json: str,
-    meeting_id: str
+    meeting_id: str,
+    session_id: Optional[str] = None,
+    transcript: str = ""
 ) -> Dict[str, str]:
     """
-    Saves meeting report to local filesystem.
-    
+    Validates a report, writes it in the compact report format and records
+    it in the report and search indexes.
+
     Args:
         report_json: JSON string of the meeting report
         meeting_id: Unique identifier for the meeting
-        
+        session_id: Session that produced the report
+        transcript: Transcript the report was built from, for search
+
     Returns:
         Dictionary with storage status and path
     """
+    try:
+        report = MeetingReport.model_validate_json(report_json)
+    except ValidationError as e:
+        return {
+            "status": "error",
+            "error_message": "Report does not match the MeetingReport schema: " + "; ".join(
+                f"{'.'.join(map(str, error['loc'])) or 'report'}: {error['msg']}" for error in e.errors()
+            )
+        }
+
     try:
         # Create reports directory if it doesn't exist
         os.makedirs("reports", exist_ok=True)
-        
+
         # Save the report
-        filename = f"reports/{meeting_id}.json"
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(report_json)
-        
+        filename = f"reports/{meeting_id}{REPORT_EXTENSION}"
+        created_at = time.time()
+        write_report_file(filename, report, transcript, session_id, created_at)
+
         full_path = os.path.abspath(filename)
-        
+
+        # Index it so the UI never has to scan the directory
+        body = report.model_dump()
+        get_report_store().add(meeting_id, full_path, body, session_id=session_id, created_at=created_at)
+        get_search_index().add(meeting_id, body, transcript)
+
         return {
             "status": "success",
             "message": f"Report saved successfully to {filename}",
             "path": full_path
         }
-        
+
     except Exception as e:
         return {
             "status": "error",
             "error_message": str(e)
-        }
\ No newline at end of file
+        }
+
+def transcript_from_content(user_content: Optional[types.Content]) -> str:
+    """Returns the transcript part of a message built by build_user_message."""
+    if not user_content or not user_content.parts:
+        return ""
+    text = "".join(part.text or "" for part in user_content.parts)
+    return text.split("Transcript:\n", 1)[-1] if "Transcript:\n" in text else ""
+
+def save_report_locally(
+    report_json: str,
+    meeting_id: str,
+    tool_context: Optional[ToolContext] = None
+) -> Dict[str, str]:
+    """
+    Saves meeting report to local filesystem.
+
+    Args:
+        report_json: JSON string of the meeting report
+        meeting_id: Unique identifier for the meeting
+
+    Returns:
+        Dictionary with storage status and path
+    """
+    if tool_context is None:
+        return store_report(report_json, meeting_id)
+
+    # The transcript is not a tool argument (the model would have to echo
+    # it back); recover it from the message that started this run instead.
+    transcript = transcript_from_content(tool_context.user_content)
+    return store_report(report_json, meeting_id, tool_context.session.id, transcript)
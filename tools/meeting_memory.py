@@ -0,0 +1,565 @@
+"""
+Cross-meeting memory: vector retrieval over past reports and transcripts.
+
+Every saved report adds a few snippets, its summary with decisions and
+action items plus the transcript in chunks of about CHUNK_WORDS words.
+Each snippet is embedded and stored:
+- text and metadata in SQLite (``memory.db``);
+- unit vectors appended to a float32 file (``vectors.f32``), row i
+  belonging to snippet i.
+
+Searches memory-map the vector file and score it block by block with one
+matrix product, so memory use stays flat however many meetings there are.
+Past APPROX_MIN_ROWS snippets, an optional inverted-file index (k-means
+centroids, built with --build-index) narrows the scan to the nearest
+clusters plus the rows added since it was built.
+
+related_context() returns at most TOP_K snippets within
+MAX_CONTEXT_TOKENS, which the analyst gets as "Related past meetings".
+
+Embeddings are local feature hashing by default (no network, no
+dependency); set MEMORY_EMBEDDER=gemini to use Gemini embeddings.
+
+Usage:
+    python -m tools.meeting_memory --rebuild
+    python -m tools.meeting_memory --build-index
+    python -m tools.meeting_memory --search "pricing decision"
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import zlib
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+import numpy as np
+from models.schemas import MeetingReport
+from tools.telemetry import annotate, traced
+
+MEMORY_DIR = ".memory"
+EMBEDDER_ENV = "MEMORY_EMBEDDER"
+
+CHUNK_WORDS = 120
+MAX_SNIPPET_CHARS = 600
+TOP_K = 5
+MAX_PER_MEETING = 2
+MAX_CONTEXT_TOKENS = 600
+# Transcript chunks compared against memory per query
+MAX_QUERY_CHUNKS = 8
+# Snippets below this cosine similarity are never injected
+MIN_SIMILARITY = 0.2
+
+# Rows scored per matrix product
+SEARCH_BLOCK_ROWS = 65536
+# Below this many snippets an exact scan is always used
+APPROX_MIN_ROWS = 20000
+# Clusters searched per query with the approximate index
+NPROBE = 8
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE_ROWS = 50000
+
+CHARS_PER_TOKEN = 4
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snippets (
+    id INTEGER PRIMARY KEY,  -- row of the snippet's vector
+    meeting_id TEXT NOT NULL,
+    source TEXT NOT NULL,  -- digest of the transcript the snippet came from
+    kind TEXT NOT NULL,
+    title TEXT NOT NULL,
+    date TEXT NOT NULL,
+    text TEXT NOT NULL,
+    text_hash TEXT NOT NULL UNIQUE
+);
+CREATE INDEX IF NOT EXISTS idx_snippets_meeting ON snippets (meeting_id);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+_SPEAKER_LABEL = re.compile(r"^Speaker \d+:\s*")
+_STOPWORDS = frozenset(
+    "a an and are as at be but by do for from has have he i if in is it its me my no not of on or our so "
+    "that the their them then there they this to up us was we were what when which who will with you your "
+    "yeah okay ok um uh like just".split()
+)
+
+
+class Snippet(NamedTuple):
+    """A stored piece of a past meeting and its similarity to the query."""
+    meeting_id: str
+    kind: str  # "report" or "transcript"
+    title: str
+    date: str
+    text: str
+    score: float
+
+
+class HashingEmbedder:
+    """
+    Local embeddings by signed feature hashing of words and word pairs.
+
+    Weights are 1 + log(count). Rows are unit length, so a dot product is
+    the cosine similarity.
+    """
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = [t for t in _TOKEN_PATTERN.findall(text.lower()) if t not in _STOPWORDS]
+            features = Counter(tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])])
+            for feature, occurrences in features.items():
+                digest = zlib.crc32(feature.encode("utf-8"))
+                sign = 1.0 if digest & 0x80000000 else -1.0
+                vectors[row, digest % self.dim] += sign * (1.0 + math.log(occurrences))
+        return _normalize(vectors)
+
+
+class GeminiEmbedder:
+    """Gemini text embeddings, through the shared Gemini rate limits."""
+
+    BATCH_SIZE = 100
+
+    def __init__(self, model: str = "text-embedding-004", dim: int = 768):
+        self.model = model
+        self.dim = dim
+        self.name = f"gemini-{model}"
+        self._client = None
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        from google import genai
+        from tools.rate_limit import GEMINI, call_with_retry
+
+        if self._client is None:
+            self._client = genai.Client()
+        rows = []
+        for start in range(0, len(texts), self.BATCH_SIZE):
+            response = call_with_retry(
+                GEMINI, self._client.models.embed_content, model=self.model, contents=texts[start:start + self.BATCH_SIZE]
+            )
+            rows.extend(embedding.values for embedding in response.embeddings)
+        return _normalize(np.asarray(rows, dtype=np.float32).reshape(len(texts), self.dim))
+
+
+def default_embedder() -> Any:
+    """The embedder named by MEMORY_EMBEDDER ("hashing" or "gemini")."""
+    if os.getenv(EMBEDDER_ENV, "hashing").lower() == "gemini":
+        return GeminiEmbedder()
+    return HashingEmbedder()
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+
+def transcript_digest(transcript: str) -> str:
+    """Identifies a transcript, so a meeting is not recalled as its own past."""
+    return hashlib.sha256(transcript.strip().encode("utf-8")).hexdigest()[:32]
+
+
+def chunk_transcript(transcript: str, chunk_words: int = CHUNK_WORDS) -> List[str]:
+    """
+    Packs speaker turns into chunks of about ``chunk_words`` words, splitting long turns.
+
+    Speaker labels are dropped: "Speaker 2" of one meeting is nobody in
+    particular in another.
+    """
+    chunks: List[str] = []
+    current: List[str] = []
+    for line in transcript.splitlines():
+        words = _SPEAKER_LABEL.sub("", line).split()
+        while words:
+            room = chunk_words - len(current)
+            current.extend(words[:room])
+            words = words[room:]
+            if len(current) >= chunk_words:
+                chunks.append(" ".join(current))
+                current = []
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def report_snippet(report: MeetingReport) -> str:
+    """Summary, decisions and action items of a report as one snippet."""
+    parts = [report.summary.strip()]
+    if report.decisions_made:
+        parts.append("Decisions: " + "; ".join(report.decisions_made) + ".")
+    if report.action_items:
+        parts.append("Action items: " + "; ".join(
+            item.task + (f" ({item.assignee}" + (f", {item.deadline}" if item.deadline else "") + ")"
+                         if item.assignee else "")
+            for item in report.action_items
+        ) + ".")
+    return " ".join(parts)
+
+
+class MeetingMemory:
+    """
+    Embedding index of past meetings in one directory.
+
+    Any number of processes may add and search concurrently: appends are
+    serialized by a SQLite write transaction, and a snippet row is only
+    committed after its vector has been written, so readers never see a
+    row without a vector.
+    """
+
+    def __init__(self, path: str = MEMORY_DIR, embedder: Optional[Any] = None):
+        self.path = path
+        self.embedder = embedder or default_embedder()
+        self.db_path = os.path.join(path, "memory.db")
+        self.vectors_path = os.path.join(path, "vectors.f32")
+        os.makedirs(path, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('embedder', ?)", (self.embedder.name,))
+            stored = conn.execute("SELECT value FROM meta WHERE key = 'embedder'").fetchone()["value"]
+        if stored != self.embedder.name:
+            raise ValueError(f"Memory at {path} was built with {stored}, not {self.embedder.name}; "
+                             "use a different directory or --rebuild after removing it")
+        self._row_bytes = self.embedder.dim * 4
+        self._loaded_ivf: Optional[tuple] = None
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def count(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COALESCE(MAX(id) + 1, 0) FROM snippets").fetchone()[0]
+
+    @traced("memory.add")
+    def add_meeting(self, meeting_id: str, report: MeetingReport, transcript: str = "") -> int:
+        """
+        Adds a saved meeting's report and transcript chunks.
+
+        Snippets already stored (the same report delivered again) are
+        skipped.
+
+        Args:
+            meeting_id: Identifier of the saved report
+            report: Validated report
+            transcript: Transcript the report was made from
+
+        Returns:
+            Number of snippets added
+        """
+        candidates = [("report", report_snippet(report))]
+        candidates += [("transcript", chunk) for chunk in chunk_transcript(transcript)]
+        candidates = [(kind, text[:MAX_SNIPPET_CHARS]) for kind, text in candidates if text.strip()]
+        hashes = [hashlib.sha256(f"{kind}\0{text}".encode("utf-8")).hexdigest() for kind, text in candidates]
+
+        with self._connect() as conn:
+            known = {
+                row["text_hash"] for row in conn.execute(
+                    f"SELECT text_hash FROM snippets WHERE text_hash IN ({','.join('?' * len(hashes))})", hashes
+                )
+            } if hashes else set()
+        new = [(c, h) for c, h in zip(candidates, hashes) if h not in known]
+        new = list({h: (c, h) for c, h in new}.values())
+        if not new:
+            return 0
+        vectors = self.embedder.embed([text for (_, text), _ in new])
+
+        source = transcript_digest(transcript)
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                first = conn.execute("SELECT COALESCE(MAX(id) + 1, 0) FROM snippets").fetchone()[0]
+                # Rows past the last committed one are leftovers of an aborted append
+                with open(self.vectors_path, 'ab') as f:
+                    f.truncate(first * self._row_bytes)
+                    f.write(vectors.astype('<f4').tobytes())
+                    f.flush()
+                conn.executemany(
+                    "INSERT OR IGNORE INTO snippets (id, meeting_id, source, kind, title, date, text, text_hash) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (first + offset, meeting_id, source, kind, report.meeting_title, report.date, text, text_hash)
+                        for offset, ((kind, text), text_hash) in enumerate(new)
+                    ]
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+        annotate(snippets=len(new))
+        return len(new)
+
+    def _vectors(self, rows: int) -> np.ndarray:
+        if rows == 0:
+            return np.zeros((0, self.embedder.dim), dtype=np.float32)
+        return np.memmap(self.vectors_path, dtype='<f4', mode='r', shape=(rows, self.embedder.dim))
+
+    def _ivf(self) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'ivf'").fetchone()
+        if row is None:
+            return None
+        if self._loaded_ivf is not None and self._loaded_ivf[0] == row["value"]:
+            return self._loaded_ivf[1]
+        info = json.loads(row["value"])
+        directory = os.path.join(self.path, info["dir"])
+        try:
+            ivf = {
+                "rows": info["rows"],
+                "centroids": np.load(os.path.join(directory, "centroids.npy")),
+                "order": np.load(os.path.join(directory, "order.npy"), mmap_mode='r'),
+                "offsets": np.load(os.path.join(directory, "offsets.npy")),
+            }
+        except OSError:
+            return None
+        self._loaded_ivf = (row["value"], ivf)
+        return ivf
+
+    def _scores(self, queries: np.ndarray, rows: int, approximate: Optional[bool]) -> tuple:
+        """Returns (row ids, best similarity to any query) of the rows scanned."""
+        vectors = self._vectors(rows)
+        ivf = self._ivf() if approximate is not False and rows >= APPROX_MIN_ROWS else None
+        if ivf is not None:
+            probes = np.unique(np.argsort(-(queries @ ivf["centroids"].T), axis=1)[:, :NPROBE])
+            offsets, order = ivf["offsets"], ivf["order"]
+            candidates = np.concatenate(
+                [np.asarray(order[offsets[c]:offsets[c + 1]]) for c in probes]
+                + [np.arange(ivf["rows"], rows)]
+            )
+            candidates.sort()
+            annotate(scanned=len(candidates), approximate=True)
+            return candidates, (vectors[candidates] @ queries.T).max(axis=1)
+
+        annotate(scanned=rows, approximate=False)
+        scores = np.empty(rows, dtype=np.float32)
+        for start in range(0, rows, SEARCH_BLOCK_ROWS):
+            block = np.asarray(vectors[start:start + SEARCH_BLOCK_ROWS])
+            scores[start:start + len(block)] = (block @ queries.T).max(axis=1)
+        return np.arange(rows), scores
+
+    @traced("memory.search")
+    def search(
+        self,
+        queries: List[str],
+        k: int = TOP_K,
+        exclude_source: Optional[str] = None,
+        min_similarity: float = MIN_SIMILARITY,
+        approximate: Optional[bool] = None
+    ) -> List[Snippet]:
+        """
+        Finds the snippets most similar to any of the queries.
+
+        Args:
+            queries: Texts to match; a snippet scores its best match
+            k: Number of snippets to return
+            exclude_source: Transcript digest whose snippets are skipped
+            min_similarity: Lowest cosine similarity returned
+            approximate: Use the inverted-file index (None: when built and
+                the memory is large enough)
+
+        Returns:
+            At most ``k`` snippets, at most MAX_PER_MEETING per meeting,
+            best first
+        """
+        rows = self.count()
+        queries = [q for q in queries if q.strip()]
+        if not rows or not queries:
+            return []
+        ids, scores = self._scores(self.embedder.embed(queries), rows, approximate)
+
+        results: List[Snippet] = []
+        per_meeting: Counter = Counter()
+        # Fetch generously; some candidates are excluded below
+        fetch = min(len(scores), max(4 * k, 32))
+        top = np.argpartition(-scores, fetch - 1)[:fetch]
+        top = top[np.argsort(-scores[top])]
+        with self._connect() as conn:
+            for index in top:
+                score = float(scores[index])
+                if score < min_similarity or len(results) >= k:
+                    break
+                row = conn.execute(
+                    "SELECT meeting_id, source, kind, title, date, text FROM snippets WHERE id = ?", (int(ids[index]),)
+                ).fetchone()
+                if row is None or row["source"] == exclude_source or per_meeting[row["meeting_id"]] >= MAX_PER_MEETING:
+                    continue
+                per_meeting[row["meeting_id"]] += 1
+                results.append(Snippet(row["meeting_id"], row["kind"], row["title"], row["date"], row["text"], score))
+        return results
+
+    def related_context(
+        self,
+        transcript: str,
+        meeting_title: Optional[str] = None,
+        k: int = TOP_K,
+        max_tokens: int = MAX_CONTEXT_TOKENS,
+        approximate: Optional[bool] = None
+    ) -> str:
+        """
+        Past-meeting snippets relevant to a transcript, for the analyst prompt.
+
+        The title and up to MAX_QUERY_CHUNKS chunks spread over the
+        transcript are the queries. The meeting's own snippets (an earlier
+        analysis of the same transcript) are left out.
+
+        Args:
+            transcript: Transcript being analyzed
+            meeting_title: Optional title entered by the user
+            k: Most snippets to include
+            max_tokens: Budget of the returned text
+            approximate: Passed on to search()
+
+        Returns:
+            One "- Title (date): text" line per snippet, or "" when nothing
+            is similar enough
+        """
+        chunks = chunk_transcript(transcript)
+        if len(chunks) > MAX_QUERY_CHUNKS:
+            step = len(chunks) / float(MAX_QUERY_CHUNKS)
+            chunks = [chunks[int(i * step)] for i in range(MAX_QUERY_CHUNKS)]
+        queries = ([meeting_title] if meeting_title else []) + chunks
+
+        lines: List[str] = []
+        budget = max_tokens * CHARS_PER_TOKEN
+        for snippet in self.search(queries, k, exclude_source=transcript_digest(transcript),
+                                   approximate=approximate):
+            line = f"- {snippet.title} ({snippet.date}): {snippet.text}"
+            if len(line) > budget:
+                break
+            lines.append(line)
+            budget -= len(line) + 1
+        return "\n".join(lines)
+
+    def build_index(self, clusters: Optional[int] = None, seed: int = 0) -> Dict[str, int]:
+        """
+        Builds the approximate index over every snippet stored so far.
+
+        Spherical k-means on a sample picks ``clusters`` centroids (about
+        sqrt(rows) by default); every row is then listed under its nearest
+        centroid. Snippets added later are scanned exactly until the next
+        build.
+
+        Returns:
+            Dictionary with "rows" and "clusters"
+        """
+        rows = self.count()
+        if rows == 0:
+            return {"rows": 0, "clusters": 0}
+        vectors = self._vectors(rows)
+        clusters = max(1, min(rows, clusters or int(math.sqrt(rows))))
+        rng = np.random.default_rng(seed)
+        sample = np.asarray(vectors[np.sort(rng.choice(rows, min(rows, KMEANS_SAMPLE_ROWS), replace=False))])
+        centroids = sample[rng.choice(len(sample), clusters, replace=False)]
+        for _ in range(KMEANS_ITERATIONS):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            empty = np.bincount(labels, minlength=clusters) == 0
+            sums[empty] = centroids[empty]
+            centroids = _normalize(sums)
+
+        labels = np.empty(rows, dtype=np.int32)
+        for start in range(0, rows, SEARCH_BLOCK_ROWS):
+            block = np.asarray(vectors[start:start + SEARCH_BLOCK_ROWS])
+            labels[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+        order = np.argsort(labels, kind='stable').astype(np.int64)
+        offsets = np.searchsorted(labels[order], np.arange(clusters + 1)).astype(np.int64)
+
+        name = f"ivf-{rows}"
+        directory = os.path.join(self.path, name)
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "centroids.npy"), centroids.astype(np.float32))
+        np.save(os.path.join(directory, "order.npy"), order)
+        np.save(os.path.join(directory, "offsets.npy"), offsets)
+        with self._connect() as conn:
+            previous = conn.execute("SELECT value FROM meta WHERE key = 'ivf'").fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('ivf', ?)",
+                (json.dumps({"dir": name, "rows": rows}),)
+            )
+        if previous is not None and json.loads(previous["value"])["dir"] != name:
+            shutil.rmtree(os.path.join(self.path, json.loads(previous["value"])["dir"]), ignore_errors=True)
+        return {"rows": rows, "clusters": clusters}
+
+    def rebuild(self) -> int:
+        """
+        Adds every report known to the report store, page by page.
+
+        Returns:
+            Number of snippets added
+        """
+        from tools.report_store import get_report_store
+
+        store = get_report_store()
+        added = 0
+        before = None
+        while True:
+            page = store.list(limit=200, before=before)
+            if not page:
+                return added
+            for entry in page:
+                try:
+                    report = store.load(entry)
+                    transcript = store.load_transcript(entry)
+                except (OSError, ValueError):
+                    continue
+                if isinstance(report, dict):
+                    added += self.add_meeting(entry["meeting_id"], MeetingReport.model_validate(report), transcript)
+            before = store.page_cursor(page)
+
+
+_default_memory: Optional[MeetingMemory] = None
+_default_memory_lock = threading.Lock()
+
+
+def get_meeting_memory() -> MeetingMemory:
+    """Returns the process-wide memory in ``.memory/``."""
+    global _default_memory
+    with _default_memory_lock:
+        if _default_memory is None:
+            _default_memory = MeetingMemory()
+        return _default_memory
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rebuild", action="store_true", help="Add every saved report")
+    parser.add_argument("--build-index", action="store_true", help="Build the approximate index")
+    parser.add_argument("--clusters", type=int, help="Clusters of the approximate index")
+    parser.add_argument("--search", help="Print the snippets most similar to this text")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    memory = get_meeting_memory()
+    if args.rebuild:
+        print(json.dumps({"added": memory.rebuild()}))
+    if args.build_index:
+        print(json.dumps(memory.build_index(args.clusters)))
+    if args.search:
+        for snippet in memory.search([args.search], min_similarity=0.0):
+            print(f"{snippet.score:.3f} {snippet.title} ({snippet.date}) [{snippet.kind}] {snippet.text[:120]}")
+    print(json.dumps({"snippets": memory.count()}))
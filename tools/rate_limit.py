@@ -0,0 +1,556 @@
+"""
+Shared rate limiting and retries for Gemini, Speech-to-Text, Cloud Storage and
+SendGrid calls.
+
+Every worker, batch run and the app draw from the same per-API token
+buckets, kept in a SQLite file, so configured limits hold across all
+processes. Each API's request rate and concurrency limit adapt to the
+real quota: a quota error pauses the API for every process and halves
+both, successful calls grow them back towards the configured maximum
+(AIMD).
+
+Failed calls are retried with full-jitter exponential backoff. Retries
+draw from a retry budget shared by all processes, refilled by a fraction
+of every call, so retries can never multiply the load during an outage.
+
+Limits come from DEFAULT_LIMITS and can be overridden per API with
+environment variables, e.g. GEMINI_REQUESTS_PER_MINUTE=300,
+GEMINI_MAX_CONCURRENCY=8 and GEMINI_BURST=10.
+"""
+import asyncio
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, AsyncGenerator, AsyncIterator, Callable, Dict, Iterator, NamedTuple, Optional, TypeVar, Union
+
+import httpx
+from google.adk.models import BaseLlm, Gemini, LlmRequest, LlmResponse
+from google.api_core import exceptions as api_exceptions
+from google.genai import errors as genai_errors
+from python_http_client import exceptions as sendgrid_exceptions
+from requests import exceptions as http_exceptions
+
+from tools.clients import SENDGRID, SPEECH, STORAGE
+from tools.telemetry import count
+
+GEMINI = "gemini"
+
+RATE_LIMIT_PATH = ".ratelimit/limits.db"
+
+OK = "ok"
+THROTTLED = "throttled"  # Rejected for quota (HTTP 429 / RESOURCE_EXHAUSTED)
+TRANSIENT = "transient"  # Worth retrying: 5xx, timeouts, dropped connections
+FAILED = "failed"
+
+# In-flight slots of a crashed process are freed after this long
+LEASE_SECONDS = 600
+# Wait between checks while an API is at its concurrency limit
+POLL_SECONDS = 0.05
+# Pause after a quota error that carries no retry delay
+THROTTLE_PAUSE_SECONDS = 1.0
+# Quota errors within this window of a decrease count as the same overload
+DECREASE_INTERVAL_SECONDS = 1.0
+# Lowest fraction of the configured rate a quota error can cut it to, and
+# how much of the configured rate each successful call wins back
+MIN_RATE_SCALE = 0.05
+RATE_RECOVERY = 0.02
+
+# Each call adds this much retry budget; each retry spends one
+RETRY_BUDGET_RATIO = 0.2
+RETRY_BUDGET_CAP = 10.0
+
+T = TypeVar("T")
+
+
+class ApiLimit(NamedTuple):
+    """Quota of one API, shared by every process."""
+    requests_per_minute: float
+    max_concurrency: int
+    burst: int
+
+
+DEFAULT_LIMITS: Dict[str, ApiLimit] = {
+    GEMINI: ApiLimit(requests_per_minute=300, max_concurrency=8, burst=10),
+    SPEECH: ApiLimit(requests_per_minute=900, max_concurrency=16, burst=30),
+    SENDGRID: ApiLimit(requests_per_minute=600, max_concurrency=4, burst=20),
+    STORAGE: ApiLimit(requests_per_minute=3000, max_concurrency=32, burst=100),
+}
+
+
+class RetryPolicy(NamedTuple):
+    """How often and how patiently a call is retried."""
+    max_attempts: int = 5
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+    # Longest wait for a free slot before giving up
+    acquire_timeout: float = 300.0
+
+
+class RateLimitError(Exception):
+    """Raised when an API keeps rejecting calls for quota, or no slot frees up in time."""
+
+
+class Lease(NamedTuple):
+    id: str
+    api: str
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS limits (
+    api TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    refilled_at REAL NOT NULL,
+    concurrency REAL NOT NULL,
+    rate_scale REAL NOT NULL DEFAULT 1,
+    paused_until REAL NOT NULL DEFAULT 0,
+    decreased_at REAL NOT NULL DEFAULT 0,
+    retry_tokens REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS leases (
+    id TEXT PRIMARY KEY,
+    api TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_leases_api ON leases (api);
+"""
+
+
+def limit_from_env(api: str, default: ApiLimit) -> ApiLimit:
+    """Applies <API>_REQUESTS_PER_MINUTE, _MAX_CONCURRENCY and _BURST overrides."""
+    prefix = api.upper()
+    return ApiLimit(
+        requests_per_minute=float(os.getenv(f"{prefix}_REQUESTS_PER_MINUTE", default.requests_per_minute)),
+        max_concurrency=int(os.getenv(f"{prefix}_MAX_CONCURRENCY", default.max_concurrency)),
+        burst=int(os.getenv(f"{prefix}_BURST", default.burst))
+    )
+
+
+def classify_error(error: BaseException) -> Optional[str]:
+    """Returns THROTTLED or TRANSIENT for retryable errors, else None."""
+    if isinstance(error, (api_exceptions.ResourceExhausted, api_exceptions.TooManyRequests)):
+        return THROTTLED
+    if isinstance(error, genai_errors.APIError):
+        if error.code == 429:
+            return THROTTLED
+        return TRANSIENT if error.code in (408, 500, 502, 503, 504) else None
+    if isinstance(error, sendgrid_exceptions.HTTPError):
+        if error.status_code == 429:
+            return THROTTLED
+        return TRANSIENT if error.status_code in (408, 500, 502, 503, 504) else None
+    if isinstance(error, (
+        api_exceptions.InternalServerError,
+        api_exceptions.BadGateway,
+        api_exceptions.ServiceUnavailable,
+        api_exceptions.GatewayTimeout,
+        ConnectionError,
+        TimeoutError,
+        http_exceptions.ConnectionError,
+        http_exceptions.Timeout,
+        httpx.TransportError,
+    )):
+        return TRANSIENT
+    return None
+
+
+def _parse_seconds(value: Any) -> Optional[float]:
+    try:
+        return float(str(value).rstrip("s"))
+    except ValueError:
+        return None
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Server-suggested wait from a Retry-After header or RetryInfo detail."""
+    response = getattr(error, "response", None)
+    # SendGrid errors carry the headers themselves
+    headers = getattr(response, "headers", None) or getattr(error, "headers", None)
+    if headers and headers.get("Retry-After"):
+        return _parse_seconds(headers["Retry-After"])
+
+    # Gemini puts RetryInfo in the JSON body, Speech in the gRPC status details
+    pending = [getattr(error, "details", None)]
+    while pending:
+        detail = pending.pop()
+        if isinstance(detail, dict):
+            if "retryDelay" in detail:
+                return _parse_seconds(detail["retryDelay"])
+            pending.extend(detail.values())
+        elif isinstance(detail, list):
+            pending.extend(detail)
+        elif getattr(detail, "retry_delay", None) is not None:
+            delay = detail.retry_delay
+            return delay.seconds + delay.nanos / 1e9
+    return None
+
+
+def backoff_delay(attempt: int, policy: RetryPolicy, retry_after: Optional[float] = None) -> float:
+    """Full-jitter exponential backoff, never shorter than the server's hint."""
+    delay = random.uniform(0, min(policy.max_delay, policy.base_delay * 2 ** (attempt - 1)))
+    return max(delay, min(retry_after or 0.0, policy.max_delay))
+
+
+class RateLimiter:
+    """
+    Token buckets and adaptive concurrency limits shared through SQLite.
+
+    acquire() blocks until the API has both a request token and a free
+    concurrency slot, and returns a lease that release() hands back with
+    the call's outcome. Each acquire and release is one short IMMEDIATE
+    transaction, so all processes see the same buckets.
+    """
+
+    def __init__(self, path: str = RATE_LIMIT_PATH, limits: Optional[Dict[str, ApiLimit]] = None):
+        self.path = path
+        self.limits = limits if limits is not None else {
+            api: limit_from_env(api, default) for api, default in DEFAULT_LIMITS.items()
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _state(self, conn: sqlite3.Connection, api: str, now: float) -> Dict[str, Any]:
+        limit = self.limits[api]
+        row = conn.execute("SELECT * FROM limits WHERE api = ?", (api,)).fetchone()
+        if row is None:
+            state = {"tokens": float(limit.burst), "refilled_at": now, "concurrency": float(limit.max_concurrency),
+                     "rate_scale": 1.0, "paused_until": 0.0, "decreased_at": 0.0, "retry_tokens": RETRY_BUDGET_CAP}
+            conn.execute(
+                """
+                INSERT INTO limits (api, tokens, refilled_at, concurrency, rate_scale, paused_until,
+                                    decreased_at, retry_tokens)
+                VALUES (:api, :tokens, :refilled_at, :concurrency, :rate_scale, :paused_until,
+                        :decreased_at, :retry_tokens)
+                """,
+                {"api": api, **state}
+            )
+        else:
+            state = dict(row)
+        elapsed = max(0.0, now - state["refilled_at"])
+        state["tokens"] = min(float(limit.burst), state["tokens"] + elapsed * self._rate(limit, state))
+        state["refilled_at"] = max(now, state["refilled_at"])
+        # The limit may have been lowered in the environment since the row was written
+        state["concurrency"] = min(state["concurrency"], float(limit.max_concurrency))
+        return state
+
+    @staticmethod
+    def _rate(limit: ApiLimit, state: Dict[str, Any]) -> float:
+        return limit.requests_per_minute / 60.0 * state["rate_scale"]
+
+    def _save(self, conn: sqlite3.Connection, api: str, state: Dict[str, Any]) -> None:
+        conn.execute(
+            """
+            UPDATE limits SET tokens = :tokens, refilled_at = :refilled_at, concurrency = :concurrency,
+                              rate_scale = :rate_scale, paused_until = :paused_until, decreased_at = :decreased_at,
+                              retry_tokens = :retry_tokens
+            WHERE api = :api
+            """,
+            {**state, "api": api}
+        )
+
+    def try_acquire(self, api: str) -> tuple:
+        """
+        Takes a slot if one is free right now.
+
+        Args:
+            api: API name, e.g. GEMINI or SPEECH
+
+        Returns:
+            (lease, 0.0) on success, else (None, seconds to wait before trying again)
+        """
+        limit = self.limits[api]
+        now = time.time()
+        with self._transaction() as conn:
+            state = self._state(conn, api, now)
+            conn.execute("DELETE FROM leases WHERE api = ? AND expires_at < ?", (api, now))
+            in_flight = conn.execute("SELECT COUNT(*) FROM leases WHERE api = ?", (api,)).fetchone()[0]
+
+            if now < state["paused_until"]:
+                wait = state["paused_until"] - now
+            elif in_flight >= max(1, int(state["concurrency"])):
+                wait = POLL_SECONDS
+            elif state["tokens"] < 1.0:
+                wait = (1.0 - state["tokens"]) / self._rate(limit, state)
+            else:
+                wait = 0.0
+                state["tokens"] -= 1.0
+                lease = Lease(uuid.uuid4().hex, api)
+                conn.execute(
+                    "INSERT INTO leases (id, api, expires_at) VALUES (?, ?, ?)",
+                    (lease.id, api, now + LEASE_SECONDS)
+                )
+            self._save(conn, api, state)
+        return (None, wait) if wait else (lease, 0.0)
+
+    def acquire(self, api: str, timeout: float = RetryPolicy().acquire_timeout) -> Lease:
+        """
+        Blocks until a slot is free.
+
+        Args:
+            api: API name, e.g. GEMINI or SPEECH
+            timeout: Longest time to wait
+
+        Returns:
+            The lease to pass to release()
+        """
+        started = time.monotonic()
+        while True:
+            lease, wait = self.try_acquire(api)
+            if lease is not None:
+                break
+            if time.monotonic() - started + wait > timeout:
+                raise RateLimitError(f"No {api} capacity became free within {timeout:.0f}s")
+            # Jitter keeps waiting processes from retrying in lockstep
+            time.sleep(wait + random.uniform(0, POLL_SECONDS))
+        waited = time.monotonic() - started
+        if waited > 0.001:
+            count("rate_limit_wait_seconds_total", waited, api=api)
+        return lease
+
+    async def acquire_async(self, api: str, timeout: float = RetryPolicy().acquire_timeout) -> Lease:
+        """Like acquire(), but waits without blocking the event loop."""
+        started = time.monotonic()
+        while True:
+            lease, wait = await asyncio.to_thread(self.try_acquire, api)
+            if lease is not None:
+                break
+            if time.monotonic() - started + wait > timeout:
+                raise RateLimitError(f"No {api} capacity became free within {timeout:.0f}s")
+            await asyncio.sleep(wait + random.uniform(0, POLL_SECONDS))
+        waited = time.monotonic() - started
+        if waited > 0.001:
+            count("rate_limit_wait_seconds_total", waited, api=api)
+        return lease
+
+    def release(self, lease: Lease, outcome: str, retry_after: Optional[float] = None, retry: bool = False) -> bool:
+        """
+        Returns a slot and adapts the API's limits to the call's outcome.
+
+        Args:
+            lease: Lease from acquire()
+            outcome: OK, THROTTLED, TRANSIENT or FAILED
+            retry_after: Server-suggested wait after a quota error
+            retry: Whether the caller wants to retry the call
+
+        Returns:
+            True when a retry was requested and the retry budget allows it
+        """
+        limit = self.limits[lease.api]
+        now = time.time()
+        with self._transaction() as conn:
+            state = self._state(conn, lease.api, now)
+            conn.execute("DELETE FROM leases WHERE id = ?", (lease.id,))
+
+            if outcome == OK:
+                state["concurrency"] = min(float(limit.max_concurrency), state["concurrency"] + 1.0 / state["concurrency"])
+                state["rate_scale"] = min(1.0, state["rate_scale"] + RATE_RECOVERY)
+            elif outcome == THROTTLED:
+                # Everyone pauses, then resumes from an empty bucket instead of a burst
+                state["paused_until"] = max(state["paused_until"], now + (retry_after or THROTTLE_PAUSE_SECONDS))
+                state["tokens"] = 0.0
+                state["refilled_at"] = state["paused_until"]
+                if now - state["decreased_at"] >= DECREASE_INTERVAL_SECONDS:
+                    state["concurrency"] = max(1.0, state["concurrency"] / 2)
+                    state["rate_scale"] = max(MIN_RATE_SCALE, state["rate_scale"] / 2)
+                    state["decreased_at"] = now
+
+            state["retry_tokens"] = min(RETRY_BUDGET_CAP, state["retry_tokens"] + RETRY_BUDGET_RATIO)
+            allowed = retry and state["retry_tokens"] >= 1.0
+            if allowed:
+                state["retry_tokens"] -= 1.0
+            self._save(conn, lease.api, state)
+
+        if outcome == THROTTLED:
+            count("throttled_total", 1, api=lease.api)
+        return allowed
+
+    def status(self, api: str) -> Dict[str, float]:
+        """Current shared state of an API's limits, for dashboards and debugging."""
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM limits WHERE api = ?", (api,)).fetchone()
+            in_flight = conn.execute(
+                "SELECT COUNT(*) FROM leases WHERE api = ? AND expires_at >= ?", (api, now)
+            ).fetchone()[0]
+        if row is None:
+            return {"in_flight": in_flight}
+        return {
+            "in_flight": in_flight,
+            "concurrency_limit": int(row["concurrency"]),
+            "requests_per_minute": round(self._rate(self.limits[api], row) * 60.0, 1),
+            "paused_seconds": max(0.0, row["paused_until"] - now),
+            "retry_budget": row["retry_tokens"],
+        }
+
+
+_default_limiter: Optional[RateLimiter] = None
+_default_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Returns the process-wide rate limiter."""
+    global _default_limiter
+    with _default_limiter_lock:
+        if _default_limiter is None:
+            _default_limiter = RateLimiter()
+        return _default_limiter
+
+
+class Attempt:
+    """
+    One rate-limited try of a call, used as a context manager.
+
+    Leaving the block normally releases the slot as a success. A
+    retryable error is swallowed when the retry budget allows another
+    attempt (``retry_delay`` is then set); otherwise it propagates, quota
+    errors as RateLimitError.
+    """
+
+    def __init__(self, limiter: RateLimiter, lease: Lease, number: int, policy: RetryPolicy):
+        self.limiter = limiter
+        self.lease = lease
+        self.number = number
+        self.policy = policy
+        self.retry_delay: Optional[float] = None
+        # Set once output has been handed on; such calls are never retried
+        self.delivered = False
+
+    def __enter__(self) -> "Attempt":
+        return self
+
+    def __exit__(self, exc_type, error, traceback) -> bool:
+        if exc_type is None:
+            self.limiter.release(self.lease, OK)
+            return False
+        if not isinstance(error, Exception):
+            self.limiter.release(self.lease, OK if self.delivered else FAILED)
+            return False
+
+        kind = classify_error(error)
+        retry_after = retry_after_seconds(error)
+        wants_retry = kind is not None and not self.delivered and self.number < self.policy.max_attempts
+        if not self.limiter.release(self.lease, kind or FAILED, retry_after, retry=wants_retry):
+            if kind == THROTTLED:
+                reason = "retry budget exhausted" if wants_retry else f"gave up after {self.number} attempts"
+                raise RateLimitError(f"{self.lease.api} quota exceeded ({reason}): {error}") from error
+            return False
+
+        count("retries_total", 1, api=self.lease.api, reason=kind)
+        self.retry_delay = backoff_delay(self.number, self.policy, retry_after)
+        return True
+
+
+def attempts(api: str, policy: Optional[RetryPolicy] = None) -> Iterator[Attempt]:
+    """
+    Yields rate-limited attempts until one succeeds or retrying stops.
+
+    Usage:
+        for attempt in attempts(SPEECH):
+            with attempt:
+                return client.recognize(config=config, audio=audio)
+    """
+    policy = policy or RetryPolicy()
+    limiter = get_rate_limiter()
+    for number in range(1, policy.max_attempts + 1):
+        attempt = Attempt(limiter, limiter.acquire(api, policy.acquire_timeout), number, policy)
+        yield attempt
+        if attempt.retry_delay is None:
+            return
+        time.sleep(attempt.retry_delay)
+
+
+async def attempts_async(api: str, policy: Optional[RetryPolicy] = None) -> AsyncIterator[Attempt]:
+    """Async counterpart of attempts(), for use with ``async for``."""
+    policy = policy or RetryPolicy()
+    limiter = get_rate_limiter()
+    for number in range(1, policy.max_attempts + 1):
+        attempt = Attempt(limiter, await limiter.acquire_async(api, policy.acquire_timeout), number, policy)
+        yield attempt
+        if attempt.retry_delay is None:
+            return
+        await asyncio.sleep(attempt.retry_delay)
+
+
+def call_with_retry(api: str, function: Callable[..., T], *args: Any,
+                    policy: Optional[RetryPolicy] = None, **kwargs: Any) -> T:
+    """
+    Calls function under the API's shared limits, retrying retryable errors.
+
+    Args:
+        api: API name, e.g. GEMINI or SPEECH
+        function: The call to make
+        policy: Retry policy; defaults to RetryPolicy()
+        *args, **kwargs: Passed to function
+
+    Returns:
+        The function's result
+    """
+    for attempt in attempts(api, policy):
+        with attempt:
+            return function(*args, **kwargs)
+
+
+class RateLimitedLlm(BaseLlm):
+    """
+    Model wrapper that sends every call of ``llm`` through the shared
+    rate limiter. Responses are streamed through unchanged; a call is only
+    retried if it failed before producing any output.
+    """
+
+    llm: BaseLlm
+    api: str = GEMINI
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        async for attempt in attempts_async(self.api):
+            with attempt:
+                async for response in self.llm.generate_content_async(llm_request, stream):
+                    attempt.delivered = True
+                    yield response
+                return
+
+
+def rate_limited(model: Union[str, BaseLlm], api: str = GEMINI) -> RateLimitedLlm:
+    """
+    Wraps a model (or Gemini model name) for use as an agent's model.
+
+    Args:
+        model: A BaseLlm, or a Gemini model name such as "gemini-2.5-flash"
+        api: Limits to apply
+
+    Returns:
+        The rate-limited model
+    """
+    llm = Gemini(model=model) if isinstance(model, str) else model
+    return RateLimitedLlm(model=llm.model, llm=llm, api=api)
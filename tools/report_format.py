@@ -0,0 +1,183 @@
+"""
+Compact, versioned on-disk format for meeting reports.
+
+A report file is a small fixed preamble, a JSON header and a sequence of
+independently encoded sections:
+
+    b"LLRP" | version (u16) | header length (u32) | header | sections...
+
+The header holds everything listings need (title, date, item counts,
+session and save time) plus the offset, length and codec of each section,
+so the header can be read without touching the body. Sections are JSON,
+zlib-compressed when that pays off; the transcript lives in its own
+section and is only decoded when asked for.
+"""
+import json
+import os
+import struct
+import tempfile
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+from models.schemas import MeetingReport
+
+MAGIC = b"LLRP"
+FORMAT_VERSION = 1
+REPORT_EXTENSION = ".llr"
+
+_PREAMBLE = struct.Struct("<4sHI")
+RAW, ZLIB = "raw", "zlib"
+COMPRESS_MIN_BYTES = 256  # Smaller sections are stored as-is
+
+# Section name -> report fields it holds
+SECTIONS: Dict[str, Tuple[str, ...]] = {
+    "summary": ("meeting_title", "date", "summary", "attendees"),
+    "topics": ("key_topics", "decisions_made"),
+    "action_items": ("action_items",),
+}
+TRANSCRIPT = "transcript"
+
+
+class ReportFormatError(ValueError):
+    """Raised when a file is not a readable report of a supported version."""
+
+
+def report_metadata(report: MeetingReport) -> Dict[str, Any]:
+    """Returns the header fields listings show for a report."""
+    return {
+        "title": report.meeting_title,
+        "date": report.date,
+        "attendee_count": len(report.attendees),
+        "topic_count": len(report.key_topics),
+        "action_item_count": len(report.action_items),
+        "decision_count": len(report.decisions_made),
+    }
+
+
+def _encode_section(value: Any) -> Tuple[bytes, str]:
+    data = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if len(data) >= COMPRESS_MIN_BYTES:
+        compressed = zlib.compress(data, 6)
+        if len(compressed) < len(data):
+            return compressed, ZLIB
+    return data, RAW
+
+
+def encode_report(
+    report: MeetingReport,
+    transcript: str = "",
+    session_id: Optional[str] = None,
+    created_at: Optional[float] = None
+) -> bytes:
+    """
+    Serializes a validated report into the compact format.
+
+    Args:
+        report: Report to store
+        transcript: Transcript the report was built from
+        session_id: Session that produced the report
+        created_at: Save time; defaults to now
+
+    Returns:
+        File contents
+    """
+    body = report.model_dump()
+    values = {name: {field: body[field] for field in fields} for name, fields in SECTIONS.items()}
+    if transcript:
+        values[TRANSCRIPT] = transcript
+
+    sections: Dict[str, List[Any]] = {}
+    blobs = []
+    offset = 0
+    for name, value in values.items():
+        data, codec = _encode_section(value)
+        sections[name] = [offset, len(data), codec]
+        blobs.append(data)
+        offset += len(data)
+
+    header = {
+        **report_metadata(report),
+        "session_id": session_id or "",
+        "created_at": created_at if created_at is not None else time.time(),
+        "sections": sections,
+    }
+    header_bytes = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return _PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header_bytes)) + header_bytes + b"".join(blobs)
+
+
+def write_report_file(path: str, report: MeetingReport, transcript: str = "",
+                      session_id: Optional[str] = None, created_at: Optional[float] = None) -> None:
+    """Writes a report file atomically, so readers never see a partial one."""
+    data = encode_report(report, transcript, session_id, created_at)
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+class ReportFile:
+    """
+    Lazily loaded report file.
+
+    Opening reads only the preamble and header; each section is read and
+    decoded on first access.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            preamble = f.read(_PREAMBLE.size)
+            if len(preamble) < _PREAMBLE.size:
+                raise ReportFormatError(f"{path} is too short to be a report")
+            magic, version, header_length = _PREAMBLE.unpack(preamble)
+            if magic != MAGIC:
+                raise ReportFormatError(f"{path} is not a report file")
+            if version > FORMAT_VERSION:
+                raise ReportFormatError(f"{path} uses report format {version}; this reader supports {FORMAT_VERSION}")
+            header = f.read(header_length)
+        if len(header) < header_length:
+            raise ReportFormatError(f"{path} is truncated")
+        self.version = version
+        self.header: Dict[str, Any] = json.loads(header.decode("utf-8"))
+        self._body_offset = _PREAMBLE.size + header_length
+        self._sections: Dict[str, Any] = {}
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """Header fields other than the section table."""
+        return {k: v for k, v in self.header.items() if k != "sections"}
+
+    def section(self, name: str) -> Any:
+        """Returns a decoded section, or None if the file has no such section."""
+        if name not in self._sections:
+            entry = self.header["sections"].get(name)
+            if entry is None:
+                return None
+            offset, length, codec = entry
+            with open(self.path, 'rb') as f:
+                f.seek(self._body_offset + offset)
+                data = f.read(length)
+            if len(data) < length:
+                raise ReportFormatError(f"{self.path} is truncated in section {name}")
+            if codec == ZLIB:
+                data = zlib.decompress(data)
+            elif codec != RAW:
+                raise ReportFormatError(f"{self.path} uses unknown codec {codec}")
+            self._sections[name] = json.loads(data.decode("utf-8"))
+        return self._sections[name]
+
+    def report(self) -> MeetingReport:
+        """Decodes and validates the report body (not the transcript)."""
+        body: Dict[str, Any] = {}
+        for name in SECTIONS:
+            body.update(self.section(name) or {})
+        return MeetingReport.model_validate(body)
+
+    def transcript(self) -> str:
+        return self.section(TRANSCRIPT) or ""
@@ -0,0 +1,653 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+from tools.deadlines import parse_date, parse_deadline
+from tools.report_format import REPORT_EXTENSION
+from tools.report_store import ReportStore, get_report_store
+
+_SCHEMA = """
+-- Indexed text of each report except its transcript, which stays in the
+-- report file. Ids follow save order, which ranking relies on; rebuild()
+-- numbers the reports it re-adds below zero, newest -1. AUTOINCREMENT
+-- keeps ids from being reused, so the terms of a replaced document can
+-- never match its successor.
+CREATE TABLE IF NOT EXISTS report_documents (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    meeting_id TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL DEFAULT '',
+    summary TEXT NOT NULL DEFAULT '',
+    topics TEXT NOT NULL DEFAULT '',
+    decisions TEXT NOT NULL DEFAULT '',
+    actions TEXT NOT NULL DEFAULT '',
+    text_hash TEXT NOT NULL
+);
+
+-- Contentless: only the inverted index is kept; rowid is report_documents.id
+CREATE VIRTUAL TABLE IF NOT EXISTS report_terms USING fts5(
+    title, summary, topics, decisions, actions, transcript,
+    content = '',
+    tokenize = 'porter unicode61'
+);
+
+CREATE TABLE IF NOT EXISTS action_items (
+    id INTEGER PRIMARY KEY,
+    meeting_id TEXT NOT NULL,
+    task TEXT NOT NULL,
+    assignee TEXT NOT NULL DEFAULT '',
+    assignee_key TEXT NOT NULL DEFAULT '',
+    deadline TEXT NOT NULL DEFAULT '',
+    priority TEXT NOT NULL DEFAULT 'medium',
+    due_date TEXT,
+    done_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_action_items_meeting ON action_items (meeting_id);
+CREATE INDEX IF NOT EXISTS idx_action_items_assignee ON action_items (assignee_key, priority, assignee);
+CREATE INDEX IF NOT EXISTS idx_action_items_priority ON action_items (priority);
+
+-- rowid mirrors action_items.id
+CREATE VIRTUAL TABLE IF NOT EXISTS action_item_text USING fts5(
+    task, tokenize = 'porter unicode61'
+);
+
+CREATE TABLE IF NOT EXISTS report_attendees (
+    meeting_id TEXT NOT NULL,
+    attendee_key TEXT NOT NULL,
+    PRIMARY KEY (attendee_key, meeting_id)
+);
+CREATE INDEX IF NOT EXISTS idx_report_attendees_meeting ON report_attendees (meeting_id);
+"""
+
+# Open items sorted by due date, overall and per facet; created after the
+# due_date and done_at columns exist in indexes built before them
+_DUE_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_action_items_due ON action_items (done_at, due_date);
+CREATE INDEX IF NOT EXISTS idx_action_items_assignee_due ON action_items (assignee_key, done_at, due_date);
+CREATE INDEX IF NOT EXISTS idx_action_items_priority_due ON action_items (priority, done_at, due_date);
+"""
+
+# bm25 column weights: title, summary, topics, decisions, actions, transcript
+_RANK_WEIGHTS = "5.0, 3.0, 3.0, 2.0, 2.0, 1.0"
+
+_TEXT_COLUMNS = ("title", "summary", "topics", "decisions", "actions")
+# Words around the first match in a search result snippet
+SNIPPET_WORDS = 12
+# Most matches ranked per query; bm25 costs a couple of microseconds per
+# match, so a term found in more reports is ranked among its newest ones
+MAX_RANKED_MATCHES = 5000
+
+
+def _person_key(name: Optional[str]) -> str:
+    return re.sub(r"\s+", " ", (name or "").strip().lower())
+
+
+def _task_key(task: str) -> str:
+    return re.sub(r"\W+", " ", task.lower()).strip()
+
+
+def _due_date(deadline: Any, meeting_date: Optional[date]) -> Optional[str]:
+    """ISO date a deadline resolves to, relative to the meeting (or today)."""
+    due = parse_deadline(str(deadline or ""), meeting_date or date.today())
+    return due.isoformat() if due else None
+
+
+def _match_expression(query: str) -> Optional[str]:
+    """Turns free text into an FTS5 query of quoted terms (all required)."""
+    terms = re.findall(r"\w+", query)
+    return " ".join(f'"{term}"' for term in terms) or None
+
+
+def _snippet(texts: Sequence[Callable[[], str]], query: str, words: int = SNIPPET_WORDS) -> str:
+    """
+    Words around the first query term found, matches in bold, like FTS5 snippet().
+
+    ``texts`` are read in order until one contains a term, so the
+    transcript is only loaded when no report field matched. Terms match
+    words that differ from them only in their last letters, for stemming
+    ("meetings" also finds "meeting", but "word1" not "word12").
+    """
+    stems = {re.sub(r"[^\W\d_]{1,2}$", "", term.lower()) if len(term) > 4 else term.lower()
+             for term in re.findall(r"\w+", query)}
+    if not stems:
+        return ""
+    pattern = re.compile(rf"\b(?:{'|'.join(map(re.escape, sorted(stems)))})[^\W\d_]*\b", re.IGNORECASE)
+    for text in texts:
+        tokens = text().split()
+        first = next((i for i, token in enumerate(tokens) if pattern.search(token)), None)
+        if first is None:
+            continue
+        start = max(0, min(first - words // 4, len(tokens) - words))
+        window = [pattern.sub(r"**\g<0>**", token) for token in tokens[start:start + words]]
+        return ("…" if start else "") + " ".join(window) + ("…" if start + words < len(tokens) else "")
+    return ""
+
+
+class ReportSearchIndex:
+    """
+    Incrementally maintained full-text and facet index over saved reports.
+
+    Lives in the same SQLite file as the ReportStore so search results can
+    be joined with report metadata. Report text is held in FTS5 inverted
+    indexes ranked by BM25; action item fields are plain B-tree indexed
+    columns used as facet filters. Transcripts are indexed but not stored:
+    the report file already holds them.
+
+    Action items double as the cross-meeting tracker: deadlines are
+    resolved to dates when a report is indexed, and open items are kept
+    in due-date order, so overdue and upcoming queries read an index
+    range instead of every report.
+    """
+
+    def __init__(self, store: Optional[ReportStore] = None):
+        self.store = store or get_report_store()
+        self.db_path = self.store.db_path
+        with self._connect() as conn:
+            is_new = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'report_terms'"
+            ).fetchone() is None
+            conn.executescript(_SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(action_items)")}
+            migrate = "due_date" not in columns
+            if migrate:
+                conn.execute("ALTER TABLE action_items ADD COLUMN due_date TEXT")
+                conn.execute("ALTER TABLE action_items ADD COLUMN done_at REAL")
+            conn.executescript(_DUE_INDEXES)
+        if is_new:
+            self.rebuild()
+            self.drop_legacy_text()
+        elif migrate:
+            self._backfill_due_dates()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def add(self, meeting_id: str, report: Dict[str, Any], transcript: str = "") -> None:
+        """
+        Indexes (or re-indexes) one report.
+
+        Args:
+            meeting_id: Unique identifier for the meeting
+            report: Parsed report body
+            transcript: Transcript the report was built from, if known
+        """
+        self._index(meeting_id, report, transcript)
+
+    def _index(self, meeting_id: str, report: Dict[str, Any], transcript: str,
+               document_id: Optional[int] = None) -> None:
+        items = [i for i in report.get("action_items") or [] if isinstance(i, dict)]
+        meeting_date = parse_date(str(report.get("date") or ""))
+        fields = (
+            str(report.get("meeting_title") or ""),
+            str(report.get("summary") or ""),
+            "\n".join(map(str, report.get("key_topics") or [])),
+            "\n".join(map(str, report.get("decisions_made") or [])),
+            "\n".join(str(i.get("task", "")) for i in items)
+        )
+        text_hash = hashlib.sha256("\0".join((*fields, transcript or "")).encode("utf-8")).hexdigest()
+        with self._connect() as conn:
+            # Items marked done stay done when their report is indexed again
+            done = {
+                _task_key(row["task"]): row["done_at"] for row in conn.execute(
+                    "SELECT task, done_at FROM action_items WHERE meeting_id = ? AND done_at IS NOT NULL",
+                    (meeting_id,)
+                )
+            }
+            self._delete(conn, meeting_id)
+            indexed = conn.execute(
+                "SELECT text_hash FROM report_documents WHERE meeting_id = ?", (meeting_id,)
+            ).fetchone()
+            if indexed is None or indexed["text_hash"] != text_hash:
+                # A contentless table can only delete a row given its old
+                # text, which the transcript no longer is once the report file
+                # is replaced; the old row's terms stay behind, unreachable
+                # without their document, until rebuild() starts afresh.
+                conn.execute("DELETE FROM report_documents WHERE meeting_id = ?", (meeting_id,))
+                cursor = conn.execute(
+                    """
+                    INSERT INTO report_documents (id, meeting_id, title, summary, topics, decisions, actions, text_hash)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (document_id, meeting_id, *fields, text_hash)
+                )
+                conn.execute(
+                    """
+                    INSERT INTO report_terms (rowid, title, summary, topics, decisions, actions, transcript)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (cursor.lastrowid, *fields, transcript or "")
+                )
+            for item in items:
+                cursor = conn.execute(
+                    """
+                    INSERT INTO action_items
+                        (meeting_id, task, assignee, assignee_key, deadline, priority, due_date, done_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        meeting_id,
+                        str(item.get("task") or ""),
+                        str(item.get("assignee") or ""),
+                        _person_key(item.get("assignee")),
+                        str(item.get("deadline") or ""),
+                        str(item.get("priority") or "medium").lower(),
+                        _due_date(item.get("deadline"), meeting_date),
+                        done.get(_task_key(str(item.get("task") or "")))
+                    )
+                )
+                conn.execute(
+                    "INSERT INTO action_item_text (rowid, task) VALUES (?, ?)",
+                    (cursor.lastrowid, str(item.get("task") or ""))
+                )
+            conn.executemany(
+                "INSERT OR IGNORE INTO report_attendees (meeting_id, attendee_key) VALUES (?, ?)",
+                [(meeting_id, _person_key(a)) for a in report.get("attendees") or [] if _person_key(a)]
+            )
+
+    @staticmethod
+    def _delete(conn: sqlite3.Connection, meeting_id: str) -> None:
+        conn.execute(
+            "DELETE FROM action_item_text WHERE rowid IN (SELECT id FROM action_items WHERE meeting_id = ?)",
+            (meeting_id,)
+        )
+        conn.execute("DELETE FROM action_items WHERE meeting_id = ?", (meeting_id,))
+        conn.execute("DELETE FROM report_attendees WHERE meeting_id = ?", (meeting_id,))
+
+    def search_reports(
+        self,
+        query: str = "",
+        attendee: Optional[str] = None,
+        assignee: Optional[str] = None,
+        priority: Optional[str] = None,
+        limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        """
+        Ranked keyword search over reports, narrowed by facets.
+
+        Only the newest MAX_RANKED_MATCHES reports containing every term
+        are ranked, so a term found in nearly every meeting costs no more
+        than a rarer one.
+
+        Args:
+            query: Free-text keywords; every term must match
+            attendee: Only meetings this person attended
+            assignee: Only meetings with an action item for this person
+            priority: Only meetings with an action item of this priority
+            limit: Maximum results
+
+        Returns:
+            Matches with report metadata, a highlighted snippet and a score
+            (lower is better, as returned by bm25)
+        """
+        match = _match_expression(query)
+        # Ranked matches are few, so each is checked against the facets by
+        # meeting_id ("+" keeps SQLite on that index); a facet-only listing
+        # reads the facet's meetings instead
+        clauses, params = [], []
+        if attendee:
+            clauses.append(
+                "EXISTS (SELECT 1 FROM report_attendees x WHERE x.attendee_key = ? AND x.meeting_id = r.meeting_id)"
+                if match else "r.meeting_id IN (SELECT meeting_id FROM report_attendees WHERE attendee_key = ?)"
+            )
+            params.append(_person_key(attendee))
+        if assignee or priority:
+            sub = ["SELECT 1 FROM action_items a WHERE a.meeting_id = r.meeting_id" if match
+                   else "SELECT meeting_id FROM action_items a WHERE 1 = 1"]
+            if assignee:
+                sub.append("AND +a.assignee_key = ?" if match else "AND a.assignee_key = ?")
+                params.append(_person_key(assignee))
+            if priority:
+                sub.append("AND +a.priority = ?" if match else "AND a.priority = ?")
+                params.append(priority.lower())
+            clauses.append(f"EXISTS ({' '.join(sub)})" if match else f"r.meeting_id IN ({' '.join(sub)})")
+
+        with self._connect() as conn:
+            if match:
+                # Document ids grow with each save, and FTS5 reads matches
+                # in id order without ranking them
+                cutoff = conn.execute(
+                    "SELECT rowid FROM report_terms WHERE report_terms MATCH ? ORDER BY rowid DESC LIMIT 1 OFFSET ?",
+                    (match, MAX_RANKED_MATCHES)
+                ).fetchone()
+                if cutoff is not None:
+                    clauses.insert(0, "report_terms.rowid > ?")
+                    params.insert(0, cutoff[0])
+                where = " AND ".join(["report_terms MATCH ?"] + clauses)
+                rows = conn.execute(
+                    f"""
+                    SELECT r.*, bm25(report_terms, {_RANK_WEIGHTS}) AS score,
+                           {', '.join(f'd.{column} AS text_{column}' for column in _TEXT_COLUMNS)}
+                    FROM report_terms
+                    JOIN report_documents d ON d.id = report_terms.rowid
+                    JOIN reports r ON r.meeting_id = d.meeting_id
+                    WHERE {where}
+                    ORDER BY score
+                    LIMIT ?
+                    """,
+                    (match, *params, limit)
+                ).fetchall()
+                return [self._with_snippet(dict(row), query) for row in rows]
+            else:
+                where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+                rows = conn.execute(
+                    f"""
+                    SELECT r.*, '' AS snippet, 0.0 AS score
+                    FROM reports r
+                    {where}
+                    ORDER BY r.created_at DESC
+                    LIMIT ?
+                    """,
+                    (*params, limit)
+                ).fetchall()
+        return [dict(row) for row in rows]
+
+    def _with_snippet(self, row: Dict[str, Any], query: str) -> Dict[str, Any]:
+        texts = [lambda text=row.pop(f"text_{column}"): text for column in _TEXT_COLUMNS]
+        texts.append(lambda: self._entry_transcript(row))
+        row["snippet"] = _snippet(texts, query)
+        return row
+
+    def search_action_items(
+        self,
+        query: str = "",
+        assignee: Optional[str] = None,
+        priority: Optional[str] = None,
+        deadline: Optional[str] = None,
+        limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        """
+        Finds action items across all meetings.
+
+        Args:
+            query: Keywords that must appear in the task
+            assignee: Exact assignee (case-insensitive)
+            priority: high, medium or low
+            deadline: Substring of the deadline text
+            limit: Maximum results
+
+        Returns:
+            Action items with the title and date of their meeting
+        """
+        clauses, params = [], []
+        match = _match_expression(query)
+        if match:
+            clauses.append("a.id IN (SELECT rowid FROM action_item_text WHERE action_item_text MATCH ?)")
+            params.append(match)
+        if assignee:
+            clauses.append("a.assignee_key = ?")
+            params.append(_person_key(assignee))
+        if priority:
+            clauses.append("a.priority = ?")
+            params.append(priority.lower())
+        if deadline:
+            clauses.append("a.deadline LIKE ?")
+            params.append(f"%{deadline}%")
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT a.id, a.meeting_id, a.task, a.assignee, a.deadline, a.priority, a.due_date, a.done_at,
+                       r.title, r.date, r.created_at
+                FROM action_items a
+                JOIN reports r ON r.meeting_id = a.meeting_id
+                {where}
+                ORDER BY r.created_at DESC
+                LIMIT ?
+                """,
+                (*params, limit)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def due_action_items(
+        self,
+        due_from: Optional[date] = None,
+        due_before: Optional[date] = None,
+        assignee: Optional[str] = None,
+        priority: Optional[str] = None,
+        include_done: bool = False,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """
+        Action items with a due date in a range, earliest first.
+
+        Open items are read in order from the due-date indexes, so the
+        cost depends on the items returned, not on how many exist.
+
+        Args:
+            due_from: First due date included
+            due_before: First due date excluded; overdue items are those
+                due before today
+            assignee: Exact assignee (case-insensitive)
+            priority: high, medium or low
+            include_done: Also return items marked done
+            limit: Maximum results
+
+        Returns:
+            Action items with the title and date of their meeting
+        """
+        clauses, params = ["a.due_date IS NOT NULL"], []
+        if not include_done:
+            clauses.append("a.done_at IS NULL")
+        if assignee:
+            clauses.append("a.assignee_key = ?")
+            params.append(_person_key(assignee))
+        if priority:
+            clauses.append("a.priority = ?")
+            params.append(priority.lower())
+        if due_from:
+            clauses.append("a.due_date >= ?")
+            params.append(due_from.isoformat())
+        if due_before:
+            clauses.append("a.due_date < ?")
+            params.append(due_before.isoformat())
+
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT a.id, a.meeting_id, a.task, a.assignee, a.deadline, a.priority, a.due_date, a.done_at,
+                       r.title, r.date
+                FROM action_items a
+                JOIN reports r ON r.meeting_id = a.meeting_id
+                WHERE {' AND '.join(clauses)}
+                ORDER BY a.due_date, a.id
+                LIMIT ?
+                """,
+                (*params, limit)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def due_counts(
+        self,
+        today: date,
+        horizon_days: int = 7,
+        assignee: Optional[str] = None,
+        priority: Optional[str] = None
+    ) -> Dict[str, int]:
+        """
+        Counts open action items by when they are due.
+
+        Args:
+            today: Date the counts are relative to
+            horizon_days: Days ahead counted as upcoming, today included
+            assignee: Exact assignee (case-insensitive)
+            priority: high, medium or low
+
+        Returns:
+            Dictionary with "overdue", "due_today", "upcoming" and
+            "undated" counts
+        """
+        clauses, params = ["a.done_at IS NULL"], []
+        if assignee:
+            clauses.append("a.assignee_key = ?")
+            params.append(_person_key(assignee))
+        if priority:
+            clauses.append("a.priority = ?")
+            params.append(priority.lower())
+        where = " AND ".join(clauses)
+        ranges = {
+            "overdue": ("a.due_date < ?", [today.isoformat()]),
+            "due_today": ("a.due_date = ?", [today.isoformat()]),
+            "upcoming": ("a.due_date >= ? AND a.due_date < ?",
+                         [today.isoformat(), date.fromordinal(today.toordinal() + horizon_days).isoformat()]),
+            "undated": ("a.due_date IS NULL", []),
+        }
+        with self._connect() as conn:
+            return {
+                name: conn.execute(
+                    f"SELECT COUNT(*) FROM action_items a WHERE {where} AND {condition}", (*params, *values)
+                ).fetchone()[0]
+                for name, (condition, values) in ranges.items()
+            }
+
+    def set_action_item_done(self, item_id: int, done: bool = True) -> bool:
+        """
+        Marks an action item done, or open again.
+
+        Returns:
+            False if there is no such item
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE action_items SET done_at = ? WHERE id = ?", (time.time() if done else None, item_id)
+            )
+        return cursor.rowcount > 0
+
+    def _backfill_due_dates(self) -> None:
+        """Resolves the deadlines of items indexed before due dates existed."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT a.id, a.deadline, r.date FROM action_items a
+                JOIN reports r ON r.meeting_id = a.meeting_id
+                WHERE a.deadline != ''
+                """
+            ).fetchall()
+            conn.executemany(
+                "UPDATE action_items SET due_date = ? WHERE id = ?",
+                [(_due_date(row["deadline"], parse_date(row["date"] or "")), row["id"]) for row in rows]
+            )
+
+    def facets(self) -> Dict[str, Dict[str, int]]:
+        """Returns action item counts per assignee and per priority."""
+        with self._connect() as conn:
+            assignees = conn.execute(
+                """
+                SELECT MIN(assignee) AS name, COUNT(*) AS n FROM action_items
+                WHERE assignee_key != '' GROUP BY assignee_key ORDER BY n DESC
+                """
+            ).fetchall()
+            priorities = conn.execute(
+                "SELECT priority, COUNT(*) AS n FROM action_items GROUP BY priority"
+            ).fetchall()
+        return {
+            "assignee": {row["name"]: row["n"] for row in assignees},
+            "priority": {row["priority"]: row["n"] for row in priorities}
+        }
+
+    def transcript(self, meeting_id: str) -> str:
+        """Returns the transcript saved with a report; "" if there is none."""
+        entry = self.store.get(meeting_id)
+        return self._entry_transcript(entry) if entry else self._legacy_transcript(meeting_id)
+
+    def _entry_transcript(self, entry: Dict[str, Any]) -> str:
+        """The transcript of a report store entry (or a search result)."""
+        try:
+            transcript = self.store.load_transcript(entry)
+        except (OSError, ValueError):
+            transcript = ""
+        if transcript or entry["path"].endswith(REPORT_EXTENSION):
+            return transcript
+        return self._legacy_transcript(entry["meeting_id"])
+
+    def _legacy_transcript(self, meeting_id: str) -> str:
+        # JSON reports written before the report format kept their transcript
+        # only in the search index, until migrate_reports.py moves it
+        with self._connect() as conn:
+            try:
+                row = conn.execute(
+                    "SELECT transcript FROM report_text WHERE meeting_id = ?", (meeting_id,)
+                ).fetchone()
+            except sqlite3.OperationalError:
+                return ""  # No legacy index
+        return row["transcript"] if row else ""
+
+    def drop_legacy_text(self) -> bool:
+        """
+        Drops the search table that stored full transcripts, once no JSON
+        report still needs it for its transcript.
+
+        Returns:
+            True if the table was dropped
+        """
+        with self._connect() as conn:
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'report_text'").fetchone() is None:
+                return False
+            if conn.execute(
+                "SELECT 1 FROM reports WHERE path NOT LIKE ? LIMIT 1", (f"%{REPORT_EXTENSION}",)
+            ).fetchone() is not None:
+                return False
+            conn.execute("DROP TABLE report_text")
+        # Returns the freed pages to the file system
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.execute("VACUUM")
+        finally:
+            conn.close()
+        return True
+
+    def rebuild(self) -> int:
+        """
+        Indexes every report known to the store, page by page.
+
+        Starts from an empty text index, which also drops the terms of
+        documents replaced since the last rebuild.
+
+        Returns:
+            Number of reports indexed
+        """
+        with self._connect() as conn:
+            conn.execute("DELETE FROM report_documents")
+            conn.execute("INSERT INTO report_terms (report_terms) VALUES ('delete-all')")
+        indexed = 0
+        before = None
+        while True:
+            page = self.store.list(limit=200, before=before)
+            if not page:
+                return indexed
+            for entry in page:
+                try:
+                    report = self.store.load(entry)
+                except (OSError, ValueError):
+                    continue
+                transcript = self._entry_transcript(entry)
+                if isinstance(report, dict):
+                    # Pages come newest first; ids below zero keep save order
+                    # and stay below those of reports saved meanwhile
+                    indexed += 1
+                    self._index(entry["meeting_id"], report, transcript, document_id=-indexed)
+            before = self.store.page_cursor(page)
+
+
+_default_index: Optional[ReportSearchIndex] = None
+_default_index_lock = threading.Lock()
+
+
+def get_search_index() -> ReportSearchIndex:
+    """Returns the process-wide search index over ``reports/``."""
+    global _default_index
+    with _default_index_lock:
+        if _default_index is None:
+            _default_index = ReportSearchIndex()
+        return _default_index
@@ -0,0 +1,304 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from tools.report_format import REPORT_EXTENSION, ReportFile
+
+REPORTS_DIR = "reports"
+INDEX_FILENAME = "index.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    meeting_id TEXT PRIMARY KEY,
+    session_id TEXT NOT NULL DEFAULT '',
+    title TEXT NOT NULL,
+    date TEXT NOT NULL DEFAULT '',
+    created_at REAL NOT NULL,
+    path TEXT NOT NULL,
+    attendee_count INTEGER NOT NULL DEFAULT 0,
+    topic_count INTEGER NOT NULL DEFAULT 0,
+    action_item_count INTEGER NOT NULL DEFAULT 0,
+    decision_count INTEGER NOT NULL DEFAULT 0
+);
+-- Page order; meeting_id breaks ties between reports saved in the same instant
+DROP INDEX IF EXISTS idx_reports_created;
+DROP INDEX IF EXISTS idx_reports_session_created;
+CREATE INDEX IF NOT EXISTS idx_reports_created_id ON reports (created_at, meeting_id);
+CREATE INDEX IF NOT EXISTS idx_reports_session_created_id ON reports (session_id, created_at, meeting_id);
+
+-- Running totals so counts are a primary-key lookup instead of COUNT(*)
+CREATE TABLE IF NOT EXISTS report_counts (
+    session_id TEXT PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+"""
+
+_ALL_SESSIONS = "*"
+
+
+def _metadata(report: Dict[str, Any]) -> Dict[str, Any]:
+    """Extracts the indexed columns from a parsed report."""
+    return {
+        "title": str(report.get("meeting_title") or ""),
+        "date": str(report.get("date") or ""),
+        "attendee_count": len(report.get("attendees") or []),
+        "topic_count": len(report.get("key_topics") or []),
+        "action_item_count": len(report.get("action_items") or []),
+        "decision_count": len(report.get("decisions_made") or []),
+    }
+
+
+class ReportStore:
+    """
+    SQLite index over the report files in ``reports_dir``.
+
+    Report bodies stay in their own files; the index holds the metadata the
+    UI needs, so "latest for this session", counts and listings never touch
+    the directory itself. Files are in the compact format of
+    tools.report_format; JSON files written before it are still read until
+    migrate_reports.py converts them.
+    """
+
+    def __init__(self, reports_dir: str = REPORTS_DIR, db_path: Optional[str] = None):
+        self.reports_dir = reports_dir
+        self.db_path = db_path or os.path.join(reports_dir, INDEX_FILENAME)
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+
+        is_new = not os.path.exists(self.db_path)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+        if is_new:
+            self.rebuild()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # One short-lived connection per operation keeps the store safe to
+        # share between Streamlit script threads and batch workers.
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")  # Durable enough under WAL
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def add(
+        self,
+        meeting_id: str,
+        path: str,
+        report: Dict[str, Any],
+        session_id: Optional[str] = None,
+        created_at: Optional[float] = None
+    ) -> None:
+        """
+        Indexes a saved report, replacing any previous entry for meeting_id.
+
+        Args:
+            meeting_id: Unique identifier for the meeting
+            path: Location of the report file
+            report: Parsed report body
+            session_id: Session that produced the report
+            created_at: Save time; defaults to now
+        """
+        self._index(meeting_id, path, _metadata(report), session_id, created_at)
+
+    def _index(
+        self,
+        meeting_id: str,
+        path: str,
+        metadata: Dict[str, Any],
+        session_id: Optional[str],
+        created_at: Optional[float]
+    ) -> None:
+        row = {
+            "meeting_id": meeting_id,
+            "session_id": session_id or "",
+            "created_at": created_at if created_at is not None else time.time(),
+            "path": path,
+            **{key: metadata.get(key, default) for key, default in _metadata({}).items()},
+        }
+        with self._connect() as conn:
+            previous = conn.execute(
+                "SELECT session_id FROM reports WHERE meeting_id = ?", (meeting_id,)
+            ).fetchone()
+            if previous is not None:
+                self._bump(conn, previous["session_id"], -1)
+
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO reports (
+                    meeting_id, session_id, title, date, created_at, path,
+                    attendee_count, topic_count, action_item_count, decision_count
+                ) VALUES (
+                    :meeting_id, :session_id, :title, :date, :created_at, :path,
+                    :attendee_count, :topic_count, :action_item_count, :decision_count
+                )
+                """,
+                row
+            )
+            self._bump(conn, row["session_id"], 1)
+
+    @staticmethod
+    def _bump(conn: sqlite3.Connection, session_id: str, delta: int) -> None:
+        for key in (session_id, _ALL_SESSIONS):
+            conn.execute(
+                """
+                INSERT INTO report_counts (session_id, count) VALUES (?, ?)
+                ON CONFLICT(session_id) DO UPDATE SET count = count + excluded.count
+                """,
+                (key, delta)
+            )
+
+    def get(self, meeting_id: str) -> Optional[Dict[str, Any]]:
+        """Returns the index entry of one report."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM reports WHERE meeting_id = ?", (meeting_id,)).fetchone()
+        return dict(row) if row else None
+
+    def latest(self, session_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Returns the newest index entry, optionally restricted to one session.
+
+        Args:
+            session_id: Session whose reports to consider; None for all
+
+        Returns:
+            Index entry, or None when there are no reports
+        """
+        with self._connect() as conn:
+            if session_id is None:
+                row = conn.execute(
+                    "SELECT * FROM reports ORDER BY created_at DESC, meeting_id DESC LIMIT 1"
+                ).fetchone()
+            else:
+                row = conn.execute(
+                    "SELECT * FROM reports WHERE session_id = ? ORDER BY created_at DESC, meeting_id DESC LIMIT 1",
+                    (session_id,)
+                ).fetchone()
+        return dict(row) if row else None
+
+    def count(self, session_id: Optional[str] = None) -> int:
+        """Returns the number of reports, optionally for one session."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT count FROM report_counts WHERE session_id = ?",
+                (_ALL_SESSIONS if session_id is None else session_id,)
+            ).fetchone()
+        return row["count"] if row else 0
+
+    def list(
+        self,
+        limit: int = 20,
+        before: Optional[Tuple[float, str]] = None,
+        session_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Lists index entries newest first, one page at a time.
+
+        Pages are keyed by (created_at, meeting_id) rather than OFFSET, so
+        every page is an index range scan regardless of depth, and reports
+        saved in the same instant are neither skipped nor repeated.
+
+        Args:
+            limit: Page size
+            before: (created_at, meeting_id) of the last entry of the
+                previous page; see page_cursor
+            session_id: Restrict to one session
+
+        Returns:
+            Index entries of the page
+        """
+        clauses, params = [], []
+        if session_id is not None:
+            clauses.append("session_id = ?")
+            params.append(session_id)
+        if before is not None:
+            clauses.append("(created_at, meeting_id) < (?, ?)")
+            params.extend(before)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT * FROM reports {where} ORDER BY created_at DESC, meeting_id DESC LIMIT ?",
+                (*params, limit)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    @staticmethod
+    def page_cursor(page: List[Dict[str, Any]]) -> Tuple[float, str]:
+        """Returns the ``before`` cursor of the page after this one."""
+        return page[-1]["created_at"], page[-1]["meeting_id"]
+
+    def open(self, entry: Dict[str, Any]) -> Optional[ReportFile]:
+        """Opens the report file of an index entry lazily; None for legacy JSON files."""
+        if entry["path"].endswith(REPORT_EXTENSION):
+            return ReportFile(entry["path"])
+        return None
+
+    def load(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Reads the full report body of an index entry (without its transcript)."""
+        report_file = self.open(entry)
+        if report_file is not None:
+            return report_file.report().model_dump()
+        with open(entry["path"], 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def load_transcript(self, entry: Dict[str, Any]) -> str:
+        """Reads the stored transcript of an index entry; "" when none was kept."""
+        report_file = self.open(entry)
+        return report_file.transcript() if report_file is not None else ""
+
+    def rebuild(self) -> int:
+        """
+        Re-indexes every report file in ``reports_dir``.
+
+        Only needed once, to adopt reports written before the index existed.
+        Compact files are indexed from their headers alone.
+
+        Returns:
+            Number of reports indexed
+        """
+        if not os.path.isdir(self.reports_dir):
+            return 0
+
+        indexed = 0
+        for name in sorted(os.listdir(self.reports_dir)):
+            path = os.path.join(self.reports_dir, name)
+            meeting_id, extension = os.path.splitext(name)
+            try:
+                if extension == REPORT_EXTENSION:
+                    header = ReportFile(path).metadata
+                    self._index(meeting_id, os.path.abspath(path), header,
+                                header.get("session_id"), header.get("created_at"))
+                elif extension == '.json':
+                    if os.path.exists(os.path.join(self.reports_dir, meeting_id + REPORT_EXTENSION)):
+                        continue  # Already migrated
+                    with open(path, 'r', encoding='utf-8') as f:
+                        report = json.load(f)
+                    if not isinstance(report, dict):
+                        continue
+                    self.add(meeting_id, os.path.abspath(path), report, created_at=os.path.getmtime(path))
+                else:
+                    continue
+            except (OSError, ValueError):
+                continue
+            indexed += 1
+        return indexed
+
+
+_default_store: Optional[ReportStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_report_store() -> ReportStore:
+    """Returns the process-wide store over ``reports/``."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = ReportStore()
+        return _default_store
@@ -1,8 +1,7 @@
-from google.cloud import storage
-import json
 from typing import Dict
 import os
-from datetime import timedelta
+from tools.gcs_uploader import ERROR, UPLOADED, UploadItem, get_uploader
+
 
 def save_report_to_storage(
     report_json: str,
@@ -10,46 +9,36 @@ def save_report_to_storage(
 ) -> Dict[str, str]:
     """
     Saves meeting report to Google Cloud Storage.
-    
+
+    The upload is skipped when the bucket already holds the same report,
+    and the signed URL (valid for 7 days) is reused while it is fresh.
+
     Args:
         report_json: JSON string of the meeting report
         meeting_id: Unique identifier for the meeting
-        
+
     Returns:
         Dictionary with storage status and URL
     """
     try:
-        bucket_name = os.getenv('GCS_BUCKET_NAME')
-        
-        # Initialize storage client
-        storage_client = storage.Client()
-        bucket = storage_client.bucket(bucket_name)
-        
-        # Create blob (file) in bucket
-        blob_name = f"reports/{meeting_id}.json"
-        blob = bucket.blob(blob_name)
-        
-        # Upload the report
-        blob.upload_from_string(
-            report_json,
-            content_type='application/json'
-        )
-        
-        # Generate signed URL (valid for 7 days) - works with uniform access
-        url = blob.generate_signed_url(
-            version="v4",
-            expiration=timedelta(days=7),
-            method="GET"
-        )
-        
+        uploader = get_uploader(os.getenv('GCS_BUCKET_NAME'))
+        [result] = uploader.upload_many([
+            UploadItem(f"reports/{meeting_id}.json", data=report_json.encode("utf-8"), content_type='application/json')
+        ])
+        if result["status"] == ERROR or not result["url"]:
+            return {
+                "status": "error",
+                "error_message": result.get("error_message", "Upload failed")
+            }
+
         return {
             "status": "success",
-            "message": f"Report saved successfully",
-            "url": url
+            "message": "Report saved successfully" if result["status"] == UPLOADED else "Report already saved",
+            "url": result["url"]
         }
-        
+
     except Exception as e:
         return {
             "status": "error",
             "error_message": str(e)
-        }
\ No newline at end of file
+        }
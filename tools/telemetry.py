@@ -0,0 +1,513 @@
+"""
+Spans and metrics for every stage of the meeting pipeline.
+
+Finished spans, stage-latency histograms and counters (tokens, audio
+seconds) are recorded in a SQLite file shared by the app, the workers
+and batch runs, so any process can show or export the totals of all of
+them. Spans can additionally be appended to a file as OTLP/JSON lines.
+
+Serve the Prometheus text format with:
+    python -m tools.telemetry --port 9464
+"""
+import argparse
+import asyncio
+import contextvars
+import functools
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from google.adk.plugins import BasePlugin
+
+TELEMETRY_PATH = ".telemetry/telemetry.db"
+# When set, every finished span is also appended to this file as OTLP/JSON
+SPANS_FILE_ENV = "OTLP_SPANS_FILE"
+SERVICE_NAME = "lecturelink"
+
+RETAIN_SPANS = 20000
+PRUNE_EVERY = 500
+
+# Upper bounds (seconds) of the stage latency histogram buckets
+BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS spans (
+    id INTEGER PRIMARY KEY,
+    trace_id TEXT NOT NULL,
+    span_id TEXT NOT NULL,
+    parent_id TEXT,
+    name TEXT NOT NULL,
+    start REAL NOT NULL,
+    duration REAL NOT NULL,
+    status TEXT NOT NULL,
+    attributes TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_spans_start ON spans (start);
+
+CREATE TABLE IF NOT EXISTS histograms (
+    name TEXT NOT NULL,
+    le TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (name, le)
+);
+
+CREATE TABLE IF NOT EXISTS histogram_totals (
+    name TEXT PRIMARY KEY,
+    count INTEGER NOT NULL,
+    sum REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS counters (
+    metric TEXT NOT NULL,
+    labels TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (metric, labels)
+);
+"""
+
+
+class Span:
+    """One timed operation; attributes end up in the span store and exports."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start", "duration",
+                 "status", "attributes", "_started")
+
+    def __init__(self, name: str, parent: Optional["Span"] = None, **attributes: Any):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.start = time.time()
+        self.duration = 0.0
+        self.status = "ok"
+        self.attributes: Dict[str, Any] = dict(attributes)
+        self._started = time.perf_counter()
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+
+_current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("telemetry_span", default=None)
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def _attribute_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Telemetry:
+    """
+    SQLite-backed span and metric store shared between processes.
+
+    Each finished span costs one short transaction; spans are coarse
+    (stages, agent and model calls, tools, writes), so this stays far
+    below the cost of the work being measured.
+    """
+
+    def __init__(self, path: str = TELEMETRY_PATH, spans_file: Optional[str] = None):
+        self.path = path
+        self.spans_file = spans_file if spans_file is not None else os.getenv(SPANS_FILE_ENV)
+        self._recorded = 0
+        self._file_lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def record(self, span: Span) -> None:
+        """Stores a finished span and adds it to its stage histogram."""
+        buckets = [(span.name, str(le)) for le in BUCKETS if span.duration <= le] + [(span.name, "+Inf")]
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO spans (trace_id, span_id, parent_id, name, start, duration, status, attributes)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (span.trace_id, span.span_id, span.parent_id, span.name, span.start,
+                 span.duration, span.status, json.dumps(span.attributes, default=str))
+            )
+            conn.executemany(
+                """
+                INSERT INTO histograms (name, le, count) VALUES (?, ?, 1)
+                ON CONFLICT(name, le) DO UPDATE SET count = count + 1
+                """,
+                buckets
+            )
+            conn.execute(
+                """
+                INSERT INTO histogram_totals (name, count, sum) VALUES (?, 1, ?)
+                ON CONFLICT(name) DO UPDATE SET count = count + 1, sum = sum + excluded.sum
+                """,
+                (span.name, span.duration)
+            )
+            self._recorded += 1
+            if self._recorded % PRUNE_EVERY == 0:
+                conn.execute(
+                    "DELETE FROM spans WHERE id <= (SELECT MAX(id) FROM spans) - ?", (RETAIN_SPANS,)
+                )
+        if self.spans_file:
+            self._export(span)
+
+    def _export(self, span: Span) -> None:
+        line = json.dumps({"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{
+                "scope": {"name": "tools.telemetry"},
+                "spans": [{
+                    "traceId": span.trace_id,
+                    "spanId": span.span_id,
+                    "parentSpanId": span.parent_id or "",
+                    "name": span.name,
+                    "startTimeUnixNano": str(int(span.start * 1e9)),
+                    "endTimeUnixNano": str(int((span.start + span.duration) * 1e9)),
+                    "attributes": [{"key": k, "value": _attribute_value(v)} for k, v in span.attributes.items()],
+                    "status": {"code": 1 if span.status == "ok" else 2},
+                }]
+            }]
+        }]})
+        with self._file_lock, open(self.spans_file, 'a', encoding='utf-8') as f:
+            f.write(line + "\n")
+
+    def add(self, metric: str, value: float, **labels: Any) -> None:
+        """Adds value to a counter, e.g. add("tokens_total", 120, kind="prompt")."""
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO counters (metric, labels, value) VALUES (?, ?, ?)
+                ON CONFLICT(metric, labels) DO UPDATE SET value = value + excluded.value
+                """,
+                (metric, json.dumps(labels, sort_keys=True), value)
+            )
+
+    def stage_stats(self, since_seconds: float = 3600) -> Dict[str, Dict[str, float]]:
+        """
+        Latency summary per span name over a recent window.
+
+        Args:
+            since_seconds: How far back to look
+
+        Returns:
+            count, p50, p95, last (seconds) and errors per span name
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT name, duration, status FROM spans WHERE start >= ? ORDER BY start",
+                (time.time() - since_seconds,)
+            ).fetchall()
+        by_name: Dict[str, List[sqlite3.Row]] = {}
+        for row in rows:
+            by_name.setdefault(row["name"], []).append(row)
+
+        stats = {}
+        for name, spans in by_name.items():
+            ordered = sorted(row["duration"] for row in spans)
+            stats[name] = {
+                "count": len(spans),
+                "p50": _percentile(ordered, 0.50),
+                "p95": _percentile(ordered, 0.95),
+                "last": spans[-1]["duration"],
+                "errors": sum(row["status"] != "ok" for row in spans),
+            }
+        return stats
+
+    def counters(self) -> Dict[str, Dict[str, float]]:
+        """Returns every counter as {metric: {labels json: value}}."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT metric, labels, value FROM counters").fetchall()
+        totals: Dict[str, Dict[str, float]] = {}
+        for row in rows:
+            totals.setdefault(row["metric"], {})[row["labels"]] = row["value"]
+        return totals
+
+    def render_prometheus(self) -> str:
+        """Renders histograms and counters in the Prometheus text format."""
+        with self._connect() as conn:
+            buckets = conn.execute("SELECT name, le, count FROM histograms").fetchall()
+            totals = conn.execute("SELECT name, count, sum FROM histogram_totals ORDER BY name").fetchall()
+            counters = conn.execute("SELECT metric, labels, value FROM counters ORDER BY metric").fetchall()
+
+        def escape(value: Any) -> str:
+            return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+        counts = {(row["name"], row["le"]): row["count"] for row in buckets}
+        lines = [
+            "# HELP lecturelink_stage_seconds Duration of pipeline stages",
+            "# TYPE lecturelink_stage_seconds histogram",
+        ]
+        for total in totals:
+            stage = escape(total["name"])
+            for le in [str(le) for le in BUCKETS] + ["+Inf"]:
+                lines.append(f'lecturelink_stage_seconds_bucket{{stage="{stage}",le="{le}"}} '
+                             f'{counts.get((total["name"], le), 0)}')
+            lines.append(f'lecturelink_stage_seconds_sum{{stage="{stage}"}} {total["sum"]}')
+            lines.append(f'lecturelink_stage_seconds_count{{stage="{stage}"}} {total["count"]}')
+
+        typed = set()
+        for row in counters:
+            metric = f"lecturelink_{row['metric']}"
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} counter")
+                typed.add(metric)
+            labels = ",".join(f'{k}="{escape(v)}"' for k, v in json.loads(row["labels"]).items())
+            lines.append(f"{metric}{{{labels}}} {row['value']}" if labels else f"{metric} {row['value']}")
+        return "\n".join(lines) + "\n"
+
+
+_default_telemetry: Optional[Telemetry] = None
+_default_telemetry_lock = threading.Lock()
+
+
+def get_telemetry() -> Telemetry:
+    """Returns the process-wide telemetry store."""
+    global _default_telemetry
+    with _default_telemetry_lock:
+        if _default_telemetry is None:
+            _default_telemetry = Telemetry()
+        return _default_telemetry
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def annotate(**attributes: Any) -> None:
+    """Sets attributes on the current span, if there is one."""
+    active = _current.get()
+    if active is not None:
+        active.set(**attributes)
+
+
+def count(metric: str, value: float, **labels: Any) -> None:
+    """Adds value to a counter of the process-wide store."""
+    try:
+        get_telemetry().add(metric, value, **labels)
+    except sqlite3.Error:
+        pass  # Metrics must never break the pipeline
+
+
+def start_span(name: str, parent: Optional[Span] = None, **attributes: Any) -> Span:
+    """Starts a span without making it current (for callback pairs)."""
+    return Span(name, parent if parent is not None else _current.get(), **attributes)
+
+
+def end_span(active: Span, error: Optional[BaseException] = None) -> None:
+    """Finishes and records a span started with start_span."""
+    active.duration = time.perf_counter() - active._started
+    if error is not None:
+        active.status = "error"
+        active.attributes.setdefault("error", f"{type(error).__name__}: {error}")
+    try:
+        get_telemetry().record(active)
+    except (sqlite3.Error, OSError):
+        pass  # Metrics must never break the pipeline
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span]:
+    """
+    Times a block as a child of the current span.
+
+    Args:
+        name: Stage name, e.g. "transcribe" or "gcs.upload"
+        **attributes: Initial span attributes
+
+    Yields:
+        The span, whose attributes can still be set inside the block
+    """
+    active = start_span(name, **attributes)
+    token = _current.set(active)
+    try:
+        yield active
+    except BaseException as e:
+        _current.reset(token)
+        end_span(active, e)
+        raise
+    _current.reset(token)
+    end_span(active)
+
+
+def _mark_result(active: Span, result: Any) -> None:
+    # Tool functions report failures as {"status": "error"} instead of raising
+    if isinstance(result, dict) and result.get("status") == "error":
+        active.status = "error"
+        active.set(error=result.get("error_message", ""))
+
+
+def traced(name: str) -> Callable:
+    """Decorator that runs a (sync or async) function inside span(name)."""
+    def decorator(function: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                with span(name) as active:
+                    result = await function(*args, **kwargs)
+                    _mark_result(active, result)
+                    return result
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(name) as active:
+                result = function(*args, **kwargs)
+                _mark_result(active, result)
+                return result
+        return wrapper
+    return decorator
+
+
+class TelemetryPlugin(BasePlugin):
+    """
+    ADK runner plugin recording a span per agent run, model call and tool
+    call, with model token usage.
+
+    Agent spans are children of their parent agent's span, or of the span
+    current when run_async was called; model and tool spans are children
+    of their agent's span.
+    """
+
+    def __init__(self):
+        super().__init__(name="telemetry")
+        self._spans: Dict[tuple, Span] = {}
+
+    async def before_agent_callback(self, *, agent, callback_context):
+        parent = agent.parent_agent
+        self._spans[(callback_context.invocation_id, agent.name)] = start_span(
+            f"agent.{agent.name}",
+            self._spans.get((callback_context.invocation_id, parent.name)) if parent else None,
+            agent=agent.name
+        )
+        return None
+
+    async def after_agent_callback(self, *, agent, callback_context):
+        active = self._spans.pop((callback_context.invocation_id, agent.name), None)
+        if active is not None:
+            end_span(active)
+        return None
+
+    async def before_model_callback(self, *, callback_context, llm_request):
+        agent = callback_context.agent_name
+        self._spans[(callback_context.invocation_id, agent, "model")] = start_span(
+            f"model.{agent}",
+            self._spans.get((callback_context.invocation_id, agent)),
+            agent=agent,
+            model=llm_request.model or ""
+        )
+        return None
+
+    async def after_model_callback(self, *, callback_context, llm_response):
+        if llm_response.partial:
+            return None
+        agent = callback_context.agent_name
+        active = self._spans.pop((callback_context.invocation_id, agent, "model"), None)
+        usage = llm_response.usage_metadata
+        if usage is not None:
+            prompt, output = usage.prompt_token_count or 0, usage.candidates_token_count or 0
+            count("tokens_total", prompt, agent=agent, kind="prompt")
+            count("tokens_total", output, agent=agent, kind="output")
+            if active is not None:
+                active.set(prompt_tokens=prompt, output_tokens=output)
+        if active is not None:
+            end_span(active)
+        return None
+
+    async def on_model_error_callback(self, *, callback_context, llm_request, error):
+        active = self._spans.pop((callback_context.invocation_id, callback_context.agent_name, "model"), None)
+        if active is not None:
+            end_span(active, error)
+        return None
+
+    async def before_tool_callback(self, *, tool, tool_args, tool_context):
+        self._spans[(tool_context.invocation_id, tool_context.function_call_id)] = start_span(
+            f"tool.{tool.name}",
+            self._spans.get((tool_context.invocation_id, tool_context.agent_name)),
+            tool=tool.name
+        )
+        return None
+
+    async def after_tool_callback(self, *, tool, tool_args, tool_context, result):
+        active = self._spans.pop((tool_context.invocation_id, tool_context.function_call_id), None)
+        if active is not None:
+            _mark_result(active, result)
+            end_span(active)
+        return None
+
+    async def on_tool_error_callback(self, *, tool, tool_args, tool_context, error):
+        active = self._spans.pop((tool_context.invocation_id, tool_context.function_call_id), None)
+        if active is not None:
+            end_span(active, error)
+        return None
+
+
+def serve_metrics(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    Serves GET /metrics in the Prometheus text format on a daemon thread.
+
+    Args:
+        port: Port to listen on
+        host: Interface to bind
+
+    Returns:
+        The running server (call shutdown() to stop it)
+    """
+    telemetry = get_telemetry()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = telemetry.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=9464)
+    parser.add_argument("--host", default="127.0.0.1")
+    args = parser.parse_args()
+
+    serve_metrics(args.port, args.host)
+    print(f"Serving metrics on http://{args.host}:{args.port}/metrics")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
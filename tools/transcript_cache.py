@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+from tools.telemetry import count
+
+CACHE_DIR = ".cache/transcripts"
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+MAX_AGE_SECONDS = 30 * 24 * 3600
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def hash_audio(audio_file_path: str, params: Dict[str, Any]) -> str:
+    """
+    Builds a content address for a recording and its recognition settings.
+
+    The file is hashed in fixed-size chunks so large recordings are never
+    held in memory.
+
+    Args:
+        audio_file_path: Path to the audio file
+        params: Recognition settings that influence the transcript
+
+    Returns:
+        Hex digest identifying the (audio, settings) pair
+    """
+    digest = hashlib.sha256()
+    with open(audio_file_path, 'rb') as audio_file:
+        for chunk in iter(lambda: audio_file.read(HASH_CHUNK_BYTES), b''):
+            digest.update(chunk)
+    digest.update(json.dumps(params, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class TranscriptCache:
+    """
+    Disk-backed transcript cache with size- and age-based LRU eviction.
+
+    Each entry is one JSON file named after its key; the file modification
+    time doubles as the last-access time, so no separate index is kept.
+    Hits, misses and the audio bytes hits saved go to the telemetry
+    counters, which add up across worker processes.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = CACHE_DIR,
+        max_bytes: int = MAX_CACHE_BYTES,
+        max_age_seconds: float = MAX_AGE_SECONDS
+    ):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Looks up a transcription result.
+
+        Args:
+            key: Digest returned by hash_audio
+
+        Returns:
+            The cached result, or None on a miss or expired entry
+        """
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age_seconds:
+                os.remove(path)
+                raise FileNotFoundError(path)
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            os.utime(path)  # Mark as recently used
+        except (OSError, ValueError):
+            count("transcript_cache_misses_total", 1)
+            return None
+
+        count("transcript_cache_hits_total", 1)
+        count("transcript_cache_bytes_saved_total", entry.get('audio_bytes', 0))
+        return entry['result']
+
+    def put(self, key: str, result: Dict[str, Any], audio_bytes: int) -> None:
+        """
+        Stores a successful transcription result and enforces the limits.
+
+        Args:
+            key: Digest returned by hash_audio
+            result: Result dictionary from transcribe_audio
+            audio_bytes: Size of the recording, credited on later hits
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"result": result, "audio_bytes": audio_bytes}, f)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self) -> None:
+        """Removes expired entries, then least recently used ones over max_bytes."""
+        now = time.time()
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if not entry.name.endswith('.json'):
+                    continue
+                stat = entry.stat()
+                if now - stat.st_mtime > self.max_age_seconds:
+                    self._remove(entry.path)
+                else:
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+_default_cache: Optional[TranscriptCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_transcript_cache() -> TranscriptCache:
+    """Returns the process-wide cache used by transcribe_audio."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = TranscriptCache()
+        return _default_cache
@@ -1,54 +1,509 @@
 from google.cloud import speech_v1p1beta1 as speech
 from google.cloud import storage
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, as_completed, wait
+import contextvars
 import os
-from typing import Dict
+import re
+import wave
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional
+from tools.audio_preprocessing import PREPROCESS_VERSION, TARGET_SAMPLE_RATE, PreparedAudio, preprocess_audio
+from tools.clients import CONNECTION_ERRORS, SPEECH, get_client, get_client_registry
+from tools.diarization import DiarizedWords, TurnFormatter, Word, diarization_config, format_turns
+from tools.rate_limit import call_with_retry
+from tools.telemetry import annotate, count, traced
+from tools.transcript_cache import TranscriptCache, get_transcript_cache, hash_audio
 
-def transcribe_audio(audio_file_path: str) -> Dict[str, str]:
+# Synchronous recognize() rejects requests longer than about one minute of
+# audio, so recordings are cut into overlapping segments that stay under it.
+SEGMENT_SECONDS = 50.0
+OVERLAP_SECONDS = 4.0
+MAX_WORKERS = 4
+
+# Headerless uploads are treated as LINEAR16 mono at this rate
+DEFAULT_SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+
+# Shortest run of identical words accepted as the seam between two segments
+MIN_OVERLAP_MATCH = 2
+
+
+class AudioFormat(NamedTuple):
+    """PCM layout of an audio file on disk."""
+    sample_rate: int
+    channels: int
+    sample_width: int
+    frame_count: int
+    data_offset: Optional[int]  # None when frames are read through ``wave``
+
+    @property
+    def duration_seconds(self) -> float:
+        return self.frame_count / float(self.sample_rate)
+
+
+class AudioSegment(NamedTuple):
+    """A slice of the recording handed to a single recognize() call."""
+    index: int
+    start_seconds: float
+    content: bytes
+
+
+def probe_audio(audio_file_path: str) -> AudioFormat:
     """
-    Transcribes audio file using Google Speech-to-Text.
-    
+    Reads the PCM layout of a WAV file, or assumes raw LINEAR16 otherwise.
+
     Args:
         audio_file_path: Path to the audio file
-        
+
     Returns:
-        Dictionary with transcript and status
+        AudioFormat describing sample rate, channels and length
     """
     try:
-        # Initialize Speech client
-        client = speech.SpeechClient()
-        
-        # Read audio file
-        with open(audio_file_path, 'rb') as audio_file:
-            content = audio_file.read()
-        
-        # Configure audio
-        audio = speech.RecognitionAudio(content=content)
-        
-        config = speech.RecognitionConfig(
-            encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
-            sample_rate_hertz=16000,
-            language_code="en-US",
-            enable_automatic_punctuation=True,
-            enable_speaker_diarization=True,  # Identifies different speakers
-            diarization_speaker_count=2,  # Adjust based on your needs
+        with wave.open(audio_file_path, 'rb') as reader:
+            return AudioFormat(
+                sample_rate=reader.getframerate(),
+                channels=reader.getnchannels(),
+                sample_width=reader.getsampwidth(),
+                frame_count=reader.getnframes(),
+                data_offset=None
+            )
+    except (wave.Error, EOFError):
+        size = os.path.getsize(audio_file_path)
+        return AudioFormat(
+            sample_rate=DEFAULT_SAMPLE_RATE,
+            channels=1,
+            sample_width=SAMPLE_WIDTH,
+            frame_count=size // SAMPLE_WIDTH,
+            data_offset=0
         )
-        
-        # Perform transcription
-        response = client.recognize(config=config, audio=audio)
-        
-        # Extract transcript
-        transcript = ""
-        for result in response.results:
-            transcript += result.alternatives[0].transcript + " "
-        
-        return {
+
+
+def iter_segments(
+    audio_file_path: str,
+    audio_format: AudioFormat,
+    segment_seconds: float = SEGMENT_SECONDS,
+    overlap_seconds: float = OVERLAP_SECONDS
+) -> Iterator[AudioSegment]:
+    """
+    Yields overlapping segments read lazily from disk, one at a time.
+
+    Args:
+        audio_file_path: Path to the audio file
+        audio_format: Layout returned by probe_audio
+        segment_seconds: Length of each segment
+        overlap_seconds: Audio shared by consecutive segments
+
+    Yields:
+        AudioSegment objects in recording order
+    """
+    if not 0 <= overlap_seconds < segment_seconds:
+        raise ValueError("overlap_seconds must be smaller than segment_seconds")
+
+    rate = audio_format.sample_rate
+    total = audio_format.frame_count
+    length = max(1, int(segment_seconds * rate))
+    step = max(1, int((segment_seconds - overlap_seconds) * rate))
+    frame_bytes = audio_format.channels * audio_format.sample_width
+
+    if audio_format.data_offset is None:
+        reader = wave.open(audio_file_path, 'rb')
+    else:
+        reader = open(audio_file_path, 'rb')
+
+    with reader:
+        start = 0
+        index = 0
+        while True:
+            if audio_format.data_offset is None:
+                reader.setpos(start)
+                content = reader.readframes(length)
+            else:
+                reader.seek(audio_format.data_offset + start * frame_bytes)
+                content = reader.read(length * frame_bytes)
+
+            yield AudioSegment(index, start / float(rate), content)
+
+            if start + length >= total:
+                break
+            start += step
+            index += 1
+
+
+def _offset_seconds(value: Any) -> Optional[float]:
+    """Converts a proto Duration or timedelta to seconds."""
+    if value is None:
+        return None
+    if hasattr(value, 'total_seconds'):
+        return value.total_seconds()
+    return value.seconds + value.nanos / 1e9
+
+
+def _extract_words(response: Any, start_seconds: float) -> List[Word]:
+    """Flattens a recognize() response into words with absolute offsets."""
+    results = [r for r in response.results if r.alternatives]
+    if not results:
+        return []
+
+    # With diarization on, the final result repeats every word of the request
+    # together with its speaker tag, so it supersedes the earlier results.
+    last_words = list(results[-1].alternatives[0].words)
+    if any(getattr(w, 'speaker_tag', 0) for w in last_words):
+        results = results[-1:]
+
+    words = []
+    for result in results:
+        alternative = result.alternatives[0]
+        if not alternative.words:
+            words.extend(Word(text, 0, None, None) for text in alternative.transcript.split())
+            continue
+        for info in alternative.words:
+            start = _offset_seconds(getattr(info, 'start_time', None))
+            end = _offset_seconds(getattr(info, 'end_time', None))
+            words.append(Word(
+                text=info.word,
+                speaker=getattr(info, 'speaker_tag', 0) or 0,
+                start=start + start_seconds if start is not None else None,
+                end=end + start_seconds if end is not None else None
+            ))
+    return words
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"[^\w']", "", text.lower())
+
+
+def _longest_common_run(left: List[str], right: List[str]) -> tuple:
+    """Returns (length, left_end, right_end) of the longest shared word run."""
+    best = (0, 0, 0)
+    previous = [0] * (len(right) + 1)
+    for i in range(1, len(left) + 1):
+        current = [0] * (len(right) + 1)
+        for j in range(1, len(right) + 1):
+            if left[i - 1] and left[i - 1] == right[j - 1]:
+                current[j] = previous[j - 1] + 1
+                if current[j] > best[0]:
+                    best = (current[j], i, j)
+        previous = current
+    return best
+
+
+class SegmentStitcher:
+    """
+    Joins per-segment words, removing duplicates where segments overlap.
+
+    Segments are added one at a time, in order, so a transcript can grow
+    while later audio is still being recognized. Adding a segment only
+    rewrites the last ``window_words`` words, so everything before them
+    (``stable_count``) is final.
+
+    The seam is the longest run of identical words shared by the tail of the
+    stitched text and the head of the next segment. When the overlap holds no
+    common run (silence, or a recognizer without word text agreement), words
+    are cut at the middle of the overlap using their timestamps.
+
+    Speaker tags are local to each recognize() call, so tags of the next
+    segment are mapped onto the running ones by majority vote over the
+    matched words. Tags not seen in the overlap take a known speaker that
+    no other tag of the segment maps to, and only then a new one.
+    """
+
+    def __init__(self, overlap_seconds: float = OVERLAP_SECONDS, window_words: int = 60):
+        self.overlap_seconds = overlap_seconds
+        self.window_words = window_words
+        self.words: List[Word] = []
+        self.speakers = set()
+
+    @property
+    def stable_count(self) -> int:
+        """Number of leading words no later segment can change."""
+        return max(0, len(self.words) - self.window_words)
+
+    def add(self, words: List[Word], start_seconds: float, overlap_seconds: Optional[float] = None) -> None:
+        """
+        Appends the next segment.
+
+        Args:
+            words: Words of the segment, with absolute offsets
+            start_seconds: Absolute start time of the segment
+            overlap_seconds: Audio this segment shares with the previous
+                one, when it differs from the stitcher's default; 0 means
+                the segments only touch and nothing is deduplicated
+        """
+        overlap_seconds = self.overlap_seconds if overlap_seconds is None else overlap_seconds
+        stitched = self.words
+        pairs = []
+        if stitched and words and overlap_seconds > 0:
+            tail_start = max(0, len(stitched) - self.window_words)
+            tail = [_normalize(w.text) for w in stitched[tail_start:]]
+            head = [_normalize(w.text) for w in words[:self.window_words]]
+            length, tail_end, head_end = _longest_common_run(tail, head)
+
+            if length >= MIN_OVERLAP_MATCH:
+                cut = tail_start + tail_end
+                pairs = list(zip(stitched[cut - length:cut], words[head_end - length:head_end]))
+                del stitched[cut:]
+                words = words[head_end:]
+            else:
+                seam = start_seconds + overlap_seconds / 2.0
+                if all(w.start is not None for w in words):
+                    while stitched and stitched[-1].start is not None and stitched[-1].start >= seam:
+                        stitched.pop()
+                    words = [w for w in words if w.start >= seam]
+
+        votes: Dict[int, Dict[int, int]] = {}
+        for kept, new in pairs:
+            if kept.speaker and new.speaker:
+                votes.setdefault(new.speaker, {}).setdefault(kept.speaker, 0)
+                votes[new.speaker][kept.speaker] += 1
+        mapping = {local: max(counts, key=counts.get) for local, counts in votes.items()}
+
+        for word in words:
+            speaker = word.speaker
+            if speaker:
+                if speaker not in mapping:
+                    free = sorted(self.speakers - set(mapping.values()))
+                    if not self.speakers:
+                        mapping[speaker] = speaker
+                    elif free:
+                        mapping[speaker] = free[0]
+                    else:
+                        mapping[speaker] = max(self.speakers) + 1
+                speaker = mapping[speaker]
+                self.speakers.add(speaker)
+            stitched.append(word._replace(speaker=speaker))
+
+
+def stitch_segments(
+    segment_words: List[List[Word]],
+    segment_starts: List[float],
+    overlap_seconds: float = OVERLAP_SECONDS,
+    window_words: int = 60
+) -> List[Word]:
+    """
+    Joins the words of all segments of a recording; see SegmentStitcher.
+
+    Args:
+        segment_words: Words of each segment, in order
+        segment_starts: Absolute start time of each segment
+        overlap_seconds: Audio shared by consecutive segments
+        window_words: How many words on each side of a seam are compared
+
+    Returns:
+        Stitched list of words with globally consistent speaker tags
+    """
+    stitcher = SegmentStitcher(overlap_seconds, window_words)
+    for words, start_seconds in zip(segment_words, segment_starts):
+        stitcher.add(words, start_seconds)
+    return stitcher.words
+
+
+def recognition_params(sample_rate: int, channels: int = 1, attendees: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Speech-to-Text settings for LINEAR16 audio, shared by file and live transcription.
+
+    The expected number of speakers comes from the attendee list.
+    """
+    return dict(
+        encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
+        sample_rate_hertz=sample_rate,
+        audio_channel_count=channels,
+        language_code="en-US",
+        enable_automatic_punctuation=True,
+        enable_word_time_offsets=True,  # Needed to stitch segment seams
+        diarization_config=diarization_config(attendees),  # Identifies different speakers
+    )
+
+
+@traced("speech.recognize")
+def recognize_segment(recognizer: Any, config: Any, segment: AudioSegment) -> tuple:
+    audio = speech.RecognitionAudio(content=segment.content)
+    response = call_with_retry(SPEECH, recognizer.recognize, config=config, audio=audio)
+    return segment.index, _extract_words(response, segment.start_seconds)
+
+
+@traced("transcribe")
+def transcribe_audio(
+    audio_file_path: str,
+    recognizer: Optional[Any] = None,
+    segment_seconds: float = SEGMENT_SECONDS,
+    overlap_seconds: float = OVERLAP_SECONDS,
+    max_workers: int = MAX_WORKERS,
+    use_cache: bool = True,
+    cache: Optional[TranscriptCache] = None,
+    on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    preprocess: bool = True,
+    attendees: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Transcribes audio file using Google Speech-to-Text.
+
+    By default the recording is first decoded (any format ffmpeg reads),
+    resampled to 16 kHz mono and stripped of long silences by
+    preprocess_audio, so only speech is billed. Word offsets are mapped
+    back onto the original recording.
+
+    The audio is split into overlapping segments streamed off disk and
+    recognized concurrently by a bounded worker pool; at most ``max_workers``
+    segments are held in memory at any time. Every request goes through the
+    shared Speech-to-Text rate limiter and is retried on quota and transient
+    errors. The segment texts are then stitched back in order.
+
+    Speakers are diarized, expecting at most one per attendee, and the
+    transcript is written one speaker turn per line ("Speaker 1: ...").
+
+    Results are cached by a hash of the audio bytes and recognition settings,
+    so re-analyzing a recording skips Speech-to-Text entirely.
+
+    Args:
+        audio_file_path: Path to the audio file
+        recognizer: Object exposing recognize(config=, audio=); defaults to
+            the shared speech.SpeechClient from the client registry
+        segment_seconds: Length of each recognize() request
+        overlap_seconds: Audio shared by consecutive segments
+        max_workers: Maximum concurrent recognize() requests
+        use_cache: Whether to read and populate the transcript cache
+        cache: Cache to use instead of the process-wide one
+        on_progress: Called on the calling thread after each segment with
+            audio_seconds_done, audio_seconds and partial_transcript (the
+            stitched text of the finished segments from the start)
+        preprocess: Decode, resample and trim silence before recognition;
+            when False the file must already be WAV or raw LINEAR16
+        attendees: Attendee names, which bound the number of speakers
+
+    Returns:
+        Dictionary with the turn-segmented transcript, the words as
+        DiarizedWords.to_dict() and status
+    """
+    prepared: Optional[PreparedAudio] = None
+    try:
+        if preprocess:
+            sample_rate, channels = TARGET_SAMPLE_RATE, 1
+        else:
+            audio_format = probe_audio(audio_file_path)
+            sample_rate, channels = audio_format.sample_rate, audio_format.channels
+
+        params = recognition_params(sample_rate, channels, attendees)
+
+        if use_cache:
+            cache = cache if cache is not None else get_transcript_cache()
+            cache_key = hash_audio(audio_file_path, {
+                **params,
+                "segment_seconds": segment_seconds,
+                "overlap_seconds": overlap_seconds,
+                **({"preprocess": PREPROCESS_VERSION} if preprocess else {})
+            })
+            cached = cache.get(cache_key)
+            if cached is not None:
+                annotate(cached=True, audio_seconds=cached.get("audio_seconds", 0.0))
+                return {**cached, "cached": True}
+
+        if preprocess:
+            prepared = preprocess_audio(audio_file_path, sample_rate)
+            recognized_path = prepared.path
+            audio_format = probe_audio(recognized_path)
+            source_seconds = prepared.source_seconds
+        else:
+            recognized_path = audio_file_path
+            source_seconds = audio_format.duration_seconds
+
+        # Progress is reported against the original recording
+        progress_scale = source_seconds / audio_format.duration_seconds if audio_format.duration_seconds else 1.0
+
+        # Reuse the process-wide Speech client
+        client = recognizer if recognizer is not None else get_client(SPEECH)
+        config = speech.RecognitionConfig(**params)
+
+        segments = iter_segments(recognized_path, audio_format, segment_seconds, overlap_seconds)
+        if audio_format.frame_count == 0:
+            segments = iter(())  # Nothing but silence
+
+        # Transcribe segments concurrently, never reading more than
+        # max_workers segments ahead of the slowest in-flight request
+        segment_words: Dict[int, List[Word]] = {}
+        segment_starts: Dict[int, float] = {}
+        seconds_done = 0.0
+        # Segments are stitched as soon as every earlier one is in, so each
+        # is stitched and formatted once however many progress reports follow
+        stitcher = SegmentStitcher(overlap_seconds)
+        formatter = TurnFormatter()
+        stitched = 0
+
+        def collect(future) -> None:
+            nonlocal seconds_done, stitched
+            index, words = future.result()
+            segment_words[index] = words
+
+            # Count each stretch of audio once, not once per overlapping segment
+            start = segment_starts[index] + (overlap_seconds if index else 0.0)
+            end = min(segment_starts[index] + segment_seconds, audio_format.duration_seconds)
+            seconds_done += max(0.0, end - start)
+
+            prefix = stitched
+            while stitched in segment_words:
+                stitcher.add(segment_words.pop(stitched), segment_starts[stitched])
+                stitched += 1
+            if on_progress is None or stitched == prefix:
+                return
+            on_progress({
+                "audio_seconds_done": min(seconds_done * progress_scale, source_seconds),
+                "audio_seconds": source_seconds,
+                "partial_transcript": formatter.format(stitcher.words, stitcher.stable_count)
+            })
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = set()
+            for segment in segments:
+                if len(pending) >= max_workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future)
+                segment_starts[segment.index] = segment.start_seconds
+                # Each recognize span is a child of this transcription's span
+                pending.add(executor.submit(
+                    contextvars.copy_context().run, recognize_segment, client, config, segment
+                ))
+
+            for future in as_completed(pending):
+                collect(future)
+
+        # Every segment has been collected, so all are stitched by now
+        words = stitcher.words
+        if prepared is not None:
+            to_source = prepared.time_map.to_source
+            words = [w._replace(start=to_source(w.start), end=to_source(w.end)) for w in words]
+
+        diarized = DiarizedWords(words)
+        result = {
             "status": "success",
-            "transcript": transcript.strip()
+            "transcript": format_turns(words),
+            "words": diarized.to_dict(),
+            "segment_count": stitched,
+            "audio_seconds": source_seconds,
+            "recognized_seconds": audio_format.duration_seconds,
+            "speaker_count": diarized.speaker_count
         }
-        
+
+        annotate(
+            cached=False,
+            audio_seconds=source_seconds,
+            recognized_seconds=audio_format.duration_seconds,
+            segments=stitched
+        )
+        count("audio_seconds_total", source_seconds, kind="source")
+        count("audio_seconds_total", audio_format.duration_seconds, kind="recognized")
+
+        if use_cache:
+            cache.put(cache_key, result, os.path.getsize(audio_file_path))
+
+        return {**result, "cached": False}
+
     except Exception as e:
+        if recognizer is None and isinstance(e, CONNECTION_ERRORS):
+            get_client_registry().invalidate(SPEECH)
         return {
             "status": "error",
             "transcript": "",
             "error_message": str(e)
-        }
\ No newline at end of file
+        }
+    finally:
+        if prepared is not None:
+            prepared.cleanup()
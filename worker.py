@@ -0,0 +1,121 @@
+"""
+Background workers for the LectureLink job queue.
+
+Each worker process claims queued jobs one at a time and runs them to
+completion, so throughput scales with the number of workers rather than
+with open browser tabs.
+
+Usage:
+    python worker.py --workers 4
+"""
+import argparse
+import multiprocessing
+import os
+import socket
+import sys
+import time
+from typing import List, Optional
+from dotenv import load_dotenv
+
+POLL_INTERVAL = 0.5
+# Seconds between deletions of long-finished jobs
+PRUNE_INTERVAL = 3600
+
+
+def build_services():
+    """Creates the per-process ADK runner and caches used by job handlers."""
+    from google.adk.runners import Runner
+    from agents.analysis import APP_NAME
+    from agents.analyst_agent.cache import AnalysisCache
+    from agents.workflow import root_agent
+    from services.memory_service import PersistentMemoryService
+    from services.session_service import PersistentSessionService
+    from tools.telemetry import TelemetryPlugin
+
+    session_service = PersistentSessionService()
+    return {
+        "runner": Runner(
+            agent=root_agent,
+            app_name=APP_NAME,
+            session_service=session_service,
+            memory_service=PersistentMemoryService(),
+            plugins=[TelemetryPlugin()]
+        ),
+        "session_service": session_service,
+        "analysis_cache": AnalysisCache()
+    }
+
+
+def run_worker(worker_id: str, poll_interval: float = POLL_INTERVAL) -> None:
+    """
+    Claims and runs jobs until interrupted.
+
+    Args:
+        worker_id: Name recorded on claimed jobs
+        poll_interval: Sleep between polls of an empty queue
+    """
+    from services.job_queue import JobQueue
+    from services.meeting_jobs import MEETING_JOB, release_meeting_job, run_meeting_job
+
+    load_dotenv()
+    queue = JobQueue()
+    services = build_services()
+    handlers = {MEETING_JOB: run_meeting_job}
+    # Release what a job holds when the queue gives up on it
+    releasers = {MEETING_JOB: release_meeting_job}
+
+    def release(job) -> None:
+        releaser = releasers.get(job["kind"])
+        if releaser is not None:
+            releaser(job)
+
+    print(f"[{worker_id}] waiting for jobs", file=sys.stderr)
+    last_prune = 0.0
+    try:
+        while True:
+            queue.requeue_stale(on_abandoned=release)
+            if time.monotonic() - last_prune >= PRUNE_INTERVAL:
+                last_prune = time.monotonic()
+                queue.prune()
+            job = queue.claim(worker_id)
+            if job is None:
+                time.sleep(poll_interval)
+                continue
+
+            print(f"[{worker_id}] running {job['kind']} {job['id']}", file=sys.stderr)
+            handler = handlers.get(job["kind"])
+            if handler is None:
+                queue.fail(job["id"], worker_id, f"Unknown job kind: {job['kind']}")
+                continue
+            handler(queue, job, services)
+    except KeyboardInterrupt:
+        pass
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=2, help="Number of worker processes")
+    args = parser.parse_args(argv)
+
+    prefix = f"{socket.gethostname()}-{os.getpid()}"
+    if args.workers == 1:
+        run_worker(f"{prefix}-0")
+        return 0
+
+    processes = [
+        multiprocessing.Process(target=run_worker, args=(f"{prefix}-{i}",), daemon=True)
+        for i in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())